@@ -32,3 +32,9 @@ ENABLE_ANIMATIONS = True
 
 # Game settings
 DEFAULT_FPS = 60
+
+# Engine analysis settings
+ENGINE_ANALYSIS = True  # Analyse the current position in the background
+ENGINE_TIME_LIMIT = 10.0  # Seconds of analysis per position
+ENGINE_MULTI_PV = 3  # Number of best lines shown in the analysis
+ENGINE_PONDER = True  # Keep searching on the expected reply once the analysis ends
@@ -3,121 +3,8 @@ import pygame
 import sys
 import config
 from src.ui.renderer import Renderer
-from src.board.move import Move
-
-
-class DummyBoard:
-    """
-    Dummy board class for placeholder purposes.
-    Replace with your actual board implementation.
-    """
-
-    def __init__(self):
-        # Initialize an empty 8x8 board
-        self.board = [[' ' for _ in range(8)] for _ in range(8)]
-        self.current_player = 'w'
-        self.move_history = []
-
-        # Set up initial position
-        self.initialize()
-
-    def initialize(self):
-        """Set up initial position"""
-        # Set up pawns
-        for col in range(8):
-            self.board[1][col] = 'P'  # White pawns
-            self.board[6][col] = 'p'  # Black pawns
-
-        # Set up white pieces
-        self.board[0][0] = self.board[0][7] = 'R'  # Rooks
-        self.board[0][1] = self.board[0][6] = 'N'  # Knights
-        self.board[0][2] = self.board[0][5] = 'B'  # Bishops
-        self.board[0][3] = 'Q'  # Queen
-        self.board[0][4] = 'K'  # King
-
-        # Set up black pieces
-        self.board[7][0] = self.board[7][7] = 'r'  # Rooks
-        self.board[7][1] = self.board[7][6] = 'n'  # Knights
-        self.board[7][2] = self.board[7][5] = 'b'  # Bishops
-        self.board[7][3] = 'q'  # Queen
-        self.board[7][4] = 'k'  # King
-
-        # Reset state
-        self.current_player = 'w'
-        self.move_history = []
-
-    def get_piece(self, position):
-        """Get piece at position"""
-        row, col = position
-        if 0 <= row < 8 and 0 <= col < 8:
-            return self.board[row][col]
-        return ' '
-
-    def place_piece(self, piece, position):
-        """Place piece at position"""
-        row, col = position
-        if 0 <= row < 8 and 0 <= col < 8:
-            self.board[row][col] = piece
-
-    def make_move(self, move):
-        """Execute a move on the board"""
-        from_row, from_col = move.from_pos
-        to_row, to_col = move.to_pos
-
-        # Move the piece
-        piece = self.board[from_row][from_col]
-        self.board[from_row][from_col] = ' '
-        self.board[to_row][to_col] = piece
-
-        # Update move history
-        self.move_history.append(move)
-
-        # Switch player
-        self.current_player = 'b' if self.current_player == 'w' else 'w'
-
-    def get_legal_moves(self, position=None):
-        """
-        PLACEHOLDER: Return legal moves
-        In a real implementation, this would calculate actual legal moves
-        """
-        if position is None:
-            return []
-
-        row, col = position
-        piece = self.board[row][col]
-
-        # Generate some dummy moves for testing UI
-        moves = []
-
-        # Simple pawn movement for white pawns (one square forward)
-        if piece == 'P' and row + 1 < 8 and self.board[row + 1][col] == ' ':
-            moves.append(Move((row, col), (row + 1, col), piece))
-
-            # Two squares from starting position
-            if row == 1 and self.board[row + 2][col] == ' ':
-                moves.append(Move((row, col), (row + 2, col), piece))
-
-        # Simple pawn movement for black pawns (one square forward)
-        if piece == 'p' and row - 1 >= 0 and self.board[row - 1][col] == ' ':
-            moves.append(Move((row, col), (row - 1, col), piece))
-
-            # Two squares from starting position
-            if row == 6 and self.board[row - 2][col] == ' ':
-                moves.append(Move((row, col), (row - 2, col), piece))
-
-        return moves
-
-    def get_board_state(self):
-        """Return the current board state"""
-        return self.board
-
-    def is_check(self, color):
-        """Placeholder for check detection"""
-        return False
-
-    def get_current_player(self):
-        """Get the current player"""
-        return self.current_player
+from src.board.bit_board import BitBoard
+from src.engine.runner import EngineRunner
 
 
 class GameController:
@@ -126,44 +13,128 @@ class GameController:
     This would be expanded in the full implementation.
     """
 
-    def __init__(self, board, renderer):
+    def __init__(self, board, renderer, engine=None):
         self.board = board
         self.renderer = renderer
+        self.engine = engine  # EngineRunner analysing the current position, or None
         self.move_history = []
+        self._analysis = None  # Latest info of the current position's analysis
+        self._ponder_pending = False  # Ponder on the expected move once the analysis ends
 
     def make_move(self, move):
+        # A ponder search on this move becomes the analysis of the new position
+        ponder_hit = (self.engine is not None and self.engine.pondering is not None and
+                      self.engine.pondering == move.to_int())
+
         # Make the move on the board
         self.board.make_move(move)
+        self.move_history.append(move)
 
         # Update renderer
         self.renderer.set_last_move(move)
+        self.update_game_state(ponder_hit)
 
     def undo_move(self):
-        """Placeholder for undo functionality"""
-        if self.board.move_history:
-            # This is a simplistic undo - a real implementation would be more sophisticated
-            self.board.initialize()
-
-            # Replay all moves except the last one
-            moves = self.board.move_history[:-1]
-            self.board.move_history = []
-
-            for move in moves:
-                self.board.make_move(move)
+        """Take back the last move."""
+        if self.move_history:
+            self.board.unmake_move()
+            self.move_history.pop()
 
             # Update renderer
-            if self.board.move_history:
-                self.renderer.set_last_move(self.board.move_history[-1])
+            if self.move_history:
+                self.renderer.set_last_move(self.move_history[-1])
             else:
                 self.renderer.set_last_move(None)
+            self.update_game_state()
+
+    def update_game_state(self, ponder_hit=False):
+        """
+        Highlight a king in check and detect checkmate or stalemate.
+
+        Args:
+            ponder_hit: Whether the engine was pondering the move just made;
+                        its search then continues instead of a new one.
+        """
+        player = self.board.get_current_player()
+        in_check = self.board.is_check(player)
+
+        check_square = None
+        if in_check:
+            king = 'K' if player == 'w' else 'k'
+            for row, pieces in enumerate(self.board.get_board_state()):
+                if king in pieces:
+                    check_square = (row, pieces.index(king))
+        self.renderer.set_check_square(check_square)
+
+        if len(self.board.generate_moves()):
+            self.renderer.set_game_state("playing")
+        else:
+            self.renderer.set_game_state("checkmate" if in_check else "stalemate")
+        if ponder_hit and self.renderer.game_state == "playing":
+            self.engine.ponderhit(config.ENGINE_TIME_LIMIT)
+            self._analysis = None
+            self._ponder_pending = config.ENGINE_PONDER
+        else:
+            self.start_analysis()
+
+    def start_analysis(self):
+        """Let the engine analyse the current position in the background."""
+        if self.engine is None:
+            return
+        self._analysis = None
+        if self.renderer.game_state == "playing":
+            self.engine.start(self.board, time_limit=config.ENGINE_TIME_LIMIT)
+            self._ponder_pending = config.ENGINE_PONDER
+        else:
+            self.engine.abort()
+            self._ponder_pending = False
+
+    def toggle_analysis(self):
+        """Stop a running analysis, or start one if none is running."""
+        if self.engine is None:
+            return
+        if self.engine.searching and self.engine.pondering is None:
+            self.engine.stop()
+            self._ponder_pending = False
+        else:
+            self.start_analysis()
+
+    def get_eval_info(self):
+        """
+        Get the latest engine analysis for display.
+
+        Once the analysis of the current position has finished, the engine
+        ponders on the move it expects next, so that the search after that
+        move starts from its results. Ponder updates are not displayed.
+
+        Returns:
+            The engine's info dictionary with the score from White's point of
+            view, or None if there is no analysis yet.
+        """
+        if self.engine is None:
+            return None
+        info = self.engine.poll()
+        if self.engine.pondering is None and info is not None:
+            if info['side'] == 'b':
+                lines = [dict(line, score=-line['score']) for line in info['lines']]
+                info = dict(info, score=-info['score'], lines=lines)
+            self._analysis = info
+        if self._ponder_pending and not self.engine.searching:
+            self._ponder_pending = False
+            if self._analysis is not None and self._analysis['best_move'] is not None:
+                self.engine.ponder(self.board, self._analysis['best_move'],
+                                   time_limit=config.ENGINE_TIME_LIMIT)
+        return self._analysis
 
     def get_annotations(self):
         """Get annotations for display"""
         # Get move history in algebraic notation
-        move_history_str = [str(move) for move in self.board.move_history]
+        move_history_str = [str(move) for move in self.move_history]
 
         # Determine status text
-        status = "White to move" if self.board.current_player == 'w' else "Black to move"
+        status = "White to move" if self.board.get_current_player() == 'w' else "Black to move"
+        if self.renderer.check_square and self.renderer.game_state == "playing":
+            status += " (check)"
 
         return {
             'move_history': move_history_str,
@@ -177,11 +148,13 @@ def main():
 
     pygame.display.set_caption("Chess Engine")
 
-    # Create board (placeholder implementation)
-    board = DummyBoard()
+    # Create board
+    board = BitBoard()
 
     renderer = Renderer(config.WINDOW_WIDTH, config.WINDOW_HEIGHT)
-    game_controller = GameController(board, renderer)
+    engine = EngineRunner(multi_pv=config.ENGINE_MULTI_PV) if config.ENGINE_ANALYSIS else None
+    game_controller = GameController(board, renderer, engine)
+    game_controller.start_analysis()
 
     # Main game loop
     running = True
@@ -191,14 +164,17 @@ def main():
         # Process events
         running = renderer.handle_events(board, game_controller)
 
-        # Update display
+        # Update display; the engine searches in its own process, so polling never blocks
         annotations = game_controller.get_annotations()
-        animations_active = renderer.draw(board, annotations)
+        eval_info = game_controller.get_eval_info()
+        animations_active = renderer.draw(board, annotations, eval_info)
 
         # Control frame rate
         clock.tick(config.DEFAULT_FPS if not animations_active else 60)
 
     # Clean up
+    if engine is not None:
+        engine.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,962 @@
+from array import array
+
+from src.board.base_board import BaseBoard
+from src.board.move import (
+    Move, NULL_MOVE, DOUBLE_PUSH, KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT, PROMOTION
+)
+from src.board.constants import (
+    WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, EMPTY,
+    PIECE_CHARS, PIECE_INDEX, CASTLING_CHARS, CASTLING_MASK,
+    WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE
+)
+from src.board.zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EP_KEYS, hash_position
+from src.board.material import MATERIAL_WEIGHTS
+from src.board.psq import PSQ_SCORES, PHASE_WEIGHTS
+from src.utils.fen import START_FEN, parse_fen, build_fen
+
+# Piece characters indexed by piece index; index EMPTY (-1) maps to ' '
+_BOARD_CHARS = PIECE_CHARS + ' '
+
+_KNIGHT_OFFSETS = (33, 31, 18, 14, -14, -18, -31, -33)
+_KING_OFFSETS = (17, 16, 15, 1, -1, -15, -16, -17)
+_BISHOP_OFFSETS = (17, 15, -15, -17)
+_ROOK_OFFSETS = (16, 1, -1, -16)
+_QUEEN_OFFSETS = _BISHOP_OFFSETS + _ROOK_OFFSETS
+
+# Flag bits of packed moves, already shifted into place
+_DOUBLE_PUSH = DOUBLE_PUSH << 12
+_CAPTURE = CAPTURE << 12
+_EN_PASSANT = EN_PASSANT << 12
+
+# Promotion flag bits (queen first so the UI picks a queen by default)
+_PROMOTIONS = tuple((PROMOTION | bits) << 12 for bits in (3, 2, 1, 0))
+_PROMOTION_CAPTURES = tuple((PROMOTION | CAPTURE | bits) << 12 for bits in (3, 2, 1, 0))
+
+# Undo records are stored flat: move, captured piece, castling rights, en
+# passant square, halfmove clock and position key for every ply
+_UNDO_SIZE = 6
+_UNDO_CAPACITY = 256
+
+# (row, col) tuple for every 0x88 index; off-board indices map to None
+_POSITIONS = [(sq >> 4, sq & 7) if not sq & 0x88 else None for sq in range(128)]
+
+# Conversions between 0x88 indices and the 0-63 squares used by packed moves
+_TO_64 = [(sq >> 4) * 8 + (sq & 7) if not sq & 0x88 else 0 for sq in range(128)]
+_TO_88 = [sq + (sq & ~7) for sq in range(64)]
+
+# Packed move destination bits per 0x88 index
+_TO_BITS = [square << 6 for square in _TO_64]
+
+# 64-bit square bit per 0x88 index, for attack maps
+_SQUARE_BITS = [1 << square if not sq & 0x88 else 0 for sq, square in enumerate(_TO_64)]
+
+# Zobrist piece keys per 0x88 index
+_PIECE_KEYS = [[PIECE_KEYS[piece][(sq >> 4) * 8 + (sq & 7)] if not sq & 0x88 else 0
+                for sq in range(128)] for piece in range(12)]
+
+# Packed piece-square scores per 0x88 index
+_PSQ_SCORES = [[PSQ_SCORES[piece][(sq >> 4) * 8 + (sq & 7)] if not sq & 0x88 else 0
+                for sq in range(128)] for piece in range(12)]
+
+# Castling rights mask per 0x88 index
+_CASTLING_MASK = [CASTLING_MASK[(sq >> 4) * 8 + (sq & 7)] if not sq & 0x88 else 0
+                  for sq in range(128)]
+
+# Castling moves per color, in 0x88 indices:
+# (right, king from, rook from, squares that must be empty,
+#  attack map bits of the squares the king crosses, packed move)
+_CASTLING_MOVES = (
+    ((WHITE_KINGSIDE, 0x04, 0x07, (0x05, 0x06), 0x60,
+      4 | (6 << 6) | (KING_CASTLE << 12)),
+     (WHITE_QUEENSIDE, 0x04, 0x00, (0x01, 0x02, 0x03), 0x0C,
+      4 | (2 << 6) | (QUEEN_CASTLE << 12))),
+    ((BLACK_KINGSIDE, 0x74, 0x77, (0x75, 0x76), 0x60 << 56,
+      60 | (62 << 6) | (KING_CASTLE << 12)),
+     (BLACK_QUEENSIDE, 0x74, 0x70, (0x71, 0x72, 0x73), 0x0C << 56,
+      60 | (58 << 6) | (QUEEN_CASTLE << 12))),
+)
+
+
+def _build_attack_tables():
+    """
+    Build the 0x88 attack tables indexed by (target - origin + 119).
+
+    In a 0x88 layout the difference between two squares uniquely identifies
+    the vector between them, so one lookup tells whether a piece could attack
+    a square at all and, for sliders, which step walks the ray.
+
+    Returns:
+        Tuple (attack_bits, ray_steps). attack_bits holds a bit per piece index
+        that can attack along the difference; ray_steps holds the slider step.
+    """
+    attack_bits = [0] * 239
+    ray_steps = [0] * 239
+
+    for color in (WHITE, BLACK):
+        base = color * 6
+        for offset in (15, 17) if color == WHITE else (-15, -17):
+            attack_bits[offset + 119] |= 1 << (base + PAWN)
+        for offset in _KNIGHT_OFFSETS:
+            attack_bits[offset + 119] |= 1 << (base + KNIGHT)
+        for offset in _KING_OFFSETS:
+            attack_bits[offset + 119] |= 1 << (base + KING)
+        for offsets, piece_types in ((_BISHOP_OFFSETS, (BISHOP, QUEEN)),
+                                     (_ROOK_OFFSETS, (ROOK, QUEEN))):
+            for step in offsets:
+                for distance in range(1, 8):
+                    index = step * distance + 119
+                    for piece_type in piece_types:
+                        attack_bits[index] |= 1 << (base + piece_type)
+                    ray_steps[index] = step
+
+    return attack_bits, ray_steps
+
+
+_ATTACK_BITS, _RAY_STEPS = _build_attack_tables()
+
+# Pieces that attack along a ray rather than by a single jump
+_SLIDERS = {BISHOP, ROOK, QUEEN, 6 + BISHOP, 6 + ROOK, 6 + QUEEN}
+
+
+class ArrayBoard(BaseBoard):
+    """
+    Mailbox representation of a chess board using a 0x88 layout.
+
+    Squares are indexed ``row * 16 + col`` in a 128-entry list, so any index
+    with ``index & 0x88`` set is off the board and move generation needs no
+    bounds checks. Each piece index also keeps a list of the squares it
+    occupies, so generation and attack tests visit only the pieces present
+    instead of scanning the board.
+    """
+
+    def __init__(self, fen=None):
+        """
+        Initialize the board.
+
+        Args:
+            fen: Optional FEN string to set up. Defaults to the initial position.
+        """
+        self.squares = [EMPTY] * 128  # Piece index per 0x88 square
+        self.piece_lists = [[] for _ in range(12)]  # 0x88 squares per piece index
+        self.side = WHITE
+        self.castling = 0
+        self.ep_square = -1  # 0x88 index of the en passant target, -1 if none
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self._hash = 0  # Zobrist key, updated incrementally by _put, _remove and _move
+        self.psq = 0  # Packed piece-square score sum, updated like the key (see src.board.psq)
+        self.phase = 0  # Game phase counter, likewise
+        self.material_key = 0  # Piece counts, likewise (see src.board.material)
+        self._undo = [0] * (_UNDO_SIZE * _UNDO_CAPACITY)  # Preallocated undo records
+        self._ply = 0  # Number of undo records in use
+        self._attack_maps = [-1, -1]  # Squares attacked per color, -1 until computed
+        self.listeners = []  # Observers of position changes, see BaseBoard.add_listener
+
+        if fen is None:
+            self.initialize()
+        else:
+            self.set_fen(fen)
+
+    def initialize(self):
+        """Set up the initial position of pieces on the board."""
+        self.set_fen(START_FEN)
+
+    def set_fen(self, fen):
+        """
+        Set up the position described by a FEN string.
+
+        Args:
+            fen: The FEN string.
+
+        Raises:
+            ValueError: If the FEN string is malformed.
+        """
+        state = parse_fen(fen)
+
+        self.squares = [EMPTY] * 128
+        self.piece_lists = [[] for _ in range(12)]
+        self.psq = self.phase = self.material_key = 0
+        for row in range(8):
+            for col in range(8):
+                piece = state['placement'][row][col]
+                if piece != ' ':
+                    self._put(PIECE_INDEX[piece], row * 16 + col)
+
+        self.side = WHITE if state['turn'] == 'w' else BLACK
+        self.castling = 0
+        for char, right in CASTLING_CHARS:
+            if char in state['castling']:
+                self.castling |= right
+
+        ep = state['en_passant']
+        self.ep_square = ep[0] * 16 + ep[1] if ep else -1
+        self.halfmove_clock = state['halfmove']
+        self.fullmove_number = state['fullmove']
+        self._ply = 0
+        self._hash = self._compute_hash()
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        for listener in self.listeners:
+            listener.reset(self)
+
+    def get_fen(self):
+        """
+        Get the FEN string of the current position.
+
+        Returns:
+            The FEN string.
+        """
+        castling = ''.join(char for char, right in CASTLING_CHARS if self.castling & right)
+        ep = _POSITIONS[self.ep_square] if self.ep_square >= 0 else None
+        return build_fen(self.get_board_state(), self.get_current_player(), castling, ep,
+                         self.halfmove_clock, self.fullmove_number)
+
+    def get_piece(self, position):
+        """
+        Get the piece at the specified position.
+
+        Args:
+            position: A tuple (row, col) specifying the position.
+
+        Returns:
+            A character representing the piece, or ' ' for an empty square.
+        """
+        row, col = position
+        if 0 <= row < 8 and 0 <= col < 8:
+            return _BOARD_CHARS[self.squares[row * 16 + col]]
+        return ' '
+
+    def place_piece(self, piece, position):
+        """
+        Place a piece at the specified position, replacing whatever is there.
+
+        Args:
+            piece: A character representing the piece, or ' ' to clear the square.
+            position: A tuple (row, col) specifying the position.
+        """
+        row, col = position
+        if not (0 <= row < 8 and 0 <= col < 8):
+            return
+        square = row * 16 + col
+        if self.squares[square] != EMPTY:
+            self._remove(self.squares[square], square)
+        if piece and piece != ' ':
+            self._put(PIECE_INDEX[piece], square)
+        self._hash = self._compute_hash()
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        for listener in self.listeners:
+            listener.reset(self)
+
+    def make_move(self, move):
+        """
+        Execute a move on the board.
+
+        Args:
+            move: A Move object, or a packed integer move from generate_moves.
+        """
+        if not isinstance(move, int):
+            move = move.to_int()
+        from_sq = _TO_88[move & 63]
+        to_sq = _TO_88[(move >> 6) & 63]
+        flags = move >> 12
+        us = self.side
+        squares = self.squares
+        piece = squares[from_sq]
+        captured = squares[to_sq]
+
+        undo = self._undo
+        index = self._ply * _UNDO_SIZE
+        if index == len(undo):
+            undo.extend([0] * len(undo))
+        undo[index] = move
+        undo[index + 2] = self.castling
+        undo[index + 3] = self.ep_square
+        undo[index + 4] = self.halfmove_clock
+        undo[index + 5] = self._hash
+        self._ply += 1
+
+        # Take the old castling rights and en passant file out of the key
+        if self.ep_square >= 0 and self._ep_capturable(self.ep_square, us):
+            self._hash ^= EP_KEYS[self.ep_square & 7]
+        self._hash ^= CASTLING_KEYS[self.castling]
+
+        if captured != EMPTY:
+            self._remove(captured, to_sq)
+
+        if flags & PROMOTION:
+            self._remove(piece, from_sq)
+            self._put(us * 6 + KNIGHT + (flags & 3), to_sq)
+        else:
+            self._move(piece, from_sq, to_sq)
+
+        if flags == EN_PASSANT:
+            captured_sq = to_sq - 16 if us == WHITE else to_sq + 16
+            captured = squares[captured_sq]
+            self._remove(captured, captured_sq)
+        elif flags == KING_CASTLE:
+            self._move(us * 6 + ROOK, from_sq + 3, from_sq + 1)
+        elif flags == QUEEN_CASTLE:
+            self._move(us * 6 + ROOK, from_sq - 4, from_sq - 1)
+
+        undo[index + 1] = captured
+        self.castling &= _CASTLING_MASK[from_sq] & _CASTLING_MASK[to_sq]
+        key = self._hash ^ CASTLING_KEYS[self.castling] ^ SIDE_KEY
+
+        if flags == DOUBLE_PUSH:
+            ep = (from_sq + to_sq) >> 1
+            self.ep_square = ep
+            if self._ep_capturable(ep, us ^ 1):
+                key ^= EP_KEYS[ep & 7]
+        else:
+            self.ep_square = -1
+        self._hash = key
+
+        if piece % 6 == PAWN or captured != EMPTY:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if us == BLACK:
+            self.fullmove_number += 1
+
+        self.side = us ^ 1
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        for listener in self.listeners:
+            listener.moved(self, move, piece, captured)
+
+    def make_null_move(self):
+        """
+        Pass the turn to the other side without moving a piece.
+
+        The undo record holds NULL_MOVE, which unmake_move recognizes.
+        """
+        undo = self._undo
+        index = self._ply * _UNDO_SIZE
+        if index == len(undo):
+            undo.extend([0] * len(undo))
+        undo[index] = NULL_MOVE
+        undo[index + 1] = EMPTY
+        undo[index + 2] = self.castling
+        undo[index + 3] = self.ep_square
+        undo[index + 4] = self.halfmove_clock
+        undo[index + 5] = self._hash
+        self._ply += 1
+
+        us = self.side
+        ep = self.ep_square
+        if ep >= 0 and self._ep_capturable(ep, us):
+            self._hash ^= EP_KEYS[ep & 7]
+        self._hash ^= SIDE_KEY
+        self.ep_square = -1
+        self.halfmove_clock = 0  # Keeps is_repetition from looking past the null move
+        if us == BLACK:
+            self.fullmove_number += 1
+        self.side = us ^ 1
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        for listener in self.listeners:
+            listener.moved(self, NULL_MOVE, EMPTY, EMPTY)
+
+    def unmake_move(self):
+        """
+        Take back the last move made with make_move or make_null_move.
+
+        Returns:
+            The packed integer move that was taken back (NULL_MOVE for a null move).
+
+        Raises:
+            IndexError: If there is no move to take back.
+        """
+        if not self._ply:
+            raise IndexError("No move to unmake")
+
+        self._ply -= 1
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        undo = self._undo
+        index = self._ply * _UNDO_SIZE
+        move = undo[index]
+        captured = undo[index + 1]
+        self.castling = undo[index + 2]
+        self.ep_square = undo[index + 3]
+        self.halfmove_clock = undo[index + 4]
+
+        us = self.side ^ 1
+        self.side = us
+        if us == BLACK:
+            self.fullmove_number -= 1
+
+        if move == NULL_MOVE:
+            self._hash = undo[index + 5]
+            for listener in self.listeners:
+                listener.unmoved(self)
+            return move
+
+        from_sq = _TO_88[move & 63]
+        to_sq = _TO_88[(move >> 6) & 63]
+        flags = move >> 12
+        if flags & PROMOTION:
+            self._remove(self.squares[to_sq], to_sq)
+            self._put(us * 6 + PAWN, from_sq)
+        else:
+            self._move(self.squares[to_sq], to_sq, from_sq)
+
+        if flags == EN_PASSANT:
+            self._put(captured, to_sq - 16 if us == WHITE else to_sq + 16)
+        elif captured != EMPTY:
+            self._put(captured, to_sq)
+        elif flags == KING_CASTLE:
+            self._move(us * 6 + ROOK, from_sq + 1, from_sq + 3)
+        elif flags == QUEEN_CASTLE:
+            self._move(us * 6 + ROOK, from_sq - 1, from_sq - 4)
+
+        self._hash = undo[index + 5]
+        for listener in self.listeners:
+            listener.unmoved(self)
+        return move
+
+    def get_legal_moves(self, position=None):
+        """
+        Get all legal moves for the specified position or for all pieces of the current player.
+
+        Args:
+            position: Optional tuple (row, col) specifying the position.
+                     If None, return all legal moves for the current player.
+
+        Returns:
+            A list of Move objects representing legal moves.
+        """
+        if position is None:
+            origins = self._origins()
+        else:
+            row, col = position
+            if not (0 <= row < 8 and 0 <= col < 8):
+                return []
+            square = row * 16 + col
+            piece = self.squares[square]
+            if piece == EMPTY or piece // 6 != self.side:
+                return []
+            origins = [(piece, square)]
+        return [Move.from_int(move, self) for move in self._generate_moves(origins)]
+
+    def generate_moves(self):
+        """
+        Generate all legal moves of the side to move in packed form.
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        return self._generate_moves(self._origins())
+
+    def generate_captures(self):
+        """
+        Generate the legal captures, en passant captures and promotions.
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        return self._generate_moves(self._origins(), quiets=False)
+
+    def generate_quiets(self):
+        """
+        Generate the legal moves that generate_captures leaves out.
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        return self._generate_moves(self._origins(), captures=False)
+
+    def is_legal_move(self, move):
+        """
+        Check whether a packed move is legal in the current position.
+
+        Args:
+            move: The packed move, e.g. a hash move or killer from another position.
+
+        Returns:
+            True if the move is legal.
+        """
+        square = _TO_88[move & 63]
+        piece = self.squares[square]
+        if piece == EMPTY or piece // 6 != self.side:
+            return False
+        return move in self._generate_moves([(piece, square)])
+
+    def piece_at(self, square):
+        """
+        Get the piece index on a square.
+
+        Args:
+            square: Square index 0-63.
+
+        Returns:
+            The piece index (color * 6 + piece type), or EMPTY.
+        """
+        return self.squares[_TO_88[square]]
+
+    def piece_count(self, piece):
+        """
+        Count the pieces of one kind on the board.
+
+        Args:
+            piece: Piece index (color * 6 + piece type).
+
+        Returns:
+            The number of such pieces.
+        """
+        return len(self.piece_lists[piece])
+
+    def is_repetition(self):
+        """
+        Check whether the current position occurred before in the game.
+
+        Only positions since the last capture or pawn move can repeat, so the
+        undo stack is scanned back at most halfmove_clock plies, comparing keys
+        of positions with the same side to move.
+
+        Returns:
+            True if the position is a repetition.
+        """
+        undo = self._undo
+        key = self._hash
+        oldest = max(0, self._ply - self.halfmove_clock)
+        for ply in range(self._ply - 4, oldest - 1, -2):
+            if undo[ply * _UNDO_SIZE + 5] == key:
+                return True
+        return False
+
+    def get_board_state(self):
+        """
+        Get the current state of the board for display or evaluation.
+
+        Returns:
+            8x8 list of piece characters indexed [row][col], ' ' for empty squares.
+        """
+        squares = self.squares
+        return [[_BOARD_CHARS[piece] for piece in squares[row * 16:row * 16 + 8]] for row in range(8)]
+
+    def is_check(self, color):
+        """
+        Check if the king of the specified color is in check.
+
+        Args:
+            color: 'w' for white, 'b' for black.
+
+        Returns:
+            True if the king is in check, False otherwise.
+        """
+        us = WHITE if color == 'w' else BLACK
+        kings = self.piece_lists[us * 6 + KING]
+        if not kings:
+            return False
+        attacked = self._attack_maps[us ^ 1]
+        if attacked >= 0:
+            return attacked & _SQUARE_BITS[kings[0]] != 0
+        # Only the king's square matters; the full attack map is left to move generation
+        return self._is_attacked(kings[0], us ^ 1)
+
+    def is_square_attacked(self, square, color):
+        """
+        Check if a square is attacked by the pieces of a color.
+
+        Args:
+            square: Square index 0-63.
+            color: 'w' for white, 'b' for black, the attacking side.
+
+        Returns:
+            True if the square is attacked, False otherwise.
+        """
+        return (self._attacks(WHITE if color == 'w' else BLACK) >> square) & 1 == 1
+
+    def attack_map(self, color):
+        """
+        Get all squares attacked by the pieces of a color.
+
+        Args:
+            color: 'w' for white, 'b' for black.
+
+        Returns:
+            Bitboard with bit ``row * 8 + col`` set for every attacked square.
+        """
+        return self._attacks(WHITE if color == 'w' else BLACK)
+
+    def get_current_player(self):
+        """
+        Get the current player.
+
+        Returns:
+            'w' for white, 'b' for black.
+        """
+        return 'w' if self.side == WHITE else 'b'
+
+    @property
+    def hash(self):
+        """
+        Get the 64-bit Zobrist key of the current position.
+
+        Returns:
+            The position key as an integer.
+        """
+        return self._hash
+
+    def _origins(self):
+        """List the (piece index, 0x88 square) pairs of the side to move."""
+        base = self.side * 6
+        piece_lists = self.piece_lists
+        return [(piece, square) for piece in range(base, base + 6) for square in piece_lists[piece]]
+
+    def _ep_capturable(self, ep_square, color):
+        """Check whether a pawn of the color can capture on the en passant square."""
+        pawn = color * 6 + PAWN
+        squares = self.squares
+        if color == WHITE:
+            return squares[ep_square - 15] == pawn or squares[ep_square - 17] == pawn
+        return squares[ep_square + 15] == pawn or squares[ep_square + 17] == pawn
+
+    def _compute_hash(self):
+        """Compute the Zobrist key of the current position from scratch."""
+        ep_file = -1
+        if self.ep_square >= 0 and self._ep_capturable(self.ep_square, self.side):
+            ep_file = self.ep_square & 7
+        return hash_position(((piece, (square >> 4) * 8 + (square & 7))
+                              for piece in range(12) for square in self.piece_lists[piece]),
+                             self.side, self.castling, ep_file)
+
+    def _put(self, piece, square):
+        """Add a piece to an empty square."""
+        self.squares[square] = piece
+        self.piece_lists[piece].append(square)
+        self._hash ^= _PIECE_KEYS[piece][square]
+        self.psq += _PSQ_SCORES[piece][square]
+        self.phase += PHASE_WEIGHTS[piece]
+        self.material_key += MATERIAL_WEIGHTS[piece]
+
+    def _remove(self, piece, square):
+        """Remove a piece from a square."""
+        self.squares[square] = EMPTY
+        self.piece_lists[piece].remove(square)
+        self._hash ^= _PIECE_KEYS[piece][square]
+        self.psq -= _PSQ_SCORES[piece][square]
+        self.phase -= PHASE_WEIGHTS[piece]
+        self.material_key -= MATERIAL_WEIGHTS[piece]
+
+    def _move(self, piece, from_sq, to_sq):
+        """Move a piece to an empty square."""
+        squares = self.squares
+        squares[from_sq] = EMPTY
+        squares[to_sq] = piece
+        piece_list = self.piece_lists[piece]
+        piece_list[piece_list.index(from_sq)] = to_sq
+        keys = _PIECE_KEYS[piece]
+        self._hash ^= keys[from_sq] ^ keys[to_sq]
+        scores = _PSQ_SCORES[piece]
+        self.psq += scores[to_sq] - scores[from_sq]
+
+    def _attacks(self, color):
+        """
+        Get the attack map of a color, computing it once per position.
+
+        The maps are dropped by every make_move and unmake_move, so repeated
+        check and attacked-square queries on one position cost a list lookup.
+
+        Args:
+            color: WHITE or BLACK.
+
+        Returns:
+            64-bit set of squares attacked by the color.
+        """
+        attacked = self._attack_maps[color]
+        if attacked < 0:
+            attacked = self._compute_attacks(color)
+            self._attack_maps[color] = attacked
+        return attacked
+
+    def _compute_attacks(self, color):
+        """Compute the squares attacked by a color by walking its piece lists."""
+        squares = self.squares
+        piece_lists = self.piece_lists
+        base = color * 6
+        attacked = 0
+
+        pawn_offsets = (15, 17) if color == WHITE else (-15, -17)
+        for piece_type, offsets in ((PAWN, pawn_offsets), (KNIGHT, _KNIGHT_OFFSETS), (KING, _KING_OFFSETS)):
+            for origin in piece_lists[base + piece_type]:
+                for offset in offsets:
+                    target = origin + offset
+                    if not target & 0x88:
+                        attacked |= _SQUARE_BITS[target]
+        for piece_type, offsets in ((BISHOP, _BISHOP_OFFSETS), (ROOK, _ROOK_OFFSETS),
+                                    (QUEEN, _QUEEN_OFFSETS)):
+            for origin in piece_lists[base + piece_type]:
+                for step in offsets:
+                    target = origin + step
+                    while not target & 0x88:
+                        attacked |= _SQUARE_BITS[target]
+                        if squares[target] != EMPTY:
+                            break
+                        target += step
+        return attacked
+
+    def _is_attacked(self, square, color, ignore=-1):
+        """
+        Check whether a square is attacked by a color.
+
+        Args:
+            square: 0x88 index of the target square.
+            color: WHITE or BLACK, the attacking side.
+            ignore: 0x88 index of an attacker to skip (a piece just captured).
+
+        Returns:
+            True if any piece of the color attacks the square.
+        """
+        squares = self.squares
+        piece_lists = self.piece_lists
+        for piece in range(color * 6, color * 6 + 6):
+            bit = 1 << piece
+            for origin in piece_lists[piece]:
+                index = square - origin + 119
+                if not _ATTACK_BITS[index] & bit or origin == ignore:
+                    continue
+                if piece not in _SLIDERS:
+                    return True
+                step = _RAY_STEPS[index]
+                current = origin + step
+                while current != square and squares[current] == EMPTY:
+                    current += step
+                if current == square:
+                    return True
+        return False
+
+    def _is_legal(self, from_sq, to_sq, captured_sq, king_sq):
+        """
+        Test whether a pseudo-legal move leaves the mover's king out of check.
+
+        Move generation only needs this for en passant, where removing two
+        pawns from one rank can expose the king in a way pin detection misses.
+        The move is applied to the square array only; piece lists are left alone
+        and the captured piece is skipped through the attack test's ignore square.
+
+        Args:
+            from_sq: Origin square.
+            to_sq: Destination square.
+            captured_sq: Square of the captured piece (differs from to_sq for en passant).
+            king_sq: Square of the mover's king after the move.
+
+        Returns:
+            True if the move is legal.
+        """
+        squares = self.squares
+        piece = squares[from_sq]
+        original_to = squares[to_sq]
+        captured = squares[captured_sq]
+
+        squares[from_sq] = EMPTY
+        squares[captured_sq] = EMPTY
+        squares[to_sq] = piece
+        attacked = self._is_attacked(king_sq, self.side ^ 1, captured_sq)
+        squares[to_sq] = original_to
+        squares[captured_sq] = captured
+        squares[from_sq] = piece
+
+        return not attacked
+
+    def _check_info(self, king_sq):
+        """
+        Find the checkers and pinned pieces of the side to move.
+
+        Args:
+            king_sq: 0x88 square of the side to move's king.
+
+        Returns:
+            Tuple (checkers, pins): a list of checking piece squares, and a dict
+            mapping each pinned piece's square to the ray step of its pin.
+        """
+        us = self.side
+        them = us ^ 1
+        squares = self.squares
+        piece_lists = self.piece_lists
+        checkers = []
+        pins = {}
+        for piece in range(them * 6, them * 6 + 6):
+            bit = 1 << piece
+            slider = piece in _SLIDERS
+            for origin in piece_lists[piece]:
+                index = king_sq - origin + 119
+                if not _ATTACK_BITS[index] & bit:
+                    continue
+                if not slider:
+                    checkers.append(origin)
+                    continue
+                step = _RAY_STEPS[index]
+                blocker = -1
+                current = origin + step
+                while current != king_sq:
+                    if squares[current] != EMPTY:
+                        if blocker != -1 or squares[current] // 6 != us:
+                            blocker = -2
+                            break
+                        blocker = current
+                    current += step
+                if blocker == -1:
+                    checkers.append(origin)
+                elif blocker >= 0:
+                    pins[blocker] = step
+        return checkers, pins
+
+    def _generate_moves(self, origins, captures=True, quiets=True):
+        """
+        Generate legal moves for the side to move.
+
+        Legality is decided up front rather than by playing each move: the
+        checkers and pinned pieces are found once, every non-king move must land
+        on a check-evasion square and a pinned piece may only move along its pin
+        ray. King moves are tested with the king lifted off the board, and en
+        passant gets a full test because it removes two pieces from one rank.
+
+        Args:
+            origins: List of (piece index, 0x88 square) pairs to generate moves for.
+            captures: Include captures, en passant and promotions.
+            quiets: Include all other moves (pushes, castling, quiet piece moves).
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        moves = array('H')
+        append = moves.append
+        us = self.side
+        them = us ^ 1
+        base = us * 6
+        squares = self.squares
+        king_sq = self.piece_lists[base + KING][0]
+
+        checkers, pins = self._check_info(king_sq)
+        if len(checkers) > 1:
+            # Double check: only the king can move
+            origins = [(piece, square) for piece, square in origins if square == king_sq]
+            evasions = None
+        elif checkers:
+            # Capture the checker or, for a slider, block between it and the king
+            checker = checkers[0]
+            evasions = {checker}
+            if squares[checker] in _SLIDERS:
+                step = _RAY_STEPS[king_sq - checker + 119]
+                current = checker + step
+                while current != king_sq:
+                    evasions.add(current)
+                    current += step
+        else:
+            evasions = None
+
+        if us == WHITE:
+            push, start_row, promotion_row, pawn_captures = 16, 1, 7, (15, 17)
+        else:
+            push, start_row, promotion_row, pawn_captures = -16, 6, 0, (-15, -17)
+
+        for piece, from_sq in origins:
+            piece_type = piece - base
+            from_bits = _TO_64[from_sq]
+            pin = pins.get(from_sq, 0)
+
+            if piece_type == KING:
+                squares[king_sq] = EMPTY
+                for offset in _KING_OFFSETS:
+                    to_sq = from_sq + offset
+                    if to_sq & 0x88:
+                        continue
+                    target = squares[to_sq]
+                    if target == EMPTY:
+                        if quiets and not self._is_attacked(to_sq, them, to_sq):
+                            append(from_bits | _TO_BITS[to_sq])
+                    elif target // 6 == them and captures and not self._is_attacked(to_sq, them, to_sq):
+                        append(from_bits | _TO_BITS[to_sq] | _CAPTURE)
+                squares[king_sq] = piece
+                if quiets and not checkers:
+                    self._add_castling_moves(append)
+
+            elif piece_type == PAWN:
+                to_sq = from_sq + push
+                promotion = (to_sq >> 4) == promotion_row
+                if (squares[to_sq] == EMPTY and (captures if promotion else quiets) and
+                        (not pin or pin == push or pin == -push)):
+                    if evasions is None or to_sq in evasions:
+                        if promotion:
+                            for flags in _PROMOTIONS:
+                                append(from_bits | _TO_BITS[to_sq] | flags)
+                        else:
+                            append(from_bits | _TO_BITS[to_sq])
+                    double = to_sq + push
+                    if ((from_sq >> 4) == start_row and squares[double] == EMPTY and
+                            (evasions is None or double in evasions)):
+                        append(from_bits | _TO_BITS[double] | _DOUBLE_PUSH)
+                if not captures:
+                    continue
+                for offset in pawn_captures:
+                    to_sq = from_sq + offset
+                    if to_sq & 0x88 or (pin and pin != offset and pin != -offset):
+                        continue
+                    target = squares[to_sq]
+                    if target != EMPTY and target // 6 == them:
+                        if evasions is None or to_sq in evasions:
+                            if promotion:
+                                for flags in _PROMOTION_CAPTURES:
+                                    append(from_bits | _TO_BITS[to_sq] | flags)
+                            else:
+                                append(from_bits | _TO_BITS[to_sq] | _CAPTURE)
+                    elif to_sq == self.ep_square and self._is_legal(from_sq, to_sq, to_sq - push, king_sq):
+                        append(from_bits | _TO_BITS[to_sq] | _EN_PASSANT)
+
+            elif piece_type == KNIGHT:
+                if pin:
+                    continue
+                for offset in _KNIGHT_OFFSETS:
+                    to_sq = from_sq + offset
+                    if to_sq & 0x88:
+                        continue
+                    if evasions is not None and to_sq not in evasions:
+                        continue
+                    target = squares[to_sq]
+                    if target == EMPTY:
+                        if quiets:
+                            append(from_bits | _TO_BITS[to_sq])
+                    elif target // 6 == them and captures:
+                        append(from_bits | _TO_BITS[to_sq] | _CAPTURE)
+
+            else:
+                if piece_type == BISHOP:
+                    offsets = _BISHOP_OFFSETS
+                elif piece_type == ROOK:
+                    offsets = _ROOK_OFFSETS
+                else:
+                    offsets = _QUEEN_OFFSETS
+                if pin:
+                    # A pinned slider can only move along the pin ray, if at all
+                    offsets = (pin, -pin) if pin in offsets else ()
+                for step in offsets:
+                    to_sq = from_sq + step
+                    while not to_sq & 0x88:
+                        target = squares[to_sq]
+                        if target == EMPTY:
+                            if quiets and (evasions is None or to_sq in evasions):
+                                append(from_bits | _TO_BITS[to_sq])
+                        else:
+                            if target // 6 == them and captures and (evasions is None or to_sq in evasions):
+                                append(from_bits | _TO_BITS[to_sq] | _CAPTURE)
+                            break
+                        to_sq += step
+
+        return moves
+
+    def _add_castling_moves(self, append):
+        """Append the legal castling moves of the side to move."""
+        us = self.side
+        squares = self.squares
+        rook = us * 6 + ROOK
+        for right, king_from, rook_from, between, path, move in _CASTLING_MOVES[us]:
+            if not (self.castling & right) or squares[king_from] != us * 6 + KING:
+                continue
+            if squares[rook_from] != rook or any(squares[sq] != EMPTY for sq in between):
+                continue
+            if self._attacks(us ^ 1) & path:
+                continue
+            append(move)
@@ -0,0 +1,196 @@
+"""
+Precomputed attack tables for bitboard move generation.
+
+Leaper attacks (pawn, knight, king) are plain 64-entry lookup lists. Sliding
+attacks use PEXT-style tables: for every square the relevant blocker mask is
+precomputed, and the attack set is looked up directly by the masked occupancy.
+In Python a dict keyed by the masked occupancy is cheaper than the multiply
+and shift of classic magic bitboards, and needs no magic constants.
+"""
+
+FULL = 0xFFFFFFFFFFFFFFFF
+
+FILE_A = 0x0101010101010101
+FILE_B = FILE_A << 1
+FILE_G = FILE_A << 6
+FILE_H = FILE_A << 7
+
+RANK_1 = 0xFF
+RANK_2 = RANK_1 << 8
+RANK_3 = RANK_1 << 16
+RANK_4 = RANK_1 << 24
+RANK_5 = RANK_1 << 32
+RANK_6 = RANK_1 << 40
+RANK_7 = RANK_1 << 48
+RANK_8 = RANK_1 << 56
+
+NOT_FILE_A = FULL ^ FILE_A
+NOT_FILE_H = FULL ^ FILE_H
+
+ROOK_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def _leaper_attacks(square, offsets):
+    """Attack set of a piece that jumps by the given (row, col) offsets."""
+    row, col = square >> 3, square & 7
+    attacks = 0
+    for d_row, d_col in offsets:
+        r, c = row + d_row, col + d_col
+        if 0 <= r < 8 and 0 <= c < 8:
+            attacks |= 1 << (r * 8 + c)
+    return attacks
+
+
+def _ray_attacks(square, occupied, directions):
+    """Attack set of a slider, walking each ray until the first blocker."""
+    row, col = square >> 3, square & 7
+    attacks = 0
+    for d_row, d_col in directions:
+        r, c = row + d_row, col + d_col
+        while 0 <= r < 8 and 0 <= c < 8:
+            bit = 1 << (r * 8 + c)
+            attacks |= bit
+            if occupied & bit:
+                break
+            r += d_row
+            c += d_col
+    return attacks
+
+
+def _relevant_mask(square, directions):
+    """Squares whose occupancy can change a slider's attacks (edges excluded)."""
+    row, col = square >> 3, square & 7
+    mask = 0
+    for d_row, d_col in directions:
+        r, c = row + d_row, col + d_col
+        while 0 <= r + d_row < 8 and 0 <= c + d_col < 8:
+            mask |= 1 << (r * 8 + c)
+            r += d_row
+            c += d_col
+    return mask
+
+
+def _slider_table(square, mask, directions):
+    """Map every subset of the relevant mask to the resulting attack set."""
+    table = {}
+    subset = 0
+    while True:
+        table[subset] = _ray_attacks(square, subset, directions)
+        subset = (subset - mask) & mask
+        if subset == 0:
+            return table
+
+
+KNIGHT_ATTACKS = [_leaper_attacks(sq, ((1, 2), (2, 1), (2, -1), (1, -2),
+                                       (-1, -2), (-2, -1), (-2, 1), (-1, 2)))
+                  for sq in range(64)]
+
+KING_ATTACKS = [_leaper_attacks(sq, ((1, 0), (1, 1), (0, 1), (-1, 1),
+                                     (-1, 0), (-1, -1), (0, -1), (1, -1)))
+                for sq in range(64)]
+
+# PAWN_ATTACKS[color][square]: squares attacked by a pawn of that color
+PAWN_ATTACKS = [
+    [_leaper_attacks(sq, ((1, -1), (1, 1))) for sq in range(64)],
+    [_leaper_attacks(sq, ((-1, -1), (-1, 1))) for sq in range(64)],
+]
+
+ROOK_MASKS = [_relevant_mask(sq, ROOK_DIRECTIONS) for sq in range(64)]
+BISHOP_MASKS = [_relevant_mask(sq, BISHOP_DIRECTIONS) for sq in range(64)]
+
+ROOK_TABLES = [_slider_table(sq, ROOK_MASKS[sq], ROOK_DIRECTIONS) for sq in range(64)]
+BISHOP_TABLES = [_slider_table(sq, BISHOP_MASKS[sq], BISHOP_DIRECTIONS) for sq in range(64)]
+
+# Attacks on an empty board, used for quick "could this slider reach" tests
+ROOK_RAYS = [ROOK_TABLES[sq][0] for sq in range(64)]
+BISHOP_RAYS = [BISHOP_TABLES[sq][0] for sq in range(64)]
+
+
+def _line_tables():
+    """
+    Build the BETWEEN and LINE tables for every pair of squares.
+
+    Returns:
+        Tuple (between, line). between[a][b] holds the squares strictly between
+        a and b, line[a][b] the whole board-crossing line through both. Both are
+        0 when the squares do not share a rank, file or diagonal.
+    """
+    between = [[0] * 64 for _ in range(64)]
+    line = [[0] * 64 for _ in range(64)]
+    for a in range(64):
+        row, col = a >> 3, a & 7
+        for d_row, d_col in ROOK_DIRECTIONS + BISHOP_DIRECTIONS:
+            full_line = (1 << a) | _ray_attacks(a, 0, ((d_row, d_col), (-d_row, -d_col)))
+            passed = 0
+            r, c = row + d_row, col + d_col
+            while 0 <= r < 8 and 0 <= c < 8:
+                b = r * 8 + c
+                between[a][b] = passed
+                line[a][b] = full_line
+                passed |= 1 << b
+                r += d_row
+                c += d_col
+    return between, line
+
+
+BETWEEN, LINE = _line_tables()
+
+
+def rook_attacks(square, occupied):
+    """
+    Get the squares attacked by a rook.
+
+    Args:
+        square: Square index of the rook.
+        occupied: Bitboard of all occupied squares.
+
+    Returns:
+        Bitboard of attacked squares, including the first blocker on each ray.
+    """
+    return ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+
+
+def bishop_attacks(square, occupied):
+    """
+    Get the squares attacked by a bishop.
+
+    Args:
+        square: Square index of the bishop.
+        occupied: Bitboard of all occupied squares.
+
+    Returns:
+        Bitboard of attacked squares, including the first blocker on each ray.
+    """
+    return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+
+
+def queen_attacks(square, occupied):
+    """
+    Get the squares attacked by a queen.
+
+    Args:
+        square: Square index of the queen.
+        occupied: Bitboard of all occupied squares.
+
+    Returns:
+        Bitboard of attacked squares.
+    """
+    return (ROOK_TABLES[square][occupied & ROOK_MASKS[square]] |
+            BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]])
+
+
+def iter_squares(bitboard):
+    """
+    Iterate over the set squares of a bitboard, lowest first.
+
+    Args:
+        bitboard: A 64-bit integer set.
+
+    Yields:
+        Square indices.
+    """
+    while bitboard:
+        lsb = bitboard & -bitboard
+        yield lsb.bit_length() - 1
+        bitboard ^= lsb
@@ -1,5 +1,21 @@
 from abc import ABC, abstractmethod
 
+from src.board.constants import PAWN, QUEEN
+from src.board.move import NULL_MOVE, CAPTURE, EN_PASSANT, PROMOTION, QUEEN_PROMOTION
+
+# Stages of iter_moves, combinable as a bit mask
+STAGE_HASH = 1
+STAGE_CAPTURES = 2
+STAGE_KILLERS = 4
+STAGE_QUIETS = 8
+ALL_STAGES = STAGE_HASH | STAGE_CAPTURES | STAGE_KILLERS | STAGE_QUIETS
+
+# Flags of moves that belong to the captures stage rather than the quiet ones
+_TACTICAL_FLAGS = CAPTURE | PROMOTION
+
+# Piece values used by static exchange evaluation, indexed by piece type
+SEE_VALUES = (100, 300, 300, 500, 900, 20000)
+
 
 class BaseBoard(ABC):
     """
@@ -11,6 +27,11 @@ class BaseBoard(ABC):
     - 'R', 'r' = white/black rook
     - 'Q', 'q' = white/black queen
     - 'K', 'k' = white/black king
+
+    Backends also keep ``psq``, the packed piece-square score sum, and
+    ``phase``, the game phase counter, up to date as pieces move; see
+    src.board.psq. Likewise ``material_key`` packs the piece counts; see
+    src.board.material.
     """
 
     @abstractmethod
@@ -48,7 +69,56 @@ class BaseBoard(ABC):
         Execute a move on the board.
 
         Args:
-            move: A Move object representing the move to make.
+            move: A Move object, or a packed integer move as returned by
+                  generate_moves (see src.board.move for the encoding).
+        """
+        pass
+
+    @abstractmethod
+    def make_null_move(self):
+        """
+        Pass the turn to the other side without moving a piece.
+
+        Used by null-move pruning in the search; the current player must not
+        be in check. The null move is taken back with unmake_move like any
+        other. It resets the halfmove clock, so repetitions are never detected
+        across it.
+        """
+        pass
+
+    @abstractmethod
+    def set_fen(self, fen):
+        """
+        Set up the position described by a FEN string.
+
+        Args:
+            fen: The FEN string.
+
+        Raises:
+            ValueError: If the FEN string is malformed.
+        """
+        pass
+
+    @abstractmethod
+    def get_fen(self):
+        """
+        Get the FEN string of the current position.
+
+        Returns:
+            The FEN string.
+        """
+        pass
+
+    @abstractmethod
+    def unmake_move(self):
+        """
+        Take back the last move made with make_move or make_null_move.
+
+        Returns:
+            The packed integer move that was taken back (NULL_MOVE for a null move).
+
+        Raises:
+            IndexError: If there is no move to take back.
         """
         pass
 
@@ -66,6 +136,223 @@ class BaseBoard(ABC):
         """
         pass
 
+    @abstractmethod
+    def generate_moves(self):
+        """
+        Generate all legal moves of the current player in packed form.
+
+        This is the move generation entry point for search and other hot
+        paths; get_legal_moves wraps it in Move objects for the UI.
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        pass
+
+    @abstractmethod
+    def generate_captures(self):
+        """
+        Generate the legal captures, en passant captures and promotions of the current player.
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        pass
+
+    @abstractmethod
+    def generate_quiets(self):
+        """
+        Generate the legal moves of the current player that generate_captures leaves out.
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        pass
+
+    @abstractmethod
+    def is_legal_move(self, move):
+        """
+        Check whether a packed move is legal in the current position.
+
+        Args:
+            move: The packed move, e.g. a hash move or killer from another position.
+
+        Returns:
+            True if the move is legal.
+        """
+        pass
+
+    @abstractmethod
+    def piece_at(self, square):
+        """
+        Get the piece index on a square.
+
+        Args:
+            square: Square index 0-63 (row * 8 + col).
+
+        Returns:
+            The piece index (color * 6 + piece type), or EMPTY (-1).
+        """
+        pass
+
+    @abstractmethod
+    def piece_count(self, piece):
+        """
+        Count the pieces of one kind on the board.
+
+        Args:
+            piece: Piece index (color * 6 + piece type).
+
+        Returns:
+            The number of such pieces.
+        """
+        pass
+
+    @abstractmethod
+    def is_repetition(self):
+        """
+        Check whether the current position occurred before.
+
+        Only positions reached through make_move since the last set_fen are
+        known to the board.
+
+        Returns:
+            True if the position is a repetition.
+        """
+        pass
+
+    def mvv_lva(self, move):
+        """
+        Score a capture or promotion by Most Valuable Victim / Least Valuable Attacker.
+
+        Args:
+            move: A packed move from generate_captures.
+
+        Returns:
+            An integer score; higher scores should be searched first.
+        """
+        flags = move >> 12
+        score = 0
+        if flags & CAPTURE:
+            victim = PAWN if flags == EN_PASSANT else self.piece_at((move >> 6) & 63) % 6
+            score = (victim + 1) * 8
+        if flags | CAPTURE == QUEEN_PROMOTION | CAPTURE:
+            score += (QUEEN + 1) * 8
+        return score - self.piece_at(move & 63) % 6
+
+    def see(self, move):
+        """
+        Statically evaluate the exchange started by a capture.
+
+        Both sides keep recapturing on the target square with their least
+        valuable piece and may stop whenever continuing would lose material.
+        This generic version plays the exchange out with legal moves; backends
+        may override it with a faster approximation. Promotion gains are
+        ignored.
+
+        Args:
+            move: A packed capture of the current player.
+
+        Returns:
+            The expected material gain in centipawns (SEE_VALUES), which is
+            negative for a losing capture and 0 for a non-capture.
+        """
+        flags = move >> 12
+        if not flags & CAPTURE:
+            return 0
+        to_sq = (move >> 6) & 63
+        victim = PAWN if flags == EN_PASSANT else self.piece_at(to_sq) % 6
+        self.make_move(move)
+        gain = SEE_VALUES[victim] - self._see_square(to_sq)
+        self.unmake_move()
+        return gain
+
+    def _see_square(self, square):
+        """Material the side to move wins by recapturing on a square, or 0 if it should not."""
+        attackers = [move for move in self.generate_captures() if (move >> 6) & 63 == square]
+        if not attackers:
+            return 0
+        move = min(attackers, key=lambda move: self.piece_at(move & 63) % 6)
+        victim = self.piece_at(square) % 6
+        self.make_move(move)
+        gain = SEE_VALUES[victim] - self._see_square(square)
+        self.unmake_move()
+        return max(gain, 0)
+
+    def iter_moves(self, hash_move=NULL_MOVE, killers=(), stage=ALL_STAGES):
+        """
+        Lazily yield the legal moves of the current player in search order.
+
+        The stages are the hash move, captures and promotions in MVV-LVA order,
+        the killer moves, and finally the remaining quiet moves. A stage is only
+        generated once the consumer has exhausted the one before it, so a node
+        that cuts off on the hash move never generates any moves at all. The
+        board may be changed between items as long as it is restored (make_move
+        then unmake_move) before the next one is requested.
+
+        Args:
+            hash_move: Packed move to try first, e.g. from the transposition table.
+                       It is checked for legality before being yielded.
+            killers: Packed quiet moves to try after the captures; illegal or
+                     non-quiet ones are skipped.
+            stage: Bit mask of STAGE_* constants selecting the stages to run,
+                   e.g. STAGE_CAPTURES for quiescence search.
+
+        Yields:
+            Packed integer moves, each exactly once.
+        """
+        if stage & STAGE_HASH and hash_move != NULL_MOVE and self.is_legal_move(hash_move):
+            yield hash_move
+        else:
+            hash_move = NULL_MOVE
+
+        if stage & STAGE_CAPTURES:
+            for move in sorted(self.generate_captures(), key=self.mvv_lva, reverse=True):
+                if move != hash_move:
+                    yield move
+
+        played = [hash_move]
+        if stage & STAGE_KILLERS:
+            for killer in killers:
+                if (killer != NULL_MOVE and not (killer >> 12) & _TACTICAL_FLAGS and
+                        killer not in played and self.is_legal_move(killer)):
+                    played.append(killer)
+                    yield killer
+
+        if stage & STAGE_QUIETS:
+            for move in self.generate_quiets():
+                if move not in played:
+                    yield move
+
+    def add_listener(self, listener):
+        """
+        Register an observer of position changes, e.g. an evaluator that
+        updates its state incrementally instead of rescanning the board.
+
+        The board calls, after the change is complete:
+        - ``listener.moved(board, move, piece, captured)`` after make_move,
+          with the packed move, the piece index that moved and the piece
+          index it captured (the pawn for en passant, EMPTY if none), and
+          after make_null_move with NULL_MOVE, EMPTY, EMPTY
+        - ``listener.unmoved(board)`` after unmake_move
+        - ``listener.reset(board)`` after set_fen or place_piece
+
+        Args:
+            listener: Object with moved, unmoved and reset methods.
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregister an observer added with add_listener.
+
+        Args:
+            listener: The observer; ignored if it is not registered.
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
     @abstractmethod
     def get_board_state(self):
         """
@@ -89,6 +376,36 @@ class BaseBoard(ABC):
         """
         pass
 
+    @abstractmethod
+    def is_square_attacked(self, square, color):
+        """
+        Check if a square is attacked by the pieces of a color.
+
+        Args:
+            square: Square index 0-63 (row * 8 + col).
+            color: 'w' for white, 'b' for black, the attacking side.
+
+        Returns:
+            True if the square is attacked, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    def attack_map(self, color):
+        """
+        Get all squares attacked by the pieces of a color.
+
+        The map is computed at most once per position and reused by is_check,
+        is_square_attacked and castling legality until the next move.
+
+        Args:
+            color: 'w' for white, 'b' for black.
+
+        Returns:
+            64-bit integer with bit ``row * 8 + col`` set for every attacked square.
+        """
+        pass
+
     @abstractmethod
     def get_current_player(self):
         """
@@ -97,4 +414,19 @@ class BaseBoard(ABC):
         Returns:
             'w' for white, 'b' for black.
         """
-        pass
\ No newline at end of file
+        pass
+
+    @property
+    @abstractmethod
+    def hash(self):
+        """
+        Get the 64-bit Zobrist key of the current position.
+
+        The key covers piece placement, side to move, castling rights and the
+        en passant file, and is maintained incrementally by make_move and
+        unmake_move so reading it costs nothing.
+
+        Returns:
+            The position key as an integer.
+        """
+        pass
@@ -0,0 +1,498 @@
+"""
+Batched position encoding and legal move generation with NumPy.
+
+Dataset generation and neural evaluation handle positions in bulk, so this
+module works on whole batches at once instead of one BaseBoard at a time. A
+batch is N positions given as an (N, 12) uint64 array of piece bitboards in
+piece index order (color * 6 + piece type, bit ``row * 8 + col``), or as the
+equivalent (N, 12, 64) 0/1 planes, plus per-position side to move, castling
+rights and en passant square.
+
+Every piece of every position becomes one row of a flat table and all rows
+are processed with vectorized array operations. Leaper attacks index the
+lookup lists from ``src.board.attacks`` directly. The slider tables there are
+dicts keyed by the masked occupancy; here they are flattened into one dense
+array per slider type and indexed with a software PEXT of the occupancy, so
+a whole batch of lookups is a single gather.
+
+Legality follows the BitBoard backend: check-evasion masks, pin lines, king
+moves against attacks with the king lifted off the board, and a full test
+for en passant.
+"""
+import numpy as np
+
+from src.board.attacks import (
+    FULL, RANK_1, RANK_3, RANK_6, RANK_8,
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, LINE,
+    ROOK_TABLES, ROOK_MASKS, ROOK_RAYS, BISHOP_TABLES, BISHOP_MASKS, BISHOP_RAYS
+)
+from src.board.constants import (
+    WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PIECE_INDEX, CASTLING_CHARS,
+    WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE
+)
+from src.board.move import (
+    NULL_MOVE, DOUBLE_PUSH, KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT, PROMOTION
+)
+from src.utils.fen import parse_fen
+
+_FULL = np.uint64(FULL)
+_ZERO = np.uint64(0)
+_ONE = np.uint64(1)
+
+# Single-bit bitboard per square
+_BITS = _ONE << np.arange(64, dtype=np.uint64)
+
+_KNIGHT_ATTACKS = np.array(KNIGHT_ATTACKS, dtype=np.uint64)
+_KING_ATTACKS = np.array(KING_ATTACKS, dtype=np.uint64)
+_PAWN_ATTACKS = np.array(PAWN_ATTACKS, dtype=np.uint64)  # [color][square]
+_BETWEEN = np.array(BETWEEN, dtype=np.uint64)
+_LINE = np.array(LINE, dtype=np.uint64)
+_ROOK_RAYS = np.array(ROOK_RAYS, dtype=np.uint64)
+_BISHOP_RAYS = np.array(BISHOP_RAYS, dtype=np.uint64)
+
+# Per color: push direction, rank reached by a double push's first step, promotion rank
+_PUSH = np.array([8, -8], dtype=np.int64)
+_DOUBLE_PUSH_RANK = np.array([RANK_3, RANK_6], dtype=np.uint64)
+_PROMOTION_RANK = np.array([RANK_8, RANK_1], dtype=np.uint64)
+
+# Promotion flags, queen first like the board backends
+_PROMOTION_FLAGS = np.array([PROMOTION | bits for bits in (3, 2, 1, 0)], dtype=np.uint16)
+
+# Castling: (color, right, king from, rook from, squares that must be empty,
+# squares the king crosses that must not be attacked, packed move)
+_CASTLING_MOVES = (
+    (WHITE, WHITE_KINGSIDE, 4, 7, 0x60, 0x60, 4 | (6 << 6) | (KING_CASTLE << 12)),
+    (WHITE, WHITE_QUEENSIDE, 4, 0, 0x0E, 0x0C, 4 | (2 << 6) | (QUEEN_CASTLE << 12)),
+    (BLACK, BLACK_KINGSIDE, 60, 63, 0x60 << 56, 0x60 << 56, 60 | (62 << 6) | (KING_CASTLE << 12)),
+    (BLACK, BLACK_QUEENSIDE, 60, 56, 0x0E << 56, 0x0C << 56, 60 | (58 << 6) | (QUEEN_CASTLE << 12)),
+)
+
+
+def _dense_slider_table(masks, tables):
+    """
+    Flatten per-square slider dicts into arrays for vectorized PEXT lookups.
+
+    Enumerating the subsets of a mask in increasing numeric order visits them
+    in increasing PEXT index order, so each square's dict values sorted by key
+    form a dense table indexed by the PEXT of the masked occupancy.
+
+    Args:
+        masks: Relevant occupancy mask per square.
+        tables: Attack dict per square, keyed by masked occupancy.
+
+    Returns:
+        Tuple (bit_squares, bit_weights, offsets, attacks): the square of the
+        j-th mask bit per square, 1 << j for real mask bits (0 for padding),
+        the start of each square's block in attacks, and the flat attack array.
+    """
+    width = max(bin(mask).count('1') for mask in masks)
+    bit_squares = np.zeros((64, width), dtype=np.uint64)
+    bit_weights = np.zeros((64, width), dtype=np.uint64)
+    offsets = np.zeros(64, dtype=np.int64)
+    attacks = []
+    for square in range(64):
+        bits = [sq for sq in range(64) if masks[square] >> sq & 1]
+        bit_squares[square, :len(bits)] = bits
+        bit_weights[square, :len(bits)] = [1 << j for j in range(len(bits))]
+        offsets[square] = len(attacks)
+        table = tables[square]
+        attacks.extend(table[subset] for subset in sorted(table))
+    return bit_squares, bit_weights, offsets, np.array(attacks, dtype=np.uint64)
+
+
+_ROOK_DENSE = _dense_slider_table(ROOK_MASKS, ROOK_TABLES)
+_BISHOP_DENSE = _dense_slider_table(BISHOP_MASKS, BISHOP_TABLES)
+
+
+def _slider_attacks(dense, squares, occupied):
+    """
+    Look up slider attacks for many (square, occupancy) pairs at once.
+
+    Args:
+        dense: _ROOK_DENSE or _BISHOP_DENSE.
+        squares: int array of slider squares.
+        occupied: uint64 array of occupancies, same length.
+
+    Returns:
+        uint64 array of attack sets.
+    """
+    bit_squares, bit_weights, offsets, attacks = dense
+    index = offsets[squares].astype(np.uint64)
+    for j in range(bit_squares.shape[1]):
+        index += ((occupied >> bit_squares[squares, j]) & _ONE) * bit_weights[squares, j]
+    return attacks[index]
+
+
+def _popcount(bitboards):
+    """Count the set bits of each element of a uint64 array."""
+    return np.bitwise_count(bitboards).astype(np.int64)
+
+
+def _lsb(bitboards):
+    """Square of the lowest set bit of each nonzero element of a uint64 array."""
+    return np.bitwise_count((bitboards & (~bitboards + _ONE)) - _ONE).astype(np.int64)
+
+
+def _expand(bitboards):
+    """
+    List the set bits of a uint64 array.
+
+    Returns:
+        Tuple (rows, squares) of int arrays, one entry per set bit.
+    """
+    planes = np.unpackbits(np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8)
+                           .reshape(-1, 8), axis=1, bitorder='little')
+    return np.nonzero(planes)
+
+
+class PositionBatch:
+    """
+    A batch of N chess positions held as NumPy arrays.
+
+    Attributes:
+        bitboards: (N, 12) uint64 piece bitboards in piece index order.
+        side: (N,) uint8 side to move, WHITE or BLACK.
+        castling: (N,) uint8 castling right bits.
+        ep_square: (N,) int8 en passant target square 0-63, or -1.
+    """
+
+    def __init__(self, bitboards, side=None, castling=None, ep_square=None):
+        """
+        Initialize the batch.
+
+        Args:
+            bitboards: (N, 12) uint64 bitboards or (N, 12, 64) 0/1 planes.
+            side: Optional (N,) side to move array, defaults to White.
+            castling: Optional (N,) castling rights array, defaults to none.
+            ep_square: Optional (N,) en passant square array, defaults to none (-1).
+
+        Raises:
+            ValueError: If the bitboard array has neither accepted shape.
+        """
+        bitboards = np.asarray(bitboards)
+        if bitboards.ndim == 3 and bitboards.shape[1:] == (12, 64):
+            packed = np.packbits(bitboards.astype(np.uint8), axis=2, bitorder='little')
+            bitboards = packed.view('<u8').reshape(-1, 12)
+        if bitboards.ndim != 2 or bitboards.shape[1] != 12:
+            raise ValueError(f"Expected (N, 12) or (N, 12, 64) bitboards, got shape {bitboards.shape}")
+
+        size = len(bitboards)
+        self.bitboards = bitboards.astype(np.uint64)
+        self.side = np.zeros(size, np.uint8) if side is None else np.asarray(side, np.uint8)
+        self.castling = np.zeros(size, np.uint8) if castling is None else np.asarray(castling, np.uint8)
+        self.ep_square = np.full(size, -1, np.int8) if ep_square is None else np.asarray(ep_square, np.int8)
+
+    def __len__(self):
+        return len(self.bitboards)
+
+    @classmethod
+    def from_fens(cls, fens):
+        """
+        Build a batch from FEN strings.
+
+        Args:
+            fens: Iterable of FEN strings.
+
+        Returns:
+            A PositionBatch.
+
+        Raises:
+            ValueError: If a FEN string is malformed.
+        """
+        bitboards, side, castling, ep_square = [], [], [], []
+        for fen in fens:
+            state = parse_fen(fen)
+            pieces = [0] * 12
+            for row in range(8):
+                for col in range(8):
+                    piece = state['placement'][row][col]
+                    if piece != ' ':
+                        pieces[PIECE_INDEX[piece]] |= 1 << (row * 8 + col)
+            bitboards.append(pieces)
+            side.append(WHITE if state['turn'] == 'w' else BLACK)
+            castling.append(sum(right for char, right in CASTLING_CHARS if char in state['castling']))
+            ep = state['en_passant']
+            ep_square.append(ep[0] * 8 + ep[1] if ep else -1)
+        return cls(np.array(bitboards, dtype=np.uint64).reshape(-1, 12), side, castling, ep_square)
+
+    @classmethod
+    def from_boards(cls, boards):
+        """
+        Build a batch from board objects.
+
+        BitBoard instances are read directly; other backends go through FEN.
+
+        Args:
+            boards: Iterable of BaseBoard instances.
+
+        Returns:
+            A PositionBatch.
+        """
+        from src.board.bit_board import BitBoard
+
+        boards = list(boards)
+        if not all(isinstance(board, BitBoard) for board in boards):
+            return cls.from_fens(board.get_fen() for board in boards)
+        return cls(np.array([board.pieces for board in boards], dtype=np.uint64).reshape(-1, 12),
+                   [board.side for board in boards],
+                   [board.castling for board in boards],
+                   [board.ep_square for board in boards])
+
+    def planes(self):
+        """
+        Encode the piece placement as 0/1 planes, e.g. as neural network input.
+
+        Returns:
+            (N, 12, 64) uint8 array; plane p, index row * 8 + col.
+        """
+        raw = np.ascontiguousarray(self.bitboards, dtype='<u8').view(np.uint8).reshape(-1, 12, 8)
+        return np.unpackbits(raw, axis=2, bitorder='little')
+
+    def attack_sets(self):
+        """
+        Get the squares attacked by each side.
+
+        Returns:
+            (N, 2) uint64 array indexed [position, color].
+        """
+        occupied = np.bitwise_or.reduce(self.bitboards, axis=1)
+        rows, piece, square = self._pieces()
+        attacks = self._piece_attacks(piece, square, occupied[rows])
+        result = np.zeros((len(self), 2), dtype=np.uint64)
+        np.bitwise_or.at(result, (rows, piece // 6), attacks)
+        return result
+
+    def legal_move_counts(self):
+        """
+        Count the legal moves of each position.
+
+        Returns:
+            (N,) int64 array.
+        """
+        targets, extra = self._legal_targets()
+        rows, from_sq, piece, bits = targets
+        counts = _popcount(bits)
+        is_pawn = piece % 6 == PAWN
+        # Every promotion target stands for four moves
+        counts[is_pawn] += 3 * _popcount(bits[is_pawn] & _PROMOTION_RANK[self.side[rows[is_pawn]]])
+        total = np.bincount(rows, weights=counts, minlength=len(self)).astype(np.int64)
+        return total + np.bincount(extra[0], minlength=len(self))
+
+    def legal_moves(self):
+        """
+        Generate the legal moves of each position in packed form.
+
+        Moves use the 16-bit encoding of src.board.move. The order of moves
+        within a position is unspecified.
+
+        Returns:
+            Tuple (moves, counts): (N, M) uint16 moves padded with NULL_MOVE,
+            where M is the largest move count, and the (N,) int64 move counts.
+        """
+        rows, moves = self._packed_moves()
+        counts = np.bincount(rows, minlength=len(self)).astype(np.int64)
+        order = np.argsort(rows, kind='stable')
+        rows, moves = rows[order], moves[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        columns = np.arange(len(rows)) - starts[rows]
+        result = np.full((len(self), int(counts.max(initial=0))), NULL_MOVE, dtype=np.uint16)
+        result[rows, columns] = moves
+        return result, counts
+
+    def move_masks(self):
+        """
+        Mark the legal (from, to) square pairs of each position.
+
+        Promotions to different pieces share one entry. This is the usual
+        policy-head layout for neural networks.
+
+        Returns:
+            (N, 64, 64) bool array indexed [position, from, to].
+        """
+        rows, moves = self._packed_moves()
+        masks = np.zeros((len(self), 64, 64), dtype=bool)
+        masks[rows, moves & 63, (moves >> 6) & 63] = True
+        return masks
+
+    def _pieces(self):
+        """
+        List every piece of every position.
+
+        Returns:
+            Tuple (rows, pieces, squares) of int64 arrays, one entry per piece.
+        """
+        rows, squares = _expand(self.bitboards.reshape(-1))
+        return rows // 12, rows % 12, squares
+
+    @staticmethod
+    def _piece_attacks(piece, square, occupied):
+        """
+        Compute the attack set of each listed piece.
+
+        Args:
+            piece: Piece indices.
+            square: Squares 0-63.
+            occupied: Occupancy bitboard per entry.
+
+        Returns:
+            uint64 array of attack sets.
+        """
+        piece_type = piece % 6
+        attacks = np.zeros(len(piece), dtype=np.uint64)
+
+        selected = piece_type == PAWN
+        attacks[selected] = _PAWN_ATTACKS[piece[selected] // 6, square[selected]]
+        selected = piece_type == KNIGHT
+        attacks[selected] = _KNIGHT_ATTACKS[square[selected]]
+        selected = piece_type == KING
+        attacks[selected] = _KING_ATTACKS[square[selected]]
+        selected = (piece_type == BISHOP) | (piece_type == QUEEN)
+        attacks[selected] |= _slider_attacks(_BISHOP_DENSE, square[selected], occupied[selected])
+        selected = (piece_type == ROOK) | (piece_type == QUEEN)
+        attacks[selected] |= _slider_attacks(_ROOK_DENSE, square[selected], occupied[selected])
+        return attacks
+
+    def _legal_targets(self):
+        """
+        Compute the legal destination set of every piece of the side to move.
+
+        Returns:
+            Tuple (targets, extra). targets is (rows, from squares, pieces,
+            destination bitboards) for normal moves including promotions;
+            extra is (rows, packed moves) for en passant and castling.
+        """
+        size = len(self)
+        index = np.arange(size)
+        bitboards = self.bitboards
+        us = self.side.astype(np.int64)
+        them = us ^ 1
+
+        colors = bitboards.reshape(size, 2, 6)
+        occupancy = np.bitwise_or.reduce(colors, axis=2)
+        own = occupancy[index, us]
+        enemy = occupancy[index, them]
+        occupied = own | enemy
+
+        enemy_pieces = colors[index, them]  # (N, 6) by piece type
+        enemy_diagonal = enemy_pieces[:, BISHOP] | enemy_pieces[:, QUEEN]
+        enemy_straight = enemy_pieces[:, ROOK] | enemy_pieces[:, QUEEN]
+
+        rows, piece, square = self._pieces()
+        king = np.zeros(size, dtype=np.int64)
+        is_king = piece == us[rows] * 6 + KING
+        king[rows[is_king]] = square[is_king]
+        king_bit = _BITS[king]
+
+        # Checkers and the check-evasion target mask
+        checkers = ((_PAWN_ATTACKS[us, king] & enemy_pieces[:, PAWN]) |
+                    (_KNIGHT_ATTACKS[king] & enemy_pieces[:, KNIGHT]) |
+                    (_slider_attacks(_BISHOP_DENSE, king, occupied) & enemy_diagonal) |
+                    (_slider_attacks(_ROOK_DENSE, king, occupied) & enemy_straight))
+        check_count = _popcount(checkers)
+        target_mask = np.full(size, _FULL, dtype=np.uint64)
+        single = check_count == 1
+        target_mask[single] = _BETWEEN[king[single], _lsb(checkers[single])] | checkers[single]
+        target_mask[check_count > 1] = _ZERO
+
+        # Pinned pieces: exactly one own piece between the king and an enemy slider
+        snipers = (_ROOK_RAYS[king] & enemy_straight) | (_BISHOP_RAYS[king] & enemy_diagonal)
+        is_sniper = (_BITS[square] & snipers[rows]) != 0
+        sniper_rows = rows[is_sniper]
+        blockers = _BETWEEN[king[sniper_rows], square[is_sniper]] & occupied[sniper_rows]
+        pinning = (_popcount(blockers) == 1) & ((blockers & own[sniper_rows]) != 0)
+        pinned = np.zeros(size, dtype=np.uint64)
+        np.bitwise_or.at(pinned, sniper_rows[pinning], blockers[pinning])
+
+        # Squares the king may not step to: enemy attacks with the king lifted off
+        is_enemy = piece // 6 == them[rows]
+        enemy_rows = rows[is_enemy]
+        danger = np.zeros(size, dtype=np.uint64)
+        np.bitwise_or.at(danger, enemy_rows, self._piece_attacks(
+            piece[is_enemy], square[is_enemy], occupied[enemy_rows] ^ king_bit[enemy_rows]))
+
+        # Destination sets of the side to move's pieces
+        is_own = ~is_enemy
+        rows, piece, square = rows[is_own], piece[is_own], square[is_own]
+        piece_type = piece % 6
+        color = piece // 6
+        from_bit = _BITS[square]
+
+        targets = self._piece_attacks(piece, square, occupied[rows]) & ~own[rows]
+        is_pawn = piece_type == PAWN
+        pawn_rows = rows[is_pawn]
+        pawn_color = color[is_pawn]
+        empty = ~occupied[pawn_rows]
+        push = _PUSH[pawn_color]
+        pawn_bit = from_bit[is_pawn]
+        single_push = np.where(push > 0, pawn_bit << np.uint64(8), pawn_bit >> np.uint64(8)) & empty
+        double_push = single_push & _DOUBLE_PUSH_RANK[pawn_color]
+        double_push = np.where(push > 0, double_push << np.uint64(8), double_push >> np.uint64(8)) & empty
+        targets[is_pawn] = (targets[is_pawn] & enemy[pawn_rows]) | single_push | double_push
+
+        is_king_row = piece_type == KING
+        targets[is_king_row] &= ~danger[rows[is_king_row]]
+        others = ~is_king_row
+        targets[others] &= target_mask[rows[others]]
+        is_pinned = others & ((from_bit & pinned[rows]) != 0)
+        targets[is_pinned] &= _LINE[king[rows[is_pinned]], square[is_pinned]]
+
+        extra_rows, extra_moves = [], []
+
+        # En passant, with a full king safety test on the resulting occupancy
+        ep = self.ep_square.astype(np.int64)
+        can_ep = (ep[rows] >= 0) & is_pawn
+        if can_ep.any():
+            ep_to = ep[rows[can_ep]]
+            ep_rows = rows[can_ep]
+            ep_from = square[can_ep]
+            attacks_ep = (_PAWN_ATTACKS[color[can_ep], ep_from] & _BITS[ep_to]) != 0
+            ep_rows, ep_from, ep_to = ep_rows[attacks_ep], ep_from[attacks_ep], ep_to[attacks_ep]
+            captured_bit = _BITS[ep_to - _PUSH[us[ep_rows]]]
+            after = occupied[ep_rows] ^ _BITS[ep_from] ^ _BITS[ep_to] ^ captured_bit
+            ep_king = king[ep_rows]
+            attacked = ((_PAWN_ATTACKS[us[ep_rows], ep_king] & enemy_pieces[ep_rows, PAWN] & ~captured_bit) |
+                        (_KNIGHT_ATTACKS[ep_king] & enemy_pieces[ep_rows, KNIGHT]) |
+                        (_slider_attacks(_BISHOP_DENSE, ep_king, after) & enemy_diagonal[ep_rows]) |
+                        (_slider_attacks(_ROOK_DENSE, ep_king, after) & enemy_straight[ep_rows]))
+            legal = attacked == 0
+            extra_rows.append(ep_rows[legal])
+            extra_moves.append(ep_from[legal] | (ep_to[legal] << 6) | (EN_PASSANT << 12))
+
+        # Castling
+        castling = self.castling
+        for castle_color, right, king_from, rook_from, between, path, move in _CASTLING_MOVES:
+            rook = bitboards[:, castle_color * 6 + ROOK]
+            legal = ((us == castle_color) & ((castling & right) != 0) & (check_count == 0) &
+                     (king == king_from) & ((rook & _BITS[rook_from]) != 0) &
+                     ((occupied & np.uint64(between)) == 0) & ((danger & np.uint64(path)) == 0))
+            extra_rows.append(index[legal])
+            extra_moves.append(np.full(int(legal.sum()), move, dtype=np.int64))
+
+        extra = (np.concatenate(extra_rows).astype(np.int64), np.concatenate(extra_moves).astype(np.int64))
+        return (rows, square, piece, targets), extra
+
+    def _packed_moves(self):
+        """
+        Generate all legal moves as a flat list.
+
+        Returns:
+            Tuple (rows, moves): int64 position index and uint16 packed move per move.
+        """
+        (rows, from_sq, piece, targets), (extra_rows, extra_moves) = self._legal_targets()
+        target_rows, to_sq = _expand(targets)
+        move_rows = rows[target_rows]
+        from_sq = from_sq[target_rows]
+        is_pawn = piece[target_rows] % 6 == PAWN
+
+        enemy = self.bitboards.reshape(-1, 2, 6)[move_rows, self.side[move_rows] ^ 1]
+        is_capture = (np.bitwise_or.reduce(enemy, axis=1) & _BITS[to_sq]) != 0
+        flags = np.where(is_capture, CAPTURE, 0)
+        flags[is_pawn & (np.abs(to_sq - from_sq) == 16)] = DOUBLE_PUSH
+        moves = (from_sq | (to_sq << 6) | (flags << 12)).astype(np.uint16)
+
+        promotes = is_pawn & ((to_sq >> 3) % 7 == 0)
+        promotion_moves = (moves[promotes][:, None] | (_PROMOTION_FLAGS[None, :] << np.uint16(12))).reshape(-1)
+        promotion_rows = np.repeat(move_rows[promotes], len(_PROMOTION_FLAGS))
+
+        return (np.concatenate((move_rows[~promotes], promotion_rows, extra_rows)),
+                np.concatenate((moves[~promotes], promotion_moves, extra_moves.astype(np.uint16))))
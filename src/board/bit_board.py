@@ -0,0 +1,879 @@
+from array import array
+
+from src.board.base_board import BaseBoard, SEE_VALUES
+from src.board.move import (
+    Move, NULL_MOVE, DOUBLE_PUSH, KING_CASTLE, QUEEN_CASTLE, CAPTURE, EN_PASSANT, PROMOTION
+)
+from src.board.attacks import (
+    FULL, RANK_1, RANK_3, RANK_6, RANK_8, NOT_FILE_A, NOT_FILE_H,
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, LINE,
+    ROOK_TABLES, ROOK_MASKS, ROOK_RAYS, BISHOP_TABLES, BISHOP_MASKS, BISHOP_RAYS
+)
+from src.board.constants import (
+    WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, EMPTY,
+    PIECE_CHARS, PIECE_INDEX, CASTLING_CHARS, CASTLING_MASK, POSITIONS, square_index,
+    WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE
+)
+from src.board.zobrist import PIECE_KEYS, SIDE_KEY, CASTLING_KEYS, EP_KEYS, hash_position
+from src.board.material import MATERIAL_WEIGHTS
+from src.board.psq import PSQ_SCORES, PHASE_WEIGHTS
+from src.utils.fen import START_FEN, parse_fen, build_fen
+
+# Piece characters indexed by piece index; index EMPTY (-1) maps to ' '
+_BOARD_CHARS = PIECE_CHARS + ' '
+
+# Flag bits of packed moves, already shifted into place
+_DOUBLE_PUSH = DOUBLE_PUSH << 12
+_CAPTURE = CAPTURE << 12
+_EN_PASSANT = EN_PASSANT << 12
+_KING_CASTLE = KING_CASTLE << 12
+_QUEEN_CASTLE = QUEEN_CASTLE << 12
+
+# Promotion flag bits (queen first so the UI picks a queen by default)
+_PROMOTIONS = tuple((PROMOTION | bits) << 12 for bits in (3, 2, 1, 0))
+_PROMOTION_CAPTURES = tuple((PROMOTION | CAPTURE | bits) << 12 for bits in (3, 2, 1, 0))
+
+# Undo records are stored flat: move, captured piece, castling rights, en
+# passant square, halfmove clock and position key for every ply
+_UNDO_SIZE = 6
+_UNDO_CAPACITY = 256
+
+# Castling moves per color:
+# (right, king from, rook from, squares that must be empty,
+#  squares the king crosses that must not be attacked, packed move)
+_CASTLING_MOVES = (
+    ((WHITE_KINGSIDE, 4, 7, 0x60, 0x60, 4 | (6 << 6) | _KING_CASTLE),
+     (WHITE_QUEENSIDE, 4, 0, 0x0E, 0x0C, 4 | (2 << 6) | _QUEEN_CASTLE)),
+    ((BLACK_KINGSIDE, 60, 63, 0x60 << 56, 0x60 << 56, 60 | (62 << 6) | _KING_CASTLE),
+     (BLACK_QUEENSIDE, 60, 56, 0x0E << 56, 0x0C << 56, 60 | (58 << 6) | _QUEEN_CASTLE)),
+)
+
+
+class BitBoard(BaseBoard):
+    """
+    Bitboard representation of a chess board.
+
+    Every piece type of every color is kept as a 64-bit integer set with bit
+    ``row * 8 + col`` set for each square it occupies. A 64-entry mailbox of
+    piece indices is kept alongside for O(1) "what is on this square" lookups.
+    Attacks come from the precomputed tables in ``src.board.attacks``.
+    """
+
+    def __init__(self, fen=None):
+        """
+        Initialize the board.
+
+        Args:
+            fen: Optional FEN string to set up. Defaults to the initial position.
+        """
+        self.pieces = [0] * 12  # Bitboard per piece index (color * 6 + piece type)
+        self.occupancy = [0, 0]  # Bitboard of all pieces per color
+        self.mailbox = [EMPTY] * 64  # Piece index per square
+        self.side = WHITE
+        self.castling = 0
+        self.ep_square = -1
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self._hash = 0  # Zobrist key, updated incrementally by _put and _remove
+        self.psq = 0  # Packed piece-square score sum, updated like the key (see src.board.psq)
+        self.phase = 0  # Game phase counter, likewise
+        self.material_key = 0  # Piece counts, likewise (see src.board.material)
+        self._undo = [0] * (_UNDO_SIZE * _UNDO_CAPACITY)  # Preallocated undo records
+        self._ply = 0  # Number of undo records in use
+        self._attack_maps = [-1, -1]  # Squares attacked per color, -1 until computed
+        self.listeners = []  # Observers of position changes, see BaseBoard.add_listener
+
+        if fen is None:
+            self.initialize()
+        else:
+            self.set_fen(fen)
+
+    def initialize(self):
+        """Set up the initial position of pieces on the board."""
+        self.set_fen(START_FEN)
+
+    def set_fen(self, fen):
+        """
+        Set up the position described by a FEN string.
+
+        Args:
+            fen: The FEN string.
+
+        Raises:
+            ValueError: If the FEN string is malformed.
+        """
+        state = parse_fen(fen)
+
+        self.pieces = [0] * 12
+        self.occupancy = [0, 0]
+        self.mailbox = [EMPTY] * 64
+        self.psq = self.phase = self.material_key = 0
+        for row in range(8):
+            for col in range(8):
+                piece = state['placement'][row][col]
+                if piece != ' ':
+                    self._put(PIECE_INDEX[piece], row * 8 + col)
+
+        self.side = WHITE if state['turn'] == 'w' else BLACK
+        self.castling = 0
+        for char, right in CASTLING_CHARS:
+            if char in state['castling']:
+                self.castling |= right
+
+        ep = state['en_passant']
+        self.ep_square = ep[0] * 8 + ep[1] if ep else -1
+        self.halfmove_clock = state['halfmove']
+        self.fullmove_number = state['fullmove']
+        self._ply = 0
+        self._hash = self._compute_hash()
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        for listener in self.listeners:
+            listener.reset(self)
+
+    def get_fen(self):
+        """
+        Get the FEN string of the current position.
+
+        Returns:
+            The FEN string.
+        """
+        castling = ''.join(char for char, right in CASTLING_CHARS if self.castling & right)
+        ep = POSITIONS[self.ep_square] if self.ep_square >= 0 else None
+        return build_fen(self.get_board_state(), self.get_current_player(), castling, ep,
+                         self.halfmove_clock, self.fullmove_number)
+
+    def get_piece(self, position):
+        """
+        Get the piece at the specified position.
+
+        Args:
+            position: A tuple (row, col) specifying the position.
+
+        Returns:
+            A character representing the piece, or ' ' for an empty square.
+        """
+        row, col = position
+        if 0 <= row < 8 and 0 <= col < 8:
+            return _BOARD_CHARS[self.mailbox[row * 8 + col]]
+        return ' '
+
+    def place_piece(self, piece, position):
+        """
+        Place a piece at the specified position, replacing whatever is there.
+
+        Args:
+            piece: A character representing the piece, or ' ' to clear the square.
+            position: A tuple (row, col) specifying the position.
+        """
+        row, col = position
+        if not (0 <= row < 8 and 0 <= col < 8):
+            return
+        square = row * 8 + col
+        if self.mailbox[square] != EMPTY:
+            self._remove(self.mailbox[square], square)
+        if piece and piece != ' ':
+            self._put(PIECE_INDEX[piece], square)
+        self._hash = self._compute_hash()
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        for listener in self.listeners:
+            listener.reset(self)
+
+    def make_move(self, move):
+        """
+        Execute a move on the board.
+
+        Args:
+            move: A Move object, or a packed integer move from generate_moves.
+        """
+        if not isinstance(move, int):
+            move = move.to_int()
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        flags = move >> 12
+        us = self.side
+        mailbox = self.mailbox
+        piece = mailbox[from_sq]
+        captured = mailbox[to_sq]
+
+        undo = self._undo
+        index = self._ply * _UNDO_SIZE
+        if index == len(undo):
+            undo.extend([0] * len(undo))
+        undo[index] = move
+        undo[index + 2] = self.castling
+        undo[index + 3] = self.ep_square
+        undo[index + 4] = self.halfmove_clock
+        undo[index + 5] = self._hash
+        self._ply += 1
+
+        # Take the old castling rights and en passant file out of the key
+        ep = self.ep_square
+        if ep >= 0 and PAWN_ATTACKS[us ^ 1][ep] & self.pieces[us * 6 + PAWN]:
+            self._hash ^= EP_KEYS[ep & 7]
+        self._hash ^= CASTLING_KEYS[self.castling]
+
+        if captured != EMPTY:
+            self._remove(captured, to_sq)
+        self._remove(piece, from_sq)
+
+        if flags & PROMOTION:
+            self._put(us * 6 + KNIGHT + (flags & 3), to_sq)
+        else:
+            self._put(piece, to_sq)
+
+        if flags == EN_PASSANT:
+            captured_sq = to_sq - 8 if us == WHITE else to_sq + 8
+            captured = mailbox[captured_sq]
+            self._remove(captured, captured_sq)
+        elif flags == KING_CASTLE:
+            self._remove(us * 6 + ROOK, from_sq + 3)
+            self._put(us * 6 + ROOK, from_sq + 1)
+        elif flags == QUEEN_CASTLE:
+            self._remove(us * 6 + ROOK, from_sq - 4)
+            self._put(us * 6 + ROOK, from_sq - 1)
+
+        undo[index + 1] = captured
+        self.castling &= CASTLING_MASK[from_sq] & CASTLING_MASK[to_sq]
+        key = self._hash ^ CASTLING_KEYS[self.castling] ^ SIDE_KEY
+
+        if flags == DOUBLE_PUSH:
+            ep = (from_sq + to_sq) >> 1
+            self.ep_square = ep
+            if PAWN_ATTACKS[us][ep] & self.pieces[(us ^ 1) * 6 + PAWN]:
+                key ^= EP_KEYS[ep & 7]
+        else:
+            self.ep_square = -1
+        self._hash = key
+
+        if piece % 6 == PAWN or captured != EMPTY:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if us == BLACK:
+            self.fullmove_number += 1
+
+        self.side = us ^ 1
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        for listener in self.listeners:
+            listener.moved(self, move, piece, captured)
+
+    def make_null_move(self):
+        """
+        Pass the turn to the other side without moving a piece.
+
+        The undo record holds NULL_MOVE, which unmake_move recognizes.
+        """
+        undo = self._undo
+        index = self._ply * _UNDO_SIZE
+        if index == len(undo):
+            undo.extend([0] * len(undo))
+        undo[index] = NULL_MOVE
+        undo[index + 1] = EMPTY
+        undo[index + 2] = self.castling
+        undo[index + 3] = self.ep_square
+        undo[index + 4] = self.halfmove_clock
+        undo[index + 5] = self._hash
+        self._ply += 1
+
+        us = self.side
+        ep = self.ep_square
+        if ep >= 0 and PAWN_ATTACKS[us ^ 1][ep] & self.pieces[us * 6 + PAWN]:
+            self._hash ^= EP_KEYS[ep & 7]
+        self._hash ^= SIDE_KEY
+        self.ep_square = -1
+        self.halfmove_clock = 0  # Keeps is_repetition from looking past the null move
+        if us == BLACK:
+            self.fullmove_number += 1
+        self.side = us ^ 1
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        for listener in self.listeners:
+            listener.moved(self, NULL_MOVE, EMPTY, EMPTY)
+
+    def unmake_move(self):
+        """
+        Take back the last move made with make_move or make_null_move.
+
+        Returns:
+            The packed integer move that was taken back (NULL_MOVE for a null move).
+
+        Raises:
+            IndexError: If there is no move to take back.
+        """
+        if not self._ply:
+            raise IndexError("No move to unmake")
+
+        self._ply -= 1
+        maps = self._attack_maps
+        maps[0] = maps[1] = -1
+        undo = self._undo
+        index = self._ply * _UNDO_SIZE
+        move = undo[index]
+        captured = undo[index + 1]
+        self.castling = undo[index + 2]
+        self.ep_square = undo[index + 3]
+        self.halfmove_clock = undo[index + 4]
+
+        us = self.side ^ 1
+        self.side = us
+        if us == BLACK:
+            self.fullmove_number -= 1
+
+        if move == NULL_MOVE:
+            self._hash = undo[index + 5]
+            for listener in self.listeners:
+                listener.unmoved(self)
+            return move
+
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        flags = move >> 12
+        piece = self.mailbox[to_sq]
+        self._remove(piece, to_sq)
+        self._put(us * 6 + PAWN if flags & PROMOTION else piece, from_sq)
+
+        if flags == EN_PASSANT:
+            self._put(captured, to_sq - 8 if us == WHITE else to_sq + 8)
+        elif captured != EMPTY:
+            self._put(captured, to_sq)
+        elif flags == KING_CASTLE:
+            self._remove(us * 6 + ROOK, from_sq + 1)
+            self._put(us * 6 + ROOK, from_sq + 3)
+        elif flags == QUEEN_CASTLE:
+            self._remove(us * 6 + ROOK, from_sq - 1)
+            self._put(us * 6 + ROOK, from_sq - 4)
+
+        self._hash = undo[index + 5]
+        for listener in self.listeners:
+            listener.unmoved(self)
+        return move
+
+    def get_legal_moves(self, position=None):
+        """
+        Get all legal moves for the specified position or for all pieces of the current player.
+
+        Args:
+            position: Optional tuple (row, col) specifying the position.
+                     If None, return all legal moves for the current player.
+
+        Returns:
+            A list of Move objects representing legal moves.
+        """
+        if position is None:
+            mask = FULL
+        else:
+            row, col = position
+            if not (0 <= row < 8 and 0 <= col < 8):
+                return []
+            mask = 1 << square_index(position)
+        return [Move.from_int(move, self) for move in self._generate_moves(mask)]
+
+    def generate_moves(self):
+        """
+        Generate all legal moves of the side to move in packed form.
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        return self._generate_moves(FULL)
+
+    def generate_captures(self):
+        """
+        Generate the legal captures, en passant captures and promotions.
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        return self._generate_moves(FULL, quiets=False)
+
+    def generate_quiets(self):
+        """
+        Generate the legal moves that generate_captures leaves out.
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        return self._generate_moves(FULL, captures=False)
+
+    def is_legal_move(self, move):
+        """
+        Check whether a packed move is legal in the current position.
+
+        Args:
+            move: The packed move, e.g. a hash move or killer from another position.
+
+        Returns:
+            True if the move is legal.
+        """
+        return move in self._generate_moves(1 << (move & 63))
+
+    def piece_at(self, square):
+        """
+        Get the piece index on a square.
+
+        Args:
+            square: Square index 0-63.
+
+        Returns:
+            The piece index (color * 6 + piece type), or EMPTY.
+        """
+        return self.mailbox[square]
+
+    def piece_count(self, piece):
+        """
+        Count the pieces of one kind on the board.
+
+        Args:
+            piece: Piece index (color * 6 + piece type).
+
+        Returns:
+            The number of such pieces.
+        """
+        return bin(self.pieces[piece]).count('1')
+
+    def see(self, move):
+        """
+        Statically evaluate the exchange started by a capture.
+
+        Uses the swap algorithm on bitboards: attackers of the target square
+        are taken least valuable first, and sliders uncovered behind them
+        join in as pieces leave. Pins are ignored and the king only captures
+        when the other side has no attacker left. Promotion gains are ignored.
+
+        Args:
+            move: A packed capture of the current player.
+
+        Returns:
+            The expected material gain in centipawns (SEE_VALUES), which is
+            negative for a losing capture and 0 for a non-capture.
+        """
+        flags = move >> 12
+        if not flags & CAPTURE:
+            return 0
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        pieces = self.pieces
+        occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+        if flags == EN_PASSANT:
+            occupied ^= 1 << (to_sq - 8 if self.side == WHITE else to_sq + 8)
+            gains = [SEE_VALUES[PAWN]]
+        else:
+            gains = [SEE_VALUES[self.mailbox[to_sq] % 6]]
+
+        attacker = self.mailbox[from_sq] % 6
+        side = self.side
+        from_bit = 1 << from_sq
+        while True:
+            # Gain of the side to move now if the piece just moved is taken
+            gains.append(SEE_VALUES[attacker] - gains[-1])
+            occupied ^= from_bit
+            side ^= 1
+            attackers = self._attackers_to(to_sq, side, occupied) & occupied
+            if not attackers:
+                break
+            for attacker in range(6):
+                candidates = attackers & pieces[side * 6 + attacker]
+                if candidates:
+                    from_bit = candidates & -candidates
+                    break
+            if attacker == KING and self._attackers_to(to_sq, side ^ 1, occupied ^ from_bit) & occupied:
+                break  # The king cannot capture into a defended square
+        gains.pop()
+
+        # Either side may stand pat rather than continue a losing exchange
+        for index in range(len(gains) - 1, 0, -1):
+            gains[index - 1] = -max(-gains[index - 1], gains[index])
+        return gains[0]
+
+    def is_repetition(self):
+        """
+        Check whether the current position occurred before in the game.
+
+        Only positions since the last capture or pawn move can repeat, so the
+        undo stack is scanned back at most halfmove_clock plies, comparing keys
+        of positions with the same side to move.
+
+        Returns:
+            True if the position is a repetition.
+        """
+        undo = self._undo
+        key = self._hash
+        oldest = max(0, self._ply - self.halfmove_clock)
+        for ply in range(self._ply - 4, oldest - 1, -2):
+            if undo[ply * _UNDO_SIZE + 5] == key:
+                return True
+        return False
+
+    def get_board_state(self):
+        """
+        Get the current state of the board for display or evaluation.
+
+        Returns:
+            8x8 list of piece characters indexed [row][col], ' ' for empty squares.
+        """
+        mailbox = self.mailbox
+        return [[_BOARD_CHARS[piece] for piece in mailbox[row * 8:row * 8 + 8]] for row in range(8)]
+
+    def is_check(self, color):
+        """
+        Check if the king of the specified color is in check.
+
+        Args:
+            color: 'w' for white, 'b' for black.
+
+        Returns:
+            True if the king is in check, False otherwise.
+        """
+        us = WHITE if color == 'w' else BLACK
+        king = self.pieces[us * 6 + KING]
+        if not king:
+            return False
+        attacked = self._attack_maps[us ^ 1]
+        if attacked >= 0:
+            return attacked & king != 0
+        # Only the king's square matters; the full attack map is left to move generation
+        return self._attackers_to(king.bit_length() - 1, us ^ 1,
+                                  self.occupancy[WHITE] | self.occupancy[BLACK]) != 0
+
+    def is_square_attacked(self, square, color):
+        """
+        Check if a square is attacked by the pieces of a color.
+
+        Args:
+            square: Square index 0-63.
+            color: 'w' for white, 'b' for black, the attacking side.
+
+        Returns:
+            True if the square is attacked, False otherwise.
+        """
+        return (self._attacks(WHITE if color == 'w' else BLACK) >> square) & 1 == 1
+
+    def attack_map(self, color):
+        """
+        Get all squares attacked by the pieces of a color.
+
+        Args:
+            color: 'w' for white, 'b' for black.
+
+        Returns:
+            Bitboard with bit ``row * 8 + col`` set for every attacked square.
+        """
+        return self._attacks(WHITE if color == 'w' else BLACK)
+
+    def get_current_player(self):
+        """
+        Get the current player.
+
+        Returns:
+            'w' for white, 'b' for black.
+        """
+        return 'w' if self.side == WHITE else 'b'
+
+    @property
+    def hash(self):
+        """
+        Get the 64-bit Zobrist key of the current position.
+
+        Returns:
+            The position key as an integer.
+        """
+        return self._hash
+
+    def _compute_hash(self):
+        """Compute the Zobrist key of the current position from scratch."""
+        ep_file = -1
+        ep = self.ep_square
+        if ep >= 0 and PAWN_ATTACKS[self.side ^ 1][ep] & self.pieces[self.side * 6 + PAWN]:
+            ep_file = ep & 7
+        return hash_position(((piece, square) for square, piece in enumerate(self.mailbox) if piece != EMPTY),
+                             self.side, self.castling, ep_file)
+
+    def _put(self, piece, square):
+        """Add a piece to an empty square."""
+        bit = 1 << square
+        self.pieces[piece] |= bit
+        self.occupancy[piece // 6] |= bit
+        self.mailbox[square] = piece
+        self._hash ^= PIECE_KEYS[piece][square]
+        self.psq += PSQ_SCORES[piece][square]
+        self.phase += PHASE_WEIGHTS[piece]
+        self.material_key += MATERIAL_WEIGHTS[piece]
+
+    def _remove(self, piece, square):
+        """Remove a piece from a square."""
+        bit = 1 << square
+        self.pieces[piece] ^= bit
+        self.occupancy[piece // 6] ^= bit
+        self.mailbox[square] = EMPTY
+        self._hash ^= PIECE_KEYS[piece][square]
+        self.psq -= PSQ_SCORES[piece][square]
+        self.phase -= PHASE_WEIGHTS[piece]
+        self.material_key -= MATERIAL_WEIGHTS[piece]
+
+    def _attacks(self, color):
+        """
+        Get the attack map of a color, computing it once per position.
+
+        The maps are dropped by every make_move and unmake_move, so repeated
+        check and attacked-square queries on one position cost a list lookup.
+
+        Args:
+            color: WHITE or BLACK.
+
+        Returns:
+            Bitboard of squares attacked by the color.
+        """
+        attacked = self._attack_maps[color]
+        if attacked < 0:
+            attacked = self._compute_attacks(color)
+            self._attack_maps[color] = attacked
+        return attacked
+
+    def _compute_attacks(self, color):
+        """Compute the squares attacked by a color from scratch."""
+        pieces = self.pieces
+        base = color * 6
+        occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+
+        pawns = pieces[base + PAWN]
+        if color == WHITE:
+            attacked = (((pawns & NOT_FILE_A) << 7) | ((pawns & NOT_FILE_H) << 9)) & FULL
+        else:
+            attacked = ((pawns & NOT_FILE_A) >> 9) | ((pawns & NOT_FILE_H) >> 7)
+        attacked |= KING_ATTACKS[pieces[base + KING].bit_length() - 1] if pieces[base + KING] else 0
+
+        for piece_type, table, masks in ((KNIGHT, None, None),
+                                         (BISHOP, BISHOP_TABLES, BISHOP_MASKS),
+                                         (ROOK, ROOK_TABLES, ROOK_MASKS)):
+            bb = pieces[base + piece_type]
+            if piece_type != KNIGHT:
+                bb |= pieces[base + QUEEN]
+            while bb:
+                bit = bb & -bb
+                bb ^= bit
+                square = bit.bit_length() - 1
+                if table is None:
+                    attacked |= KNIGHT_ATTACKS[square]
+                else:
+                    attacked |= table[square][occupied & masks[square]]
+        return attacked
+
+    def _attackers_to(self, square, color, occupied):
+        """
+        Get the pieces of a color that attack a square.
+
+        Args:
+            square: Target square index.
+            color: WHITE or BLACK, the attacking side.
+            occupied: Occupancy bitboard used to block sliding attacks.
+
+        Returns:
+            Bitboard of attacking pieces.
+        """
+        pieces = self.pieces
+        base = color * 6
+        queens = pieces[base + QUEEN]
+        return ((PAWN_ATTACKS[color ^ 1][square] & pieces[base + PAWN]) |
+                (KNIGHT_ATTACKS[square] & pieces[base + KNIGHT]) |
+                (KING_ATTACKS[square] & pieces[base + KING]) |
+                (ROOK_TABLES[square][occupied & ROOK_MASKS[square]] & (pieces[base + ROOK] | queens)) |
+                (BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]] & (pieces[base + BISHOP] | queens)))
+
+    def _leaves_king_safe(self, from_sq, to_sq, king_sq, captured_sq):
+        """
+        Test whether a pseudo-legal move leaves the mover's king out of check.
+
+        Move generation only needs this for en passant, where removing two
+        pawns from one rank can expose the king in a way pin masks miss.
+
+        Args:
+            from_sq: Origin square.
+            to_sq: Destination square.
+            king_sq: Square of the mover's king after the move.
+            captured_sq: Square of the captured piece (differs from to_sq for en passant).
+
+        Returns:
+            True if the move is legal.
+        """
+        occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+        occupied = (occupied & ~(1 << from_sq) & ~(1 << captured_sq)) | (1 << to_sq)
+        attackers = self._attackers_to(king_sq, self.side ^ 1, occupied)
+        return not (attackers & ~(1 << captured_sq))
+
+    def _pinned(self, king_sq, color, occupied):
+        """
+        Find the pieces of a color pinned to their king.
+
+        Args:
+            king_sq: Square of the color's king.
+            color: WHITE or BLACK, the side whose pieces may be pinned.
+            occupied: Bitboard of all occupied squares.
+
+        Returns:
+            Bitboard of pinned pieces.
+        """
+        pieces = self.pieces
+        enemy_base = (color ^ 1) * 6
+        queens = pieces[enemy_base + QUEEN]
+        snipers = ((ROOK_RAYS[king_sq] & (pieces[enemy_base + ROOK] | queens)) |
+                   (BISHOP_RAYS[king_sq] & (pieces[enemy_base + BISHOP] | queens)))
+        own = self.occupancy[color]
+        pinned = 0
+        while snipers:
+            bit = snipers & -snipers
+            snipers ^= bit
+            blockers = BETWEEN[king_sq][bit.bit_length() - 1] & occupied
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinned |= blockers
+        return pinned
+
+    def _generate_moves(self, from_mask, captures=True, quiets=True):
+        """
+        Generate legal moves for the side to move.
+
+        Legality is decided up front rather than by playing each move: the
+        checkers, a check-evasion target mask and the pinned pieces are computed
+        once, and every non-king move is restricted to the target mask and,
+        for a pinned piece, to the line through its king. King moves are tested
+        against attacks with the king lifted off the board, and en passant gets
+        a full test because it removes two pieces from the same rank.
+
+        Args:
+            from_mask: Bitboard restricting the origin squares.
+            captures: Include captures, en passant and promotions.
+            quiets: Include all other moves (pushes, castling, quiet piece moves).
+
+        Returns:
+            array('H') of packed integer moves.
+        """
+        moves = array('H')
+        append = moves.append
+        us = self.side
+        them = us ^ 1
+        base = us * 6
+        pieces = self.pieces
+        own = self.occupancy[us]
+        enemy = self.occupancy[them]
+        occupied = own | enemy
+        empty = FULL ^ occupied
+        # Destination squares for piece and king moves of the requested kinds
+        kind_mask = (enemy if captures else 0) | (empty if quiets else 0)
+        king_sq = pieces[base + KING].bit_length() - 1
+        king_bit = 1 << king_sq
+        attackers_to = self._attackers_to
+
+        checkers = attackers_to(king_sq, them, occupied)
+        if checkers & (checkers - 1):
+            # Double check: only the king can move
+            target_mask = 0
+        elif checkers:
+            target_mask = BETWEEN[king_sq][checkers.bit_length() - 1] | checkers
+        else:
+            target_mask = FULL
+
+        if target_mask:
+            pinned = self._pinned(king_sq, us, occupied)
+            pin_lines = LINE[king_sq]
+
+            # Pawns
+            pawns = pieces[base + PAWN] & from_mask
+            if us == WHITE:
+                single = (pawns << 8) & empty
+                double = ((single & RANK_3) << 8) & empty
+                left = ((pawns & NOT_FILE_A) << 7) & enemy
+                right = ((pawns & NOT_FILE_H) << 9) & enemy
+                push, left_delta, right_delta = 8, 7, 9
+                promotion_rank = RANK_8
+            else:
+                single = (pawns >> 8) & empty
+                double = ((single & RANK_6) >> 8) & empty
+                left = ((pawns & NOT_FILE_A) >> 9) & enemy
+                right = ((pawns & NOT_FILE_H) >> 7) & enemy
+                push, left_delta, right_delta = -8, -9, -7
+                promotion_rank = RANK_1
+            if not quiets:
+                single &= promotion_rank
+                double = 0
+            if not captures:
+                single &= FULL ^ promotion_rank
+                left = right = 0
+
+            for targets, delta, flags, promotions in (
+                    (single & target_mask, push, 0, _PROMOTIONS),
+                    (double & target_mask, 2 * push, _DOUBLE_PUSH, None),
+                    (left & target_mask, left_delta, _CAPTURE, _PROMOTION_CAPTURES),
+                    (right & target_mask, right_delta, _CAPTURE, _PROMOTION_CAPTURES)):
+                while targets:
+                    bit = targets & -targets
+                    targets ^= bit
+                    to_sq = bit.bit_length() - 1
+                    from_sq = to_sq - delta
+                    if pinned and (1 << from_sq) & pinned and not pin_lines[from_sq] & bit:
+                        continue
+                    move = from_sq | (to_sq << 6)
+                    if bit & promotion_rank:
+                        for promotion in promotions:
+                            append(move | promotion)
+                    else:
+                        append(move | flags)
+
+            ep = self.ep_square
+            if ep >= 0 and captures:
+                attackers = PAWN_ATTACKS[them][ep] & pawns
+                while attackers:
+                    bit = attackers & -attackers
+                    attackers ^= bit
+                    from_sq = bit.bit_length() - 1
+                    if self._leaves_king_safe(from_sq, ep, king_sq, ep - push):
+                        append(from_sq | (ep << 6) | _EN_PASSANT)
+
+            # Knights, bishops, rooks and queens
+            piece_mask = kind_mask & target_mask
+            for piece_type in (KNIGHT, BISHOP, ROOK, QUEEN):
+                bb = pieces[base + piece_type] & from_mask
+                while bb:
+                    bit = bb & -bb
+                    bb ^= bit
+                    from_sq = bit.bit_length() - 1
+                    if piece_type == KNIGHT:
+                        targets = KNIGHT_ATTACKS[from_sq]
+                    elif piece_type == BISHOP:
+                        targets = BISHOP_TABLES[from_sq][occupied & BISHOP_MASKS[from_sq]]
+                    elif piece_type == ROOK:
+                        targets = ROOK_TABLES[from_sq][occupied & ROOK_MASKS[from_sq]]
+                    else:
+                        targets = (ROOK_TABLES[from_sq][occupied & ROOK_MASKS[from_sq]] |
+                                   BISHOP_TABLES[from_sq][occupied & BISHOP_MASKS[from_sq]])
+                    targets &= piece_mask
+                    if bit & pinned:
+                        targets &= pin_lines[from_sq]
+                    while targets:
+                        target = targets & -targets
+                        targets ^= target
+                        append(from_sq | ((target.bit_length() - 1) << 6) |
+                               (_CAPTURE if target & enemy else 0))
+
+        # King
+        if king_bit & from_mask:
+            without_king = occupied ^ king_bit
+            targets = KING_ATTACKS[king_sq] & kind_mask
+            while targets:
+                target = targets & -targets
+                targets ^= target
+                to_sq = target.bit_length() - 1
+                if not attackers_to(to_sq, them, without_king):
+                    append(king_sq | (to_sq << 6) | (_CAPTURE if target & enemy else 0))
+
+            if quiets and not checkers:
+                for right, king_from, rook_from, between, path, move in _CASTLING_MOVES[us]:
+                    if (not (self.castling & right) or king_from != king_sq or occupied & between or
+                            self.mailbox[rook_from] != base + ROOK):
+                        continue
+                    if self._attacks(them) & path:
+                        continue
+                    append(move)
+
+        return moves
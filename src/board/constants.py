@@ -0,0 +1,74 @@
+"""
+Constants shared by the board representations.
+
+Squares are numbered 0-63 as ``row * 8 + col`` with row 0 being White's back
+rank, so a1 = 0, h1 = 7, a8 = 56 and h8 = 63. This matches the (row, col)
+tuples used by ``Move`` and the renderer.
+"""
+
+# Colors
+WHITE = 0
+BLACK = 1
+
+# Piece types
+PAWN = 0
+KNIGHT = 1
+BISHOP = 2
+ROOK = 3
+QUEEN = 4
+KING = 5
+
+# Piece indices are color * 6 + piece type
+EMPTY = -1
+PIECE_CHARS = 'PNBRQKpnbrqk'
+PIECE_INDEX = {char: index for index, char in enumerate(PIECE_CHARS)}
+
+# Castling right bits
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+ALL_CASTLING = 15
+
+# FEN character for each castling right, in FEN order
+CASTLING_CHARS = (('K', WHITE_KINGSIDE), ('Q', WHITE_QUEENSIDE),
+                  ('k', BLACK_KINGSIDE), ('q', BLACK_QUEENSIDE))
+
+# Castling rights that survive a move touching the square
+# (moving a king or rook, or capturing a rook on its home square)
+CASTLING_MASK = [ALL_CASTLING] * 64
+CASTLING_MASK[0] = ALL_CASTLING & ~WHITE_QUEENSIDE
+CASTLING_MASK[7] = ALL_CASTLING & ~WHITE_KINGSIDE
+CASTLING_MASK[4] = ALL_CASTLING & ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_MASK[56] = ALL_CASTLING & ~BLACK_QUEENSIDE
+CASTLING_MASK[63] = ALL_CASTLING & ~BLACK_KINGSIDE
+CASTLING_MASK[60] = ALL_CASTLING & ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+
+# (row, col) tuple for every square, shared to avoid allocating new tuples
+POSITIONS = [(square >> 3, square & 7) for square in range(64)]
+
+
+def square_index(position):
+    """
+    Convert a (row, col) tuple to a square index.
+
+    Args:
+        position: A tuple (row, col).
+
+    Returns:
+        The square index 0-63.
+    """
+    return position[0] * 8 + position[1]
+
+
+def square_name(square):
+    """
+    Get the algebraic name of a square, e.g. 'e4'.
+
+    Args:
+        square: Square index 0-63.
+
+    Returns:
+        The square name as a string.
+    """
+    return 'abcdefgh'[square & 7] + str((square >> 3) + 1)
@@ -0,0 +1,40 @@
+"""
+Material keys: the piece counts of a position packed into one integer.
+
+Every piece index except the kings gets four bits, so a count can go up to
+15. Adding or removing a piece adds or subtracts its MATERIAL_WEIGHTS entry,
+so the board backends keep the key up to date incrementally alongside the
+Zobrist key (see _put and _remove of BitBoard and ArrayBoard). Evaluators
+use it to index tables of material signatures; see
+src.evaluation.material_evaluator.
+"""
+from src.board.constants import KING
+
+# MATERIAL_WEIGHTS[piece index]: what a piece adds to the material key
+MATERIAL_WEIGHTS = tuple(0 if piece % 6 == KING else 1 << (4 * piece) for piece in range(12))
+
+
+def material_key(counts):
+    """
+    Compute the material key of a set of piece counts.
+
+    Args:
+        counts: Sequence of 12 piece counts indexed by piece index.
+
+    Returns:
+        The material key, as kept by the boards.
+    """
+    return sum(count * MATERIAL_WEIGHTS[piece] for piece, count in enumerate(counts))
+
+
+def material_counts(key):
+    """
+    Unpack the piece counts of a material key.
+
+    Args:
+        key: A material key.
+
+    Returns:
+        List of 12 piece counts indexed by piece index (the kings count 1).
+    """
+    return [1 if piece % 6 == KING else (key >> (4 * piece)) & 15 for piece in range(12)]
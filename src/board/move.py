@@ -1,8 +1,102 @@
+"""
+Move representations.
+
+``Move`` is the descriptive object used by the UI. Search and move
+generation work on packed 16-bit integers instead, which are cheap to create,
+compare and store in ``array('H')`` buffers:
+
+    bits 0-5    origin square (row * 8 + col)
+    bits 6-11   destination square
+    bits 12-15  flags (see the constants below)
+
+``Move.to_int`` and ``Move.from_int`` convert losslessly between the two.
+"""
+
+# Packed move flags
+QUIET = 0
+DOUBLE_PUSH = 1
+KING_CASTLE = 2
+QUEEN_CASTLE = 3
+CAPTURE = 4
+EN_PASSANT = 5
+PROMOTION = 8  # Set for all promotions; the low two bits give the piece
+KNIGHT_PROMOTION = 8
+BISHOP_PROMOTION = 9
+ROOK_PROMOTION = 10
+QUEEN_PROMOTION = 11
+KNIGHT_PROMOTION_CAPTURE = 12
+BISHOP_PROMOTION_CAPTURE = 13
+ROOK_PROMOTION_CAPTURE = 14
+QUEEN_PROMOTION_CAPTURE = 15
+
+NULL_MOVE = 0
+
+# Promotion piece letter by the low two flag bits, and back
+PROMOTION_PIECES = 'NBRQ'
+_PROMOTION_BITS = {'N': 0, 'B': 1, 'R': 2, 'Q': 3}
+
+_FILES = 'abcdefgh'
+_RANKS = '12345678'  # Row 0 is rank 1 (White's back rank)
+
+
+def encode_move(from_sq, to_sq, flags=QUIET):
+    """
+    Pack a move into a 16-bit integer.
+
+    Args:
+        from_sq: Origin square index 0-63.
+        to_sq: Destination square index 0-63.
+        flags: One of the move flag constants.
+
+    Returns:
+        The packed move.
+    """
+    return from_sq | (to_sq << 6) | (flags << 12)
+
+
+def move_from(move):
+    """Get the origin square of a packed move."""
+    return move & 63
+
+
+def move_to(move):
+    """Get the destination square of a packed move."""
+    return (move >> 6) & 63
+
+
+def move_flags(move):
+    """Get the flags of a packed move."""
+    return move >> 12
+
+
+def move_to_uci(move):
+    """
+    Convert a packed move to UCI long algebraic notation, e.g. 'e7e8q'.
+
+    Args:
+        move: The packed move.
+
+    Returns:
+        The UCI move string ('0000' for the null move).
+    """
+    if move == NULL_MOVE:
+        return '0000'
+    from_sq = move & 63
+    to_sq = (move >> 6) & 63
+    text = _FILES[from_sq & 7] + _RANKS[from_sq >> 3] + _FILES[to_sq & 7] + _RANKS[to_sq >> 3]
+    if (move >> 12) & PROMOTION:
+        text += PROMOTION_PIECES[(move >> 12) & 3].lower()
+    return text
+
+
 class Move:
     """
     Represents a chess move with all necessary information.
     """
 
+    __slots__ = ('from_pos', 'to_pos', 'piece', 'captured', 'promotion',
+                 'is_castling', 'is_en_passant', 'castling_rook_move', '_notation')
+
     def __init__(self, from_pos, to_pos, piece, captured=None, promotion=None,
                  is_castling=False, is_en_passant=False, castling_rook_move=None):
         self.from_pos = from_pos  # (row, col) tuple
@@ -13,16 +107,20 @@ class Move:
         self.is_castling = is_castling  # Flag for castling moves
         self.is_en_passant = is_en_passant  # Flag for en passant captures
         self.castling_rook_move = castling_rook_move  # Additional rook move for castling
+        self._notation = None  # Cached result of __str__
 
     def __str__(self):
         """Convert move to algebraic notation."""
-        files = 'abcdefgh'
-        ranks = '87654321'  # Reversed because chess board row 0 is rank 8
+        if self._notation is None:
+            self._notation = self._build_notation()
+        return self._notation
 
-        from_file = files[self.from_pos[1]]
-        from_rank = ranks[self.from_pos[0]]
-        to_file = files[self.to_pos[1]]
-        to_rank = ranks[self.to_pos[0]]
+    def _build_notation(self):
+        """Build the algebraic notation string for __str__."""
+        from_file = _FILES[self.from_pos[1]]
+        from_rank = _RANKS[self.from_pos[0]]
+        to_file = _FILES[self.to_pos[1]]
+        to_rank = _RANKS[self.to_pos[0]]
 
         # Special notations
         if self.is_castling:
@@ -39,3 +137,61 @@ class Move:
             move_str += f"={self.promotion.upper()}"
 
         return move_str
+
+    def to_int(self):
+        """
+        Pack this move into a 16-bit integer.
+
+        Returns:
+            The packed move.
+        """
+        from_sq = self.from_pos[0] * 8 + self.from_pos[1]
+        to_sq = self.to_pos[0] * 8 + self.to_pos[1]
+
+        if self.is_castling:
+            flags = KING_CASTLE if to_sq > from_sq else QUEEN_CASTLE
+        elif self.is_en_passant:
+            flags = EN_PASSANT
+        else:
+            flags = CAPTURE if self.captured else QUIET
+            if self.promotion:
+                flags |= PROMOTION | _PROMOTION_BITS[self.promotion.upper()]
+            elif self.piece in 'Pp' and abs(to_sq - from_sq) == 16:
+                flags = DOUBLE_PUSH
+
+        return from_sq | (to_sq << 6) | (flags << 12)
+
+    @classmethod
+    def from_int(cls, move, board):
+        """
+        Build a Move from a packed move.
+
+        Args:
+            move: The packed move.
+            board: The board in the position before the move is made.
+
+        Returns:
+            A Move object describing the packed move.
+        """
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        flags = move >> 12
+        from_pos = (from_sq >> 3, from_sq & 7)
+        to_pos = (to_sq >> 3, to_sq & 7)
+        piece = board.get_piece(from_pos)
+        white = piece.isupper()
+
+        if flags == KING_CASTLE or flags == QUEEN_CASTLE:
+            row = from_pos[0]
+            rook_move = ((row, 7), (row, 5)) if flags == KING_CASTLE else ((row, 0), (row, 3))
+            return cls(from_pos, to_pos, piece, is_castling=True, castling_rook_move=rook_move)
+
+        if flags == EN_PASSANT:
+            return cls(from_pos, to_pos, piece, 'p' if white else 'P', is_en_passant=True)
+
+        captured = board.get_piece(to_pos) if flags & CAPTURE else None
+        promotion = None
+        if flags & PROMOTION:
+            promotion = PROMOTION_PIECES[flags & 3]
+            promotion = promotion if white else promotion.lower()
+        return cls(from_pos, to_pos, piece, captured, promotion)
@@ -0,0 +1,61 @@
+"""
+Zobrist keys for 64-bit position hashing.
+
+A position key is the XOR of one random key per (piece, square), the side
+key when Black is to move, a key for the castling rights and a key for the
+en passant file. The board backends keep it up to date incrementally as
+pieces are added and removed, so reading the key is free.
+
+The en passant file only counts when a pawn of the side to move can actually
+make the capture, so positions that differ only by an unusable en passant
+square share a key (needed for correct repetition detection).
+"""
+import random
+
+_rng = random.Random(0x5EED)  # Fixed seed so keys are stable across runs and processes
+
+
+def _random64():
+    return _rng.getrandbits(64)
+
+
+# PIECE_KEYS[piece index][square]
+PIECE_KEYS = [[_random64() for _ in range(64)] for _ in range(12)]
+
+# XORed in when Black is to move
+SIDE_KEY = _random64()
+
+# CASTLING_KEYS[rights] for every combination of the four castling right bits
+_CASTLING_RIGHT_KEYS = [_random64() for _ in range(4)]
+CASTLING_KEYS = [0] * 16
+for _rights in range(16):
+    for _bit in range(4):
+        if _rights & (1 << _bit):
+            CASTLING_KEYS[_rights] ^= _CASTLING_RIGHT_KEYS[_bit]
+
+# EP_KEYS[file] for the file of a capturable en passant square
+EP_KEYS = [_random64() for _ in range(8)]
+
+
+def hash_position(piece_squares, side, castling, ep_file=-1):
+    """
+    Compute a position key from scratch.
+
+    Args:
+        piece_squares: Iterable of (piece index, square 0-63) pairs.
+        side: WHITE (0) or BLACK (1), the side to move.
+        castling: Castling rights bits.
+        ep_file: File 0-7 of a capturable en passant square, or -1.
+
+    Returns:
+        The 64-bit position key.
+    """
+    key = 0
+    for piece, square in piece_squares:
+        key ^= PIECE_KEYS[piece][square]
+    if side:
+        key ^= SIDE_KEY
+    key ^= CASTLING_KEYS[castling]
+    if ep_file >= 0:
+        key ^= EP_KEYS[ep_file]
+    return key
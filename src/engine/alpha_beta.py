@@ -0,0 +1,689 @@
+import math
+import time
+
+from src.board.base_board import STAGE_CAPTURES, SEE_VALUES
+from src.board.constants import PAWN, KNIGHT, BISHOP, ROOK, QUEEN
+from src.board.move import NULL_MOVE, CAPTURE, EN_PASSANT, PROMOTION
+from src.engine.base_engine import BaseEngine, MATE_SCORE, MATE_BOUND, MAX_PLY
+from src.engine.move_ordering import MoveOrdering, is_losing_capture
+from src.engine.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from src.evaluation.material_evaluator import is_dead_draw
+from src.evaluation.positional_evaluator import PositionalEvaluator
+
+INFINITY = MATE_SCORE + 1
+DRAW_SCORE = 0
+
+# Iterations from this depth on start with an aspiration window
+ASPIRATION_DEPTH = 4
+
+# The clock is read once every this many nodes (must be a power of two)
+TIME_CHECK_INTERVAL = 2048
+
+# Move flags of captures and promotions, which never update the quiet move tables
+_TACTICAL = (CAPTURE | PROMOTION) << 12
+
+# Null-move pruning: minimum depth, depth reduction (plus one per
+# NULL_MOVE_DEPTH_DIVISOR plies of depth) and the depth from which a null-move
+# cutoff is verified by a reduced search without null moves
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_DEPTH_DIVISOR = 4
+NULL_MOVE_VERIFY_DEPTH = 6
+
+# Late move reductions apply to quiet moves after the first LMR_MIN_MOVES at
+# depth LMR_MIN_DEPTH and up; LMR_TABLE[depth][move number] is the reduction
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 3
+LMR_TABLE = [[0] * 64] + [[0] + [int(0.75 + math.log(depth) * math.log(number) / 2.25)
+                                 for number in range(1, 64)]
+                          for depth in range(1, 64)]
+
+# Reverse futility pruning: a node this close to the leaves whose static
+# evaluation beats beta by the margin per ply of depth fails high at once
+REVERSE_FUTILITY_DEPTH = 6
+REVERSE_FUTILITY_MARGIN = 120
+
+# Futility pruning: quiet moves are skipped at these depths when the static
+# evaluation plus FUTILITY_MARGINS[depth] cannot reach alpha
+FUTILITY_MARGINS = (0, 200, 350, 500)
+
+# Razoring: nodes at these depths whose static evaluation plus
+# RAZOR_MARGINS[depth] is below alpha are resolved by quiescence search
+RAZOR_MARGINS = (0, 300, 550)
+
+# Delta pruning: quiescence skips a capture when the static evaluation plus
+# the victim's value and this margin cannot reach alpha
+DELTA_MARGIN = 200
+
+# Quiescence searches all evasions of a side in check only this many plies
+# deep; further in, a side in check stands pat like any other. Beyond
+# QSEARCH_MAX_DEPTH plies it returns the static evaluation without searching
+QSEARCH_EVASION_DEPTH = 2
+QSEARCH_MAX_DEPTH = 8
+
+# Names of the selective search techniques that are on by default, as
+# accepted by AlphaBetaEngine
+SELECTIVITY = ('null_move', 'late_move_reductions', 'futility', 'razoring', 'check_extensions',
+               'delta_pruning', 'see_pruning')
+
+# Counters of AlphaBetaEngine.stats
+SEARCH_STATS = ('null_move_cutoffs', 'null_move_verify_failures', 'lmr_reductions',
+                'lmr_researches', 'reverse_futility_cutoffs', 'futility_prunes',
+                'razor_cutoffs', 'check_extensions', 'qsearch_nodes', 'delta_prunes',
+                'see_prunes', 'qsearch_checks')
+
+
+def score_to_tt(score, ply):
+    """Convert a mate score from root-relative to node-relative for storage."""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    """Convert a stored node-relative mate score back to root-relative."""
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class AlphaBetaEngine(BaseEngine):
+    """
+    Iterative deepening principal variation search.
+
+    Each iteration searches one ply deeper than the last, with an aspiration
+    window around the previous score from ASPIRATION_DEPTH on. Inside the
+    tree the first move of a node is searched with the full window and the
+    rest with a null window, re-searching only those that beat alpha. Results
+    go to a transposition table, whose best move is tried first on the next
+    visit; the other moves are ordered by a MoveOrdering (captures by MVV-LVA
+    and SEE, killers, countermoves and history). Leaf nodes are resolved with
+    a quiescence search over captures and promotions, plus check evasions
+    and optionally checking moves.
+
+    The tree is shaped by the usual selective techniques, each of which can
+    be switched off: verified null-move pruning, late move reductions,
+    reverse futility and futility pruning, razoring and check extensions,
+    and delta pruning and SEE filtering of captures in quiescence search.
+    How often each fired in the last search is counted in ``stats``.
+    """
+
+    def __init__(self, evaluator=None, tt_size_mb=16, max_depth=64, aspiration_window=25,
+                 tt=None, stop_event=None, ordering=None, null_move=True,
+                 late_move_reductions=True, futility=True, razoring=True, check_extensions=True,
+                 delta_pruning=True, see_pruning=True, qsearch_checks=False, multi_pv=1):
+        """
+        Initialize the engine.
+
+        Args:
+            evaluator: BaseEvaluator for leaf nodes. Defaults to a PositionalEvaluator.
+            tt_size_mb: Transposition table size in megabytes.
+            max_depth: Default maximum search depth in plies.
+            aspiration_window: Half width of the first aspiration window in centipawns.
+            tt: Optional TranspositionTable to use instead of allocating one
+                (tt_size_mb is then ignored), e.g. one in shared memory.
+            stop_event: Optional threading or multiprocessing Event; the search
+                        stops when it is set, checked along with the clock.
+            ordering: Optional MoveOrdering, e.g. with some heuristics switched
+                      off. Defaults to one with all of them enabled.
+            null_move: Prune nodes where passing still fails high.
+            late_move_reductions: Search late quiet moves with reduced depth.
+            futility: Prune hopeless quiet moves and nodes near the leaves
+                      (futility and reverse futility pruning).
+            razoring: Drop hopeless nodes near the leaves into quiescence search.
+            check_extensions: Search one ply deeper when in check.
+            delta_pruning: Skip captures in quiescence search that cannot
+                           raise the score to alpha.
+            see_pruning: Skip captures in quiescence search that lose material.
+            qsearch_checks: Also search quiet checking moves at the first
+                            ply of quiescence search.
+            multi_pv: Number of best lines to find and report in 'lines'.
+        """
+        self.evaluator = evaluator or PositionalEvaluator()
+        self.tt = tt if tt is not None else TranspositionTable(tt_size_mb)
+        self.stop_event = stop_event
+        self.max_depth = max_depth
+        self.aspiration_window = aspiration_window
+        self.nodes = 0
+        self._board = None
+        self._stopped = False
+        self._deadline = None
+        self._time_manager = None
+        self._limits = (None, None)  # Time limit and manager of the current search
+        self._pondering = False
+        self.ordering = ordering or MoveOrdering()
+        self.use_null_move = null_move
+        self.use_late_move_reductions = late_move_reductions
+        self.use_futility = futility
+        self.use_razoring = razoring
+        self.use_check_extensions = check_extensions
+        self.use_delta_pruning = delta_pruning
+        self.use_see_pruning = see_pruning
+        self.use_qsearch_checks = qsearch_checks
+        self.multi_pv = multi_pv
+        self._excluded = []  # Root moves skipped while searching for further lines
+        self.stats = dict.fromkeys(SEARCH_STATS, 0)
+        self._moves = [NULL_MOVE] * MAX_PLY  # Move being searched at each ply
+        self._pv = [[] for _ in range(MAX_PLY + 1)]  # Principal variation from each ply
+
+    def search(self, board, depth=None, time_limit=None, info_callback=None, start_depth=1,
+               time_manager=None, ponder=False):
+        """
+        Search a position for the best move.
+
+        Args:
+            board: A BaseBoard instance. It is restored to its original position.
+            depth: Maximum depth in plies, or None for max_depth.
+            time_limit: Maximum search time in seconds, or None for no limit.
+            info_callback: Optional function called with an info dictionary
+                           after every completed iteration.
+            start_depth: Depth of the first iteration. Parallel helpers start
+                         deeper so that they do not all search the same tree.
+            time_manager: Optional TimeManager, already allocated for this
+                          move. The search stops at its hard deadline and
+                          only starts iterations it expects to finish.
+            ponder: Search on the opponent's time: the time limit and time
+                    manager only take effect once ponderhit() is called (from
+                    another thread, or through stop_event polling). A ponder
+                    search that reaches its maximum depth returns early.
+
+        Returns:
+            The info dictionary of the deepest completed iteration.
+        """
+        start = time.perf_counter()
+        self._board = board
+        self._stopped = False
+        self._limits = (time_limit, time_manager)
+        self._pondering = ponder
+        self._deadline = self._time_manager = None
+        if not ponder:
+            self._apply_limits(start, time_limit, time_manager)
+        self.nodes = 0
+        self.stats = dict.fromkeys(SEARCH_STATS, 0)
+        self.tt.new_search()
+        self.ordering.new_search()
+
+        max_depth = min(depth or self.max_depth, MAX_PLY - 1)
+        count = max(1, min(self.multi_pv, len(board.generate_moves())))
+        info = None
+        lines = []
+        for iteration in range(min(start_depth, max_depth), max_depth + 1):
+            result = self._search_lines(iteration, lines, count)
+            if self._stopped:
+                break
+
+            lines = result
+            score, line = lines[0]
+            info = self._search_info(board, lines, iteration, self.nodes, time.perf_counter() - start,
+                                     self.stats)
+            if info_callback:
+                info_callback(info)
+            # A forced mate found within the search horizon will not change
+            if abs(score) >= MATE_BOUND and MATE_SCORE - abs(score) <= iteration:
+                break
+            if self._time_manager is not None:
+                best_move = line[0] if line else NULL_MOVE
+                if not self._time_manager.next_iteration(best_move, score, self.nodes):
+                    break
+
+        if info is None:
+            # Stopped before the first iteration finished: fall back to any legal move
+            moves = board.generate_moves()
+            info = self._search_info(board, [(0, moves[:1])], 0, self.nodes, time.perf_counter() - start,
+                                     self.stats)
+        self._board = None
+        self._pondering = False
+        return info
+
+    def stop(self):
+        """Ask a running search to return as soon as possible."""
+        self._stopped = True
+
+    def _search_info(self, board, lines, depth, nodes, seconds, stats):
+        """
+        Build the info dictionary of a completed iteration, with 'lines' and 'stats'.
+
+        Args:
+            board: The board in the searched position.
+            lines: (score, packed line) pairs, best first.
+            depth: Depth of the iteration.
+            nodes: Number of nodes searched.
+            seconds: Time spent searching.
+            stats: Dictionary of SEARCH_STATS counters; it is copied.
+
+        Returns:
+            The info dictionary.
+        """
+        score, line = lines[0]
+        info = self._build_info(board, line, score, depth, nodes, seconds)
+        info['lines'] = [{'score': line_score, 'depth': depth, 'pv': self._line_moves(board, line_moves)}
+                         for line_score, line_moves in lines]
+        info['stats'] = dict(stats)
+        return info
+
+    def ponderhit(self, time_limit=None, time_manager=None):
+        """
+        Turn a running ponder search into the search for the move to play.
+
+        The opponent played the expected move, so the search continues with
+        everything it found so far, now under a time budget counted from this
+        call.
+
+        Args:
+            time_limit: Maximum further search time in seconds. Defaults to
+                        the time limit passed to search.
+            time_manager: TimeManager allocated at the time of the call.
+                          Defaults to the one passed to search, reallocated
+                          now: its deadlines were set when pondering started.
+                          Either way its predictions leave out the nodes
+                          searched while pondering.
+        """
+        if not self._pondering:
+            return
+        default_limit, default_manager = self._limits
+        self._pondering = False
+        if time_manager is None and default_manager is not None:
+            default_manager.reallocate(self.nodes)
+            time_manager = default_manager
+        elif time_manager is not None:
+            time_manager.start_nodes = self.nodes
+        self._apply_limits(time.perf_counter(), time_limit or default_limit, time_manager)
+
+    def _apply_limits(self, start, time_limit, time_manager):
+        """Set the deadline of the running search from a time limit and manager."""
+        deadline = start + time_limit if time_limit else None
+        if time_manager is not None and (deadline is None or time_manager.hard_deadline < deadline):
+            deadline = time_manager.hard_deadline
+        self._deadline = deadline
+        self._time_manager = time_manager
+
+    def new_game(self):
+        """Clear the transposition table and move ordering state."""
+        self.tt.clear()
+        self.ordering.clear()
+
+    def _search_lines(self, depth, previous, count):
+        """
+        Search the root for its best lines at one depth.
+
+        The first pass is the ordinary root search; every further pass
+        searches the root again with the first moves of the lines found so
+        far excluded. The passes share the transposition table, so the later
+        ones mostly re-use the first one's subtrees.
+
+        Args:
+            depth: Depth in plies.
+            previous: (score, line) pairs of the previous iteration, best
+                      first, whose scores center the aspiration windows.
+            count: Number of lines; at most the number of legal moves.
+
+        Returns:
+            (score, line of packed moves) pairs, best first. Incomplete if
+            the search was stopped.
+        """
+        lines = []
+        self._excluded = []
+        for index in range(count):
+            center = previous[index][0] if index < len(previous) else None
+            if center is not None and depth >= ASPIRATION_DEPTH and abs(center) < MATE_BOUND:
+                score = self._aspiration_search(depth, center)
+            else:
+                score = self._search(depth, -INFINITY, INFINITY, 0)
+            if self._stopped:
+                break
+            line = self._pv[0]
+            lines.append((score, line))
+            if not line:
+                break  # No legal moves
+            self._excluded.append(line[0])
+        self._excluded = []
+        # A later pass can score higher than an earlier one when the tree changed in between
+        lines.sort(key=lambda item: item[0], reverse=True)
+        return lines
+
+    def _aspiration_search(self, depth, previous):
+        """
+        Search the root with a window around the previous iteration's score.
+
+        A result outside the window only bounds the true score, so the window
+        is widened on the failing side, doubling each time, and the root is
+        searched again.
+
+        Args:
+            depth: Depth in plies.
+            previous: Score of the previous iteration.
+
+        Returns:
+            The exact root score (unless the search was stopped).
+        """
+        window = self.aspiration_window
+        alpha = max(previous - window, -INFINITY)
+        beta = min(previous + window, INFINITY)
+        while True:
+            score = self._search(depth, alpha, beta, 0)
+            if self._stopped:
+                return score
+            if score <= alpha:
+                alpha = max(score - window, -INFINITY)
+            elif score >= beta:
+                beta = min(score + window, INFINITY)
+            else:
+                return score
+            window *= 2
+
+    def _check_time(self):
+        """Stop the search once the deadline has passed or the stop event is set."""
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            self._stopped = True
+        elif self.stop_event is not None and self.stop_event.is_set():
+            self._stopped = True
+
+    def _search(self, depth, alpha, beta, ply, allow_null=True):
+        """
+        Principal variation search of one node.
+
+        Args:
+            depth: Remaining depth in plies.
+            alpha: Lower bound of the search window.
+            beta: Upper bound of the search window.
+            ply: Distance from the root.
+            allow_null: Whether null-move pruning may be tried; False right
+                        after a null move and in verification searches.
+
+        Returns:
+            The score from the side to move's point of view (fail-soft).
+        """
+        board = self._board
+        stats = self.stats
+        self._pv[ply] = []
+        in_check = board.is_check(board.get_current_player())
+        if in_check and self.use_check_extensions and ply:
+            depth += 1
+            stats['check_extensions'] += 1
+        if depth <= 0:
+            return self._quiesce(alpha, beta, ply)
+
+        self.nodes += 1
+        if not self.nodes & (TIME_CHECK_INTERVAL - 1):
+            self._check_time()
+        if self._stopped:
+            return 0
+
+        if ply:
+            if board.halfmove_clock >= 100 or board.is_repetition() or is_dead_draw(board):
+                return DRAW_SCORE
+            if ply >= MAX_PLY - 1:
+                return self.evaluator.evaluate(board)
+
+        pv_node = beta - alpha > 1
+        key = board.hash
+        tt_move = NULL_MOVE
+        entry = self.tt.probe(key)
+        if entry is not None:
+            entry_depth, entry_score, bound, tt_move = entry
+            if not pv_node and entry_depth >= depth:
+                entry_score = score_from_tt(entry_score, ply)
+                if (bound == EXACT or (bound == LOWER_BOUND and entry_score >= beta) or
+                        (bound == UPPER_BOUND and entry_score <= alpha)):
+                    return entry_score
+
+        # Pruning decisions that look at the static evaluation of the node
+        static_eval = None
+        if not pv_node and not in_check and abs(beta) < MATE_BOUND:
+            static_eval = self.evaluator.evaluate(board)
+
+            if (self.use_futility and depth <= REVERSE_FUTILITY_DEPTH and
+                    static_eval - REVERSE_FUTILITY_MARGIN * depth >= beta):
+                stats['reverse_futility_cutoffs'] += 1
+                return static_eval
+
+            if (self.use_razoring and depth < len(RAZOR_MARGINS) and
+                    static_eval + RAZOR_MARGINS[depth] < alpha):
+                score = self._quiesce(alpha, alpha + 1, ply)
+                if score <= alpha:
+                    stats['razor_cutoffs'] += 1
+                    return score
+
+            if (self.use_null_move and allow_null and depth >= NULL_MOVE_MIN_DEPTH and
+                    static_eval >= beta and self._has_pieces(board)):
+                score = self._null_move_search(depth, beta, ply)
+                if score is not None:
+                    return score
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = NULL_MOVE
+        moves = 0  # Legal moves seen, searched or pruned
+        searched = 0
+        ordering = self.ordering
+        previous = self._moves[ply - 1] if ply else NULL_MOVE
+        quiets = []  # Quiet moves searched without a cutoff
+        futile = (self.use_futility and static_eval is not None and depth < len(FUTILITY_MARGINS) and
+                  static_eval + FUTILITY_MARGINS[depth] <= alpha)
+        for move in ordering.moves(board, ply, tt_move, previous):
+            if not ply and move in self._excluded:
+                continue  # Already the first move of a better line
+            moves += 1
+            quiet = not move & _TACTICAL
+            self._moves[ply] = move
+            board.make_move(move)
+
+            late = quiet and not in_check and searched
+            if late and (futile or depth >= LMR_MIN_DEPTH):
+                # Moves that give check are never pruned or reduced
+                late = not board.is_check(board.get_current_player())
+            if futile and late:
+                board.unmake_move()
+                stats['futility_prunes'] += 1
+                if static_eval + FUTILITY_MARGINS[depth] > best_score:
+                    best_score = static_eval + FUTILITY_MARGINS[depth]
+                continue
+
+            if not searched:
+                score = -self._search(depth - 1, -beta, -alpha, ply + 1)
+            else:
+                reduction = 0
+                if (self.use_late_move_reductions and late and depth >= LMR_MIN_DEPTH and
+                        moves > LMR_MIN_MOVES and move not in ordering.killers[ply]):
+                    reduction = LMR_TABLE[min(depth, 63)][min(moves, 63)] - pv_node
+                    reduction = max(0, min(reduction, depth - 2))
+                if reduction:
+                    stats['lmr_reductions'] += 1
+                    score = -self._search(depth - 1 - reduction, -alpha - 1, -alpha, ply + 1)
+                    if score > alpha:
+                        stats['lmr_researches'] += 1
+                        score = -self._search(depth - 1, -alpha - 1, -alpha, ply + 1)
+                else:
+                    score = -self._search(depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self._search(depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move()
+            searched += 1
+            if self._stopped:
+                return 0
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                    if score >= beta:
+                        if quiet:
+                            ordering.update(board, move, ply, depth, previous, quiets)
+                        break
+            if quiet:
+                quiets.append(move)
+
+        if not moves:
+            # Checkmate or stalemate
+            return -MATE_SCORE + ply if in_check else DRAW_SCORE
+
+        if best_score >= beta:
+            bound = LOWER_BOUND
+        elif best_score > original_alpha:
+            bound = EXACT
+        else:
+            bound = UPPER_BOUND
+            best_move = NULL_MOVE  # No move proved best in a failed-low node
+        if ply or not self._excluded:
+            # Without the excluded moves, the root result is not the position's
+            self.tt.store(key, depth, score_to_tt(best_score, ply), bound, best_move)
+        return best_score
+
+    def _null_move_search(self, depth, beta, ply):
+        """
+        Try null-move pruning at a node.
+
+        The side to move passes and the opponent searches with reduced depth;
+        if the position still fails high, a real move would almost certainly
+        do so too. In zugzwang that reasoning fails, so a cutoff at depth
+        NULL_MOVE_VERIFY_DEPTH and up is only trusted after a reduced search
+        of the node itself with null moves disabled also fails high.
+
+        Args:
+            depth: Remaining depth of the node.
+            beta: Upper bound of the node's (null) window.
+            ply: Distance from the root.
+
+        Returns:
+            The score to fail high with, or None if the node must be searched.
+        """
+        board = self._board
+        reduction = NULL_MOVE_REDUCTION + 1 + depth // NULL_MOVE_DEPTH_DIVISOR
+        self._moves[ply] = NULL_MOVE
+        board.make_null_move()
+        score = -self._search(depth - reduction, -beta, -beta + 1, ply + 1, allow_null=False)
+        board.unmake_move()
+        if self._stopped or score < beta:
+            return None
+
+        if score >= MATE_BOUND:
+            score = beta  # A mate found after passing is not a proven mate
+        if depth >= NULL_MOVE_VERIFY_DEPTH:
+            verified = self._search(depth - reduction, beta - 1, beta, ply, allow_null=False)
+            if self._stopped:
+                return None
+            if verified < beta:
+                self.stats['null_move_verify_failures'] += 1
+                return None
+        self.stats['null_move_cutoffs'] += 1
+        return score
+
+    @staticmethod
+    def _has_pieces(board):
+        """Whether the side to move has a piece other than pawns and king (no zugzwang risk)."""
+        base = 0 if board.get_current_player() == 'w' else 6
+        return any(board.piece_count(base + piece_type) for piece_type in (KNIGHT, BISHOP, ROOK, QUEEN))
+
+    def _quiesce(self, alpha, beta, ply, qdepth=0):
+        """
+        Search captures and promotions only until the position is quiet.
+
+        The side to move may "stand pat" on the static evaluation instead of
+        capturing, so the search stops as soon as no capture improves on it.
+        Captures that lose material by static exchange evaluation, and
+        captures that could not lift the score to alpha even if the victim
+        came for free (delta pruning), are skipped. A side in check within
+        the first QSEARCH_EVASION_DEPTH plies has no stand-pat option and
+        searches all its evasions instead, captures first; once one evasion
+        has been searched, captures that lose material are skipped. Deeper
+        in, checks are ignored, as capture sequences that keep giving check
+        would otherwise open full-width nodes without end, and the search
+        ends at QSEARCH_MAX_DEPTH plies whatever the position. With
+        qsearch_checks, quiet moves that give check are searched too, at the
+        first quiescence ply only.
+
+        Args:
+            alpha: Lower bound of the search window.
+            beta: Upper bound of the search window.
+            ply: Distance from the root.
+            qdepth: Distance from the start of the quiescence search.
+
+        Returns:
+            The score from the side to move's point of view (fail-soft).
+        """
+        board = self._board
+        stats = self.stats
+        self.nodes += 1
+        stats['qsearch_nodes'] += 1
+        if not self.nodes & (TIME_CHECK_INTERVAL - 1):
+            self._check_time()
+        if self._stopped:
+            return 0
+        if ply >= MAX_PLY - 1 or qdepth >= QSEARCH_MAX_DEPTH:
+            return self.evaluator.evaluate(board)
+
+        in_check = qdepth < QSEARCH_EVASION_DEPTH and board.is_check(board.get_current_player())
+        if in_check:
+            stand_pat = best_score = -INFINITY
+            moves = board.iter_moves()
+        else:
+            stand_pat = best_score = self.evaluator.evaluate(board)
+            if best_score >= beta:
+                return best_score
+            if self.use_delta_pruning and stand_pat + SEE_VALUES[QUEEN] + DELTA_MARGIN <= alpha:
+                # Not even winning a queen would be enough
+                stats['delta_prunes'] += 1
+                return best_score
+            if best_score > alpha:
+                alpha = best_score
+            moves = board.iter_moves(stage=STAGE_CAPTURES)
+
+        searched = 0
+        for move in moves:
+            if in_check:
+                if (searched and self.use_see_pruning and (move >> 12) & CAPTURE and
+                        is_losing_capture(board, move)):
+                    stats['see_prunes'] += 1
+                    continue
+            else:
+                flags = move >> 12
+                if self.use_delta_pruning and not flags & PROMOTION:
+                    victim = PAWN if flags == EN_PASSANT else board.piece_at((move >> 6) & 63) % 6
+                    if stand_pat + SEE_VALUES[victim] + DELTA_MARGIN <= alpha:
+                        stats['delta_prunes'] += 1
+                        continue
+                if self.use_see_pruning and is_losing_capture(board, move):
+                    stats['see_prunes'] += 1
+                    continue
+
+            board.make_move(move)
+            score = -self._quiesce(-beta, -alpha, ply + 1, qdepth + 1)
+            board.unmake_move()
+            searched += 1
+            if self._stopped:
+                return 0
+
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if score >= beta:
+                        return best_score
+
+        if in_check:
+            return best_score if searched else -MATE_SCORE + ply
+
+        if self.use_qsearch_checks and not qdepth:
+            for move in board.generate_quiets():
+                board.make_move(move)
+                if board.is_check(board.get_current_player()):
+                    stats['qsearch_checks'] += 1
+                    score = -self._quiesce(-beta, -alpha, ply + 1, qdepth + 1)
+                    board.unmake_move()
+                    if self._stopped:
+                        return 0
+                    if score > best_score:
+                        best_score = score
+                        if score > alpha:
+                            alpha = score
+                            if score >= beta:
+                                break
+                else:
+                    board.unmake_move()
+        return best_score
@@ -0,0 +1,106 @@
+from abc import ABC, abstractmethod
+
+from src.board.move import Move
+
+# Score of a checkmate at the root; a mate in n plies scores MATE_SCORE - n
+MATE_SCORE = 30000
+
+# Deepest ply a search may reach
+MAX_PLY = 128
+
+# Scores beyond this are mate scores
+MATE_BOUND = MATE_SCORE - MAX_PLY
+
+
+class BaseEngine(ABC):
+    """
+    Abstract base class for chess engines.
+
+    Engines report their progress as info dictionaries in the format read by
+    Renderer._draw_evaluation_info:
+    - 'score': centipawns from the side to move's point of view (mate scores
+      are beyond MATE_BOUND)
+    - 'depth': depth of the last completed iteration
+    - 'best_line': principal variation as a list of Move objects
+    - 'best_move': first move of the line, or None without legal moves
+    - 'nodes', 'nps', 'time': search statistics
+    Engines that can report several lines (MultiPV) add:
+    - 'lines': the best lines, best first, as dictionaries with 'score',
+      'depth' and 'pv' (a list of Move objects); the first one is the line
+      described by the fields above
+    """
+
+    @abstractmethod
+    def search(self, board, depth=None, time_limit=None, info_callback=None):
+        """
+        Search a position for the best move.
+
+        Args:
+            board: A BaseBoard instance. It is restored to its original position.
+            depth: Maximum depth in plies, or None for the engine default.
+            time_limit: Maximum search time in seconds, or None for no limit.
+            info_callback: Optional function called with an info dictionary
+                           after every completed iteration.
+
+        Returns:
+            The info dictionary of the final result.
+        """
+        pass
+
+    @abstractmethod
+    def stop(self):
+        """Ask a running search to return as soon as possible."""
+        pass
+
+    @abstractmethod
+    def new_game(self):
+        """Forget everything learned from earlier searches, e.g. before a new game."""
+        pass
+
+    def _build_info(self, board, line, score, depth, nodes, seconds):
+        """
+        Build an info dictionary for a search result.
+
+        Args:
+            board: The board in the searched position.
+            line: Principal variation as packed moves.
+            score: Score in centipawns from the side to move's point of view.
+            depth: Depth reached.
+            nodes: Number of nodes searched.
+            seconds: Time spent searching.
+
+        Returns:
+            The info dictionary described in the class docstring.
+        """
+        best_line = self._line_moves(board, line)
+        return {
+            'score': score,
+            'depth': depth,
+            'best_line': best_line,
+            'best_move': best_line[0] if best_line else None,
+            'nodes': nodes,
+            'nps': int(nodes / seconds) if seconds > 0 else 0,
+            'time': round(seconds, 3)
+        }
+
+    @staticmethod
+    def _line_moves(board, line):
+        """
+        Convert a line of packed moves to Move objects, up to its first illegal move.
+
+        Args:
+            board: The board in the position the line starts from; it is restored.
+            line: Packed moves.
+
+        Returns:
+            List of Move objects.
+        """
+        moves = []
+        for move in line:
+            if not board.is_legal_move(move):
+                break
+            moves.append(Move.from_int(move, board))
+            board.make_move(move)
+        for _ in moves:
+            board.unmake_move()
+        return moves
@@ -0,0 +1,236 @@
+"""
+Lazy SMP: parallel search with helper processes sharing one transposition table.
+
+Python threads cannot run the search on more than one core, so the helpers
+are separate processes. Every process runs an ordinary AlphaBetaEngine on
+the same root position and the only communication during the search is the
+transposition table, which lives in a multiprocessing.shared_memory block.
+Helpers start their iterative deepening at staggered depths, so at any
+moment they explore different parts of the tree and fill the table with
+results the others then pick up. The table's key ^ data entry layout makes
+this safe without locks.
+
+The helper processes are started on the first search and kept for later
+ones; call close() to shut them down and free the shared memory.
+
+Each search has an id, and the main process publishes the id of the search
+that may run in a shared value. A helper stops as soon as that value no
+longer matches its search. Unlike a shared Event that is cleared for the
+next search, this cannot restart a straggler still busy with the previous
+position, which would keep writing that position into the shared table.
+"""
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+from src.engine.alpha_beta import AlphaBetaEngine
+from src.engine.base_engine import BaseEngine
+from src.engine.transposition import TranspositionTable, table_bytes
+from src.evaluation.positional_evaluator import PositionalEvaluator
+
+# Seconds to wait for the helpers to finish after the main search stopped
+_HELPER_TIMEOUT = 5.0
+
+
+class _SearchControl:
+    """
+    Stop signal of one helper search, in the interface of threading.Event.is_set.
+
+    The search is stopped once the shared id of the active search differs
+    from its own.
+    """
+
+    def __init__(self, active, search_id):
+        """
+        Args:
+            active: Shared value holding the id of the search allowed to run.
+            search_id: Id of the search this signal belongs to.
+        """
+        self.active = active
+        self.search_id = search_id
+
+    def is_set(self):
+        """Whether the search should stop."""
+        return self.active.value != self.search_id
+
+
+def _helper_main(helper_id, shm_name, evaluator, tasks, results, active):
+    """
+    Run a helper process: search the positions received on the task queue.
+
+    Args:
+        helper_id: Index of the helper, used to stagger start depths.
+        shm_name: Name of the shared memory block holding the table.
+        evaluator: BaseEvaluator to search with.
+        tasks: Queue of (search id, board class, FEN, depth, time limit,
+               table age) tuples, or None to exit.
+        results: Queue receiving (search id, helper id, depth, lines, stats,
+                 nodes) tuples, with lines as (score, packed line) pairs and
+                 the search statistics of the iteration; nodes is None for
+                 per-iteration reports and the other fields are None for the
+                 final report.
+        active: Shared value with the id of the search allowed to run, 0 for none.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    engine = AlphaBetaEngine(evaluator, tt=TranspositionTable(buffer=shm.buf))
+    start_depth = 2 + helper_id % 2
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        search_id, board_class, fen, depth, time_limit, age = task
+        if active.value != search_id:
+            results.put((search_id, helper_id, None, None, None, 0))  # Over before it started
+            continue
+        engine.tt.age = age  # Stay in step with the main process's generations
+        engine.stop_event = _SearchControl(active, search_id)
+
+        def report(info):
+            lines = [(line['score'], [move.to_int() for move in line['pv']]) for line in info['lines']]
+            results.put((search_id, helper_id, info['depth'], lines, info['stats'], None))
+
+        engine.search(board_class(fen), depth, time_limit, report, start_depth=start_depth)
+        results.put((search_id, helper_id, None, None, None, engine.nodes))
+
+    engine = None
+    shm.close()
+
+
+class LazySMPEngine(BaseEngine):
+    """
+    Parallel search over a shared transposition table.
+
+    The main process searches with its own AlphaBetaEngine and reports its
+    iterations through info_callback as usual; when it finishes, the helpers
+    are stopped and the deepest completed iteration of any process is
+    returned. Repetitions before the root are not known to the helpers,
+    which set the position up from its FEN.
+    """
+
+    def __init__(self, processes=None, evaluator=None, tt_size_mb=64, max_depth=64):
+        """
+        Initialize the engine.
+
+        Args:
+            processes: Total number of searching processes including the main
+                       one. Defaults to the number of CPUs.
+            evaluator: Picklable BaseEvaluator for leaf nodes. Defaults to a
+                       PositionalEvaluator.
+            tt_size_mb: Shared transposition table size in megabytes.
+            max_depth: Default maximum search depth in plies.
+        """
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.evaluator = evaluator or PositionalEvaluator()
+        self.tt_size_mb = tt_size_mb
+        self.max_depth = max_depth
+        self._shm = None
+        self._engine = None
+        self._helpers = []
+        self._tasks = []
+        self._results = None
+        self._active = None  # Shared id of the search the helpers may run, 0 for none
+        self._search_id = 0
+
+    def search(self, board, depth=None, time_limit=None, info_callback=None, time_manager=None):
+        """
+        Search a position for the best move on all processes.
+
+        Args:
+            board: A BaseBoard instance. It is restored to its original position.
+            depth: Maximum depth in plies, or None for max_depth.
+            time_limit: Maximum search time in seconds, or None for no limit.
+            info_callback: Optional function called with the main process's
+                           info dictionary after every completed iteration.
+            time_manager: Optional allocated TimeManager steering the main
+                          process's iterations; the helpers stop with it.
+
+        Returns:
+            The info dictionary of the deepest iteration completed by any process,
+            with 'nodes' and 'nps' summed over all processes.
+        """
+        start = time.perf_counter()
+        self._start()
+        self._search_id += 1
+        self._active.value = self._search_id
+
+        depth = depth or self.max_depth
+        fen = board.get_fen()
+        for tasks in self._tasks:
+            tasks.put((self._search_id, type(board), fen, depth, time_limit, self._engine.tt.age))
+
+        info = self._engine.search(board, depth, time_limit, info_callback, time_manager=time_manager)
+        self._active.value = 0
+
+        best = None
+        nodes = info['nodes']
+        pending = len(self._helpers)
+        deadline = time.perf_counter() + _HELPER_TIMEOUT
+        while pending:
+            try:
+                message = self._results.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            search_id, helper_id, helper_depth, lines, stats, helper_nodes = message
+            if search_id != self._search_id:
+                continue
+            if helper_nodes is not None:
+                nodes += helper_nodes
+                pending -= 1
+            elif helper_depth > info['depth'] and (best is None or helper_depth > best[0]):
+                best = (helper_depth, lines, stats)
+
+        seconds = time.perf_counter() - start
+        if best is not None:
+            info = self._engine._search_info(board, best[1], best[0], nodes, seconds, best[2])
+        else:
+            info = dict(info, nodes=nodes, nps=int(nodes / seconds) if seconds > 0 else 0)
+        return info
+
+    def stop(self):
+        """Ask a running search to return as soon as possible."""
+        if self._engine is not None:
+            self._engine.stop()
+        if self._active is not None:
+            self._active.value = 0
+
+    def new_game(self):
+        """Clear the shared transposition table."""
+        if self._engine is not None:
+            self._engine.new_game()
+
+    def close(self):
+        """Stop the helper processes and free the shared memory."""
+        for tasks in self._tasks:
+            tasks.put(None)
+        for helper in self._helpers:
+            helper.join(timeout=_HELPER_TIMEOUT)
+            if helper.is_alive():
+                helper.terminate()
+        self._helpers = []
+        self._tasks = []
+        self._engine = None  # Releases the view of the shared buffer
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _start(self):
+        """Create the shared table and start the helper processes, once."""
+        if self._shm is not None:
+            return
+        self._shm = shared_memory.SharedMemory(create=True, size=table_bytes(self.tt_size_mb))
+        self._engine = AlphaBetaEngine(self.evaluator, max_depth=self.max_depth,
+                                       tt=TranspositionTable(buffer=self._shm.buf))
+        self._results = multiprocessing.Queue()
+        self._active = multiprocessing.Value('q', 0, lock=False)
+        for helper_id in range(self.processes - 1):
+            tasks = multiprocessing.Queue()
+            helper = multiprocessing.Process(
+                target=_helper_main, daemon=True,
+                args=(helper_id, self._shm.name, self.evaluator, tasks, self._results, self._active))
+            helper.start()
+            self._tasks.append(tasks)
+            self._helpers.append(helper)
@@ -0,0 +1,216 @@
+"""
+Move ordering for the alpha-beta search.
+
+Alpha-beta prunes the most when the best move of a node is searched first,
+so the engine asks a MoveOrdering for the moves of every node instead of
+generating them directly. Moves come in stages, each generated only when
+the previous one is exhausted:
+
+    1. the transposition table move
+    2. captures and promotions in MVV-LVA order, except losing captures
+    3. the two killer moves of the ply (quiet moves that caused a cutoff
+       in a sibling node)
+    4. the countermove of the opponent's last move (the quiet move that
+       last refuted the same piece arriving on the same square)
+    5. the remaining quiet moves, by butterfly history score
+    6. the captures that static exchange evaluation says lose material
+
+Every heuristic can be switched off, e.g. to measure its node reduction
+with ``python -m src.utils.search_bench``.
+"""
+from src.board.base_board import SEE_VALUES
+from src.board.constants import WHITE, BLACK
+from src.board.move import NULL_MOVE, CAPTURE, EN_PASSANT, PROMOTION
+from src.engine.base_engine import MAX_PLY
+
+# Move flags of captures and promotions, which never go to the quiet tables
+_TACTICAL = (CAPTURE | PROMOTION) << 12
+
+# History scores stay within +-HISTORY_MAX; bonuses shrink as a score approaches it
+HISTORY_MAX = 16384
+
+# History bonus per squared ply of remaining depth, and its cap; large
+# enough against HISTORY_MAX that old scores fade as new cutoffs come in
+HISTORY_SCALE = 32
+HISTORY_BONUS_MAX = 2048
+
+# Heuristic names accepted by MoveOrdering, in the order the benchmark disables them
+HEURISTICS = ('tt_move', 'mvv_lva', 'see', 'killers', 'countermoves', 'history')
+
+
+def is_losing_capture(board, move):
+    """
+    Check whether static exchange evaluation says a capture loses material.
+
+    Promotions and en passant captures are never considered losing, and
+    neither is taking a piece at least as valuable as the capturing one, so
+    board.see is only called when the exchange is really in doubt.
+
+    Args:
+        board: A BaseBoard instance.
+        move: A packed capture or promotion of the current player.
+
+    Returns:
+        True if the capture loses material.
+    """
+    flags = move >> 12
+    if flags & PROMOTION or flags == EN_PASSANT:
+        return False
+    attacker = SEE_VALUES[board.piece_at(move & 63) % 6]
+    victim = SEE_VALUES[board.piece_at((move >> 6) & 63) % 6]
+    return attacker > victim and board.see(move) < 0
+
+
+class MoveOrdering:
+    """
+    Move ordering state of one engine: killers, countermoves and history.
+
+    History scores are indexed by the low 12 bits of a packed move (its
+    origin and destination squares), so one is kept per color and from/to
+    pair. Countermoves are indexed by the piece that made the move they
+    answer and its destination square.
+
+    Attributes:
+        use_tt_move, use_mvv_lva, use_see, use_killers, use_countermoves,
+        use_history: Switches for the individual heuristics.
+    """
+
+    def __init__(self, tt_move=True, mvv_lva=True, see=True, killers=True,
+                 countermoves=True, history=True):
+        """
+        Initialize empty tables.
+
+        Args:
+            tt_move: Try the transposition table move first.
+            mvv_lva: Sort captures by MVV-LVA instead of generation order.
+            see: Search captures that lose material after the quiet moves.
+            killers: Try the killer moves before other quiet moves.
+            countermoves: Try the countermove before other quiet moves.
+            history: Sort quiet moves by history score.
+        """
+        self.use_tt_move = tt_move
+        self.use_mvv_lva = mvv_lva
+        self.use_see = see
+        self.use_killers = killers
+        self.use_countermoves = countermoves
+        self.use_history = history
+        self.killers = [[NULL_MOVE, NULL_MOVE] for _ in range(MAX_PLY)]
+        self.countermoves = [NULL_MOVE] * 768  # Indexed by piece * 64 + destination
+        self.history = [[0] * 4096, [0] * 4096]  # Per color, indexed by move & 0xFFF
+
+    def moves(self, board, ply, tt_move=NULL_MOVE, previous=NULL_MOVE):
+        """
+        Lazily yield the legal moves of a node in search order.
+
+        The board may be changed between items as long as it is restored
+        (make_move then unmake_move) before the next one is requested.
+
+        Args:
+            board: A BaseBoard instance.
+            ply: Distance from the root, selecting the killer slots.
+            tt_move: Packed move from the transposition table, or NULL_MOVE.
+            previous: The opponent's move that led to this node, or NULL_MOVE.
+
+        Yields:
+            Packed integer moves, each exactly once.
+        """
+        if self.use_tt_move and tt_move != NULL_MOVE and board.is_legal_move(tt_move):
+            yield tt_move
+        else:
+            tt_move = NULL_MOVE
+
+        captures = board.generate_captures()
+        if self.use_mvv_lva:
+            captures = sorted(captures, key=board.mvv_lva, reverse=True)
+        losing = []
+        for move in captures:
+            if move == tt_move:
+                continue
+            if self.use_see and is_losing_capture(board, move):
+                losing.append(move)
+            else:
+                yield move
+
+        played = [tt_move]
+        refutations = []
+        if self.use_killers:
+            refutations.extend(self.killers[ply])
+        if self.use_countermoves and previous != NULL_MOVE:
+            refutations.append(self.countermoves[self._counter_index(board, previous)])
+        for move in refutations:
+            if (move != NULL_MOVE and not move & _TACTICAL and move not in played and
+                    board.is_legal_move(move)):
+                played.append(move)
+                yield move
+
+        quiets = board.generate_quiets()
+        if self.use_history:
+            history = self.history[self._color(board)]
+            quiets = sorted(quiets, key=lambda move: history[move & 0xFFF], reverse=True)
+        for move in quiets:
+            if move not in played:
+                yield move
+
+        yield from losing
+
+    def update(self, board, move, ply, depth, previous=NULL_MOVE, tried=()):
+        """
+        Reward a quiet move that caused a beta cutoff.
+
+        The move becomes the first killer of the ply and the countermove of
+        the previous move. It gains history in proportion to the squared
+        depth, while the quiet moves searched before it, and only those, lose
+        the same amount.
+
+        Args:
+            board: The board at the node, with the move not made.
+            move: The packed quiet move that failed high.
+            ply: Distance from the root.
+            depth: Remaining depth of the node; deeper cutoffs weigh more.
+            previous: The opponent's move that led to the node, or NULL_MOVE.
+            tried: Quiet moves searched before move without a cutoff.
+        """
+        killers = self.killers[ply]
+        if move != killers[0]:
+            killers[1] = killers[0]
+            killers[0] = move
+        if previous != NULL_MOVE:
+            self.countermoves[self._counter_index(board, previous)] = move
+
+        history = self.history[self._color(board)]
+        bonus = min(HISTORY_SCALE * depth * depth, HISTORY_BONUS_MAX)
+        self._add_history(history, move, bonus)
+        for other in tried:
+            self._add_history(history, other, -bonus)
+
+    def new_search(self):
+        """Age the tables for a new search: clear the killers and halve the history."""
+        for killers in self.killers:
+            killers[0] = killers[1] = NULL_MOVE
+        for history in self.history:
+            history[:] = [score // 2 for score in history]
+
+    def clear(self):
+        """Forget everything, e.g. for a new game."""
+        for killers in self.killers:
+            killers[0] = killers[1] = NULL_MOVE
+        self.countermoves[:] = [NULL_MOVE] * 768
+        for history in self.history:
+            history[:] = [0] * 4096
+
+    @staticmethod
+    def _color(board):
+        """Index of the side to move."""
+        return WHITE if board.get_current_player() == 'w' else BLACK
+
+    @staticmethod
+    def _counter_index(board, previous):
+        """Countermove table index of the opponent's last move: its piece and destination."""
+        to_sq = (previous >> 6) & 63
+        return board.piece_at(to_sq) * 64 + to_sq
+
+    @staticmethod
+    def _add_history(history, move, bonus):
+        """Add a bonus (or malus) to a history score, saturating towards HISTORY_MAX."""
+        index = move & 0xFFF
+        history[index] += bonus - history[index] * abs(bonus) // HISTORY_MAX
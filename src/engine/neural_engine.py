@@ -0,0 +1,825 @@
+"""
+Neural network evaluation with NumPy.
+
+NNUEEvaluator is an efficiently updatable neural network in the style of
+NNUE. Its input layer has one binary feature per (own king square, piece,
+square) triple, with kings themselves not being features (HalfKP), seen
+from each side's perspective:
+
+    feature = (king_square * 10 + piece_kind) * 64 + square
+
+where piece_kind is 0-4 for the perspective's own pawn to queen and 5-9 for
+the opponent's, and Black's squares are mirrored vertically so both
+perspectives see the board from their own side. Of the 40960 features at
+most 30 are active, so the first layer's output for a perspective (its
+accumulator) is the bias plus the sum of the weight rows of the active
+features. The rest of the network is small and dense:
+
+    [acc_us, acc_them] -> clip(0, 1) -> L1 -> clip(0, 1) -> L2 -> clip(0, 1) -> output
+
+A move changes only a few features, so the accumulators are never summed
+from scratch. The evaluator listens to the board (see
+BaseBoard.add_listener) and records every move's feature changes on a
+stack, one entry per ply, that unmake_move pops. An accumulator is only
+brought up to date when a position is evaluated, by adding and subtracting
+the changed weight rows to the nearest computed accumulator below it on the
+stack, so moves that are never evaluated cost no vector arithmetic. A king
+move changes every feature of its own perspective; that perspective is
+then rebuilt from a per-king-square cache of accumulators and their active
+features (a "Finny table"), which only needs the difference between the
+cached and the current piece placement.
+
+Weights are stored in a plain ``.npz`` archive; see NNUE_WEIGHTS.
+
+MCTSEngine searches with Monte Carlo tree search guided by a policy-value
+network (PUCT, as in AlphaZero). Evaluating leaves one at a time would
+spend most of the time in Python and NumPy call overhead, so each round of
+the search descends the tree batch_size times. Virtual loss steers the
+descents apart. The leaves found are encoded into one (B, PLANES, 8, 8)
+array and evaluated in a single vectorized forward pass, and all results
+are backed up. The tree keeps its nodes in parallel NumPy arrays (struct of
+arrays) with each node's children in one contiguous slice, about 28 bytes
+per node instead of a Python object each.
+"""
+import math
+import time
+
+import numpy as np
+
+from src.board.batch import PositionBatch
+from src.board.constants import (
+    WHITE, BLACK, KNIGHT, ROOK, KING, EMPTY,
+    WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE
+)
+from src.board.move import NULL_MOVE, KING_CASTLE, QUEEN_CASTLE, EN_PASSANT, PROMOTION
+from src.engine.base_engine import BaseEngine, MATE_SCORE
+from src.evaluation.base_evaluator import BaseEvaluator
+
+# Number of input features per perspective: king square x 10 piece kinds x square
+NNUE_FEATURES = 64 * 10 * 64
+
+# Arrays of a weight archive and their shapes; H is the accumulator size
+NNUE_WEIGHTS = {
+    'ft_weight': ('NNUE_FEATURES', 'H'),
+    'ft_bias': ('H',),
+    'l1_weight': ('2H', 32),
+    'l1_bias': (32,),
+    'l2_weight': (32, 32),
+    'l2_bias': (32,),
+    'out_weight': (32, 1),
+    'out_bias': (1,),
+}
+
+# Default accumulator size of NNUEEvaluator.random
+DEFAULT_HIDDEN = 256
+
+# Network outputs are multiplied by this to give centipawns, unless the
+# archive has its own 'scale'
+DEFAULT_SCALE = 400.0
+
+
+def _feature(perspective, king_square, piece, square):
+    """
+    Index of the feature of a (non-king) piece on a square, seen from one side.
+
+    Args:
+        perspective: WHITE or BLACK.
+        king_square: Square of the perspective's king (row * 8 + col).
+        piece: Piece index (color * 6 + piece type).
+        square: Square of the piece.
+
+    Returns:
+        The feature index.
+    """
+    kind = piece % 6 + (5 if piece // 6 != perspective else 0)
+    if perspective == BLACK:
+        king_square ^= 56
+        square ^= 56
+    return (king_square * 10 + kind) * 64 + square
+
+
+class NNUEEvaluator(BaseEvaluator):
+    """
+    Evaluates positions with an NNUE-style network and incrementally updated accumulators.
+
+    The evaluator attaches itself to the board it is asked to evaluate and
+    stays attached until detach() or until it evaluates a different board.
+    It keeps its state in step with that board through the listener calls,
+    so it should not be shared between boards searched at the same time.
+
+    Attributes:
+        weights: Dictionary of float32 weight arrays, keyed as in NNUE_WEIGHTS.
+        scale: Centipawns per unit of network output.
+    """
+
+    def __init__(self, weights, scale=DEFAULT_SCALE):
+        """
+        Initialize the evaluator.
+
+        Args:
+            weights: Dictionary of weight arrays with the names and shapes
+                     listed in NNUE_WEIGHTS.
+            scale: Centipawns per unit of network output.
+
+        Raises:
+            ValueError: If an array is missing or has the wrong shape.
+        """
+        hidden = np.shape(weights.get('ft_bias', ()))[:1]
+        sizes = {'NNUE_FEATURES': NNUE_FEATURES, 'H': hidden[0] if hidden else 0,
+                 '2H': 2 * hidden[0] if hidden else 0}
+        self.weights = {}
+        for name, shape in NNUE_WEIGHTS.items():
+            if name not in weights:
+                raise ValueError(f"NNUE weights lack {name!r}")
+            expected = tuple(sizes.get(size, size) for size in shape)
+            array = np.asarray(weights[name], dtype=np.float32)
+            if array.shape != expected:
+                raise ValueError(f"NNUE weight {name!r} has shape {array.shape}, expected {expected}")
+            self.weights[name] = array
+        self.scale = scale
+        self._ft_weight = self.weights['ft_weight']
+        self._input = np.empty(2 * sizes['H'], dtype=np.float32)  # Reused input of the dense layers
+        self._board = None
+        self._accumulators = []  # Per ply: [white, black] accumulator, or None until computed
+        self._changes = []  # Per ply: per perspective (added, removed) features, None to rebuild
+        self._kings = []  # Per ply: (white king square, black king square)
+        self._finny = [{}, {}]  # Per perspective: king square -> (accumulator, active features)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load weights from a ``.npz`` archive, as written by save.
+
+        Args:
+            path: File name of the archive.
+
+        Returns:
+            An NNUEEvaluator. A 'scale' array in the archive overrides DEFAULT_SCALE.
+        """
+        with np.load(path) as archive:
+            weights = {name: archive[name] for name in archive.files}
+        scale = float(weights.pop('scale')) if 'scale' in weights else DEFAULT_SCALE
+        return cls(weights, scale)
+
+    def save(self, path):
+        """
+        Save the weights as a ``.npz`` archive.
+
+        Args:
+            path: File name of the archive.
+        """
+        np.savez(path, scale=np.float32(self.scale), **self.weights)
+
+    @classmethod
+    def random(cls, hidden=DEFAULT_HIDDEN, seed=0):
+        """
+        Create an evaluator with random weights, e.g. as a starting point for training or for benchmarks.
+
+        Args:
+            hidden: Accumulator size per perspective.
+            seed: Seed of the random generator.
+
+        Returns:
+            An NNUEEvaluator.
+        """
+        rng = np.random.default_rng(seed)
+        weights = {}
+        for name, shape in NNUE_WEIGHTS.items():
+            shape = tuple({'NNUE_FEATURES': NNUE_FEATURES, 'H': hidden, '2H': 2 * hidden}.get(size, size)
+                          for size in shape)
+            fan_in = shape[0] if len(shape) > 1 and name != 'ft_weight' else 32
+            weights[name] = rng.normal(0.0, 1.0 / np.sqrt(fan_in), shape).astype(np.float32)
+        return cls(weights)
+
+    def evaluate(self, board):
+        """
+        Evaluate a position with the network.
+
+        Args:
+            board: A BaseBoard instance.
+
+        Returns:
+            Score in centipawns, positive if the side to move is better.
+        """
+        if board is not self._board:
+            self.attach(board)
+        us = WHITE if board.get_current_player() == 'w' else BLACK
+        return self._forward(self._accumulator(us), self._accumulator(us ^ 1))
+
+    def attach(self, board):
+        """
+        Follow a board's moves from now on, detaching from the previous board.
+
+        Args:
+            board: A BaseBoard instance.
+        """
+        self.detach()
+        self._board = board
+        board.add_listener(self)
+        self.reset(board)
+
+    def detach(self):
+        """Stop following the attached board, if any."""
+        if self._board is not None:
+            self._board.remove_listener(self)
+            self._board = None
+
+    def reset(self, board):
+        """Board listener: the position was set up anew; start a new stack."""
+        kings = [-1, -1]
+        for square in range(64):
+            piece = board.piece_at(square)
+            if piece != EMPTY and piece % 6 == KING:
+                kings[piece // 6] = square
+        self._accumulators = [[None, None]]
+        self._changes = [None]
+        self._kings = [tuple(kings)]
+
+    def moved(self, board, move, piece, captured):
+        """Board listener: record the feature changes of a move made on the board."""
+        kings = self._kings[-1]
+        if move == NULL_MOVE:
+            self._accumulators.append([None, None])
+            self._changes.append((((), ()), ((), ())))
+            self._kings.append(kings)
+            return
+
+        from_sq = move & 63
+        to_sq = (move >> 6) & 63
+        flags = move >> 12
+        color = piece // 6
+
+        # Piece placement changes as (piece, square) pairs
+        removed = [(piece, from_sq)]
+        added = [(color * 6 + KNIGHT + (flags & 3) if flags & PROMOTION else piece, to_sq)]
+        if captured != EMPTY:
+            removed.append((captured, to_sq - 8 if color == WHITE else to_sq + 8)
+                           if flags == EN_PASSANT else (captured, to_sq))
+        if flags == KING_CASTLE:
+            removed.append((color * 6 + ROOK, from_sq + 3))
+            added.append((color * 6 + ROOK, from_sq + 1))
+        elif flags == QUEEN_CASTLE:
+            removed.append((color * 6 + ROOK, from_sq - 4))
+            added.append((color * 6 + ROOK, from_sq - 1))
+
+        if piece % 6 == KING:
+            kings = (to_sq, kings[1]) if color == WHITE else (kings[0], to_sq)
+            added = added[1:]  # Kings are not features; any rook move of castling remains
+            removed = removed[1:]
+        changes = []
+        for perspective in (WHITE, BLACK):
+            if piece % 6 == KING and color == perspective:
+                changes.append(None)  # Every feature of this perspective changed
+                continue
+            king_square = kings[perspective]
+            changes.append(([_feature(perspective, king_square, p, s) for p, s in added],
+                            [_feature(perspective, king_square, p, s) for p, s in removed]))
+
+        self._accumulators.append([None, None])
+        self._changes.append(changes)
+        self._kings.append(kings)
+
+    def unmoved(self, board):
+        """Board listener: a move was taken back; drop its stack entry."""
+        if len(self._changes) == 1:
+            self.reset(board)  # Taken back past the position the stack starts from
+            return
+        self._accumulators.pop()
+        self._changes.pop()
+        self._kings.pop()
+
+    def _accumulator(self, perspective):
+        """
+        Bring the accumulator of the current position up to date for one perspective.
+
+        Walks down the stack to the nearest computed accumulator and applies
+        the recorded changes on the way back up, keeping the intermediate
+        results for sibling positions. If a king move of the perspective (or
+        the bottom of the stack) comes first, the accumulator is rebuilt from
+        the Finny table instead.
+        """
+        accumulators = self._accumulators
+        changes = self._changes
+        top = len(accumulators) - 1
+        ply = top
+        while accumulators[ply][perspective] is None:
+            if changes[ply] is None or changes[ply][perspective] is None:
+                accumulators[top][perspective] = self._rebuild(perspective)
+                return accumulators[top][perspective]
+            ply -= 1
+
+        accumulator = accumulators[ply][perspective]
+        weight = self._ft_weight
+        for ply in range(ply + 1, top + 1):
+            added, removed = changes[ply][perspective]
+            if added or removed:
+                accumulator = accumulator.copy()
+                for feature in added:
+                    accumulator += weight[feature]
+                for feature in removed:
+                    accumulator -= weight[feature]
+            accumulators[ply][perspective] = accumulator
+        return accumulator
+
+    def _rebuild(self, perspective):
+        """
+        Compute one perspective's accumulator of the current position via the Finny table.
+
+        The table keeps, per king square, the accumulator last computed for
+        that square and its active features; only the features that differ
+        from the current position's are added or subtracted.
+        """
+        board = self._board
+        king_square = self._kings[-1][perspective]
+        active = set()
+        for square in range(64):
+            piece = board.piece_at(square)
+            if piece != EMPTY and piece % 6 != KING:
+                active.add(_feature(perspective, king_square, piece, square))
+
+        cached = self._finny[perspective].get(king_square)
+        if cached is None:
+            accumulator, cached_active = self.weights['ft_bias'], set()
+        else:
+            accumulator, cached_active = cached
+        weight = self._ft_weight
+        accumulator = accumulator.copy()
+        for feature in active - cached_active:
+            accumulator += weight[feature]
+        for feature in cached_active - active:
+            accumulator -= weight[feature]
+        self._finny[perspective][king_square] = (accumulator, active)
+        return accumulator
+
+    def _forward(self, ours, theirs):
+        """Run the dense layers on the two accumulators, side to move first."""
+        weights = self.weights
+        hidden = self._input
+        size = len(ours)
+        hidden[:size] = ours
+        hidden[size:] = theirs
+        for layer in ('l1', 'l2'):
+            # Clipped ReLU with the ufuncs directly; np.clip's wrapper costs more than the layer
+            np.maximum(hidden, 0.0, out=hidden)
+            np.minimum(hidden, 1.0, out=hidden)
+            hidden = hidden @ weights[layer + '_weight']
+            hidden += weights[layer + '_bias']
+        np.maximum(hidden, 0.0, out=hidden)
+        np.minimum(hidden, 1.0, out=hidden)
+        output = hidden @ weights['out_weight'] + weights['out_bias']
+        return int(output[0] * self.scale)
+
+
+# Input planes of the policy-value network: 12 piece planes (the side to
+# move's pieces first), 4 castling right planes (own then opponent's,
+# kingside first) and the en passant target, all seen from the side to move
+PLANES = 17
+
+# Policy outputs, one per (from, to) square pair seen from the side to move;
+# promotions to different pieces share an output
+POLICY_SIZE = 64 * 64
+
+# Arrays of a policy-value weight archive and their shapes; H is the hidden size
+POLICY_VALUE_WEIGHTS = {
+    'hidden_weight': (PLANES * 64, 'H'),
+    'hidden_bias': ('H',),
+    'policy_weight': ('H', POLICY_SIZE),
+    'policy_bias': (POLICY_SIZE,),
+    'value_weight': ('H', 1),
+    'value_bias': (1,),
+}
+
+# Default search settings of MCTSEngine
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_PLAYOUTS = 800
+C_PUCT = 1.5
+VIRTUAL_LOSS = 1
+
+# Unvisited children are valued at the parent's value minus this (first play urgency)
+FPU_REDUCTION = 0.25
+
+# Seconds between info callbacks of a running MCTS search
+INFO_INTERVAL = 0.25
+
+# Node states
+_UNEXPANDED = 0
+_PENDING = 1  # Selected as a leaf of the current batch
+_EXPANDED = 2
+_TERMINAL = 3
+
+# Castling rights in plane order, seen from White and from Black
+_CASTLING_PLANES = ((WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE),
+                    (BLACK_KINGSIDE, BLACK_QUEENSIDE, WHITE_KINGSIDE, WHITE_QUEENSIDE))
+
+# Own pieces first: piece plane order seen from Black
+_BLACK_PIECE_ORDER = list(range(6, 12)) + list(range(6))
+
+
+def encode_planes(batch):
+    """
+    Encode a batch of positions as policy-value network input.
+
+    Positions with Black to move are mirrored vertically and have the
+    colors swapped, so the network always sees the side to move playing up
+    the board.
+
+    Args:
+        batch: A PositionBatch.
+
+    Returns:
+        (N, PLANES, 8, 8) float32 array.
+    """
+    size = len(batch)
+    pieces = batch.planes().reshape(size, 12, 8, 8)
+    black = batch.side == BLACK
+    pieces[black] = pieces[black][:, _BLACK_PIECE_ORDER, ::-1, :]
+
+    planes = np.zeros((size, PLANES, 8, 8), dtype=np.float32)
+    planes[:, :12] = pieces
+    for plane in range(4):
+        rights = np.where(black, _CASTLING_PLANES[BLACK][plane], _CASTLING_PLANES[WHITE][plane])
+        planes[:, 12 + plane] = ((batch.castling & rights) != 0)[:, None, None]
+    ep = batch.ep_square.astype(np.int64)
+    rows = np.nonzero(ep >= 0)[0]
+    squares = np.where(black[rows], ep[rows] ^ 56, ep[rows])
+    planes[rows, 16, squares >> 3, squares & 7] = 1.0
+    return planes
+
+
+def policy_indices(moves, side):
+    """
+    Map packed moves to policy outputs.
+
+    Args:
+        moves: (N, M) array of packed moves.
+        side: (N,) side to move array.
+
+    Returns:
+        (N, M) int64 array of indices into the POLICY_SIZE outputs.
+    """
+    moves = moves.astype(np.int64)
+    flip = np.where(side == BLACK, 56, 0)[:, None]
+    return ((moves & 63) ^ flip) * 64 + (((moves >> 6) & 63) ^ flip)
+
+
+class PolicyValueNetwork:
+    """
+    Policy-value network in NumPy: one hidden ReLU layer feeding a policy and a value head.
+
+    Attributes:
+        weights: Dictionary of float32 weight arrays, keyed as in POLICY_VALUE_WEIGHTS.
+    """
+
+    def __init__(self, weights):
+        """
+        Initialize the network.
+
+        Args:
+            weights: Dictionary of weight arrays with the names and shapes
+                     listed in POLICY_VALUE_WEIGHTS.
+
+        Raises:
+            ValueError: If an array is missing or has the wrong shape.
+        """
+        hidden = np.shape(weights.get('hidden_bias', ()))[:1]
+        self.weights = {}
+        for name, shape in POLICY_VALUE_WEIGHTS.items():
+            if name not in weights:
+                raise ValueError(f"Policy-value weights lack {name!r}")
+            expected = tuple((hidden[0] if hidden else 0) if size == 'H' else size for size in shape)
+            array = np.asarray(weights[name], dtype=np.float32)
+            if array.shape != expected:
+                raise ValueError(f"Policy-value weight {name!r} has shape {array.shape}, expected {expected}")
+            self.weights[name] = array
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load weights from a ``.npz`` archive, as written by save.
+
+        Args:
+            path: File name of the archive.
+
+        Returns:
+            A PolicyValueNetwork.
+        """
+        with np.load(path) as archive:
+            return cls({name: archive[name] for name in archive.files})
+
+    def save(self, path):
+        """
+        Save the weights as a ``.npz`` archive.
+
+        Args:
+            path: File name of the archive.
+        """
+        np.savez(path, **self.weights)
+
+    @classmethod
+    def random(cls, hidden=256, seed=0):
+        """
+        Create a network with random weights, e.g. as a starting point for training or for benchmarks.
+
+        Args:
+            hidden: Size of the hidden layer.
+            seed: Seed of the random generator.
+
+        Returns:
+            A PolicyValueNetwork.
+        """
+        rng = np.random.default_rng(seed)
+        weights = {}
+        for name, shape in POLICY_VALUE_WEIGHTS.items():
+            shape = tuple(hidden if size == 'H' else size for size in shape)
+            scale = 1.0 / np.sqrt(shape[0]) if len(shape) > 1 else 0.0
+            weights[name] = rng.normal(0.0, scale, shape).astype(np.float32)
+        return cls(weights)
+
+    def __call__(self, planes):
+        """
+        Evaluate a batch of encoded positions.
+
+        Args:
+            planes: (N, PLANES, 8, 8) array from encode_planes.
+
+        Returns:
+            Tuple (policy, value): (N, POLICY_SIZE) float32 logits and (N,)
+            float32 values in [-1, 1], both from the side to move's view.
+        """
+        weights = self.weights
+        hidden = planes.reshape(len(planes), -1) @ weights['hidden_weight'] + weights['hidden_bias']
+        np.maximum(hidden, 0.0, out=hidden)
+        policy = hidden @ weights['policy_weight'] + weights['policy_bias']
+        value = np.tanh(hidden @ weights['value_weight'] + weights['value_bias'])[:, 0]
+        return policy, value
+
+
+class _Tree:
+    """
+    MCTS tree stored as a struct of arrays.
+
+    Node 0 is the root. The children of an expanded node occupy the slots
+    first_child[node] to first_child[node] + child_count[node] - 1. A node's
+    value_sum is from the point of view of the player who made the move
+    leading to it, so a parent picks the child with the highest value.
+    """
+
+    def __init__(self, capacity=1024):
+        self.size = 1
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.move = np.zeros(capacity, dtype=np.uint16)  # Move leading to the node
+        self.prior = np.zeros(capacity, dtype=np.float32)
+        self.visits = np.zeros(capacity, dtype=np.int32)  # Including virtual visits
+        self.value_sum = np.zeros(capacity, dtype=np.float32)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.child_count = np.zeros(capacity, dtype=np.uint8)
+        self.state = np.zeros(capacity, dtype=np.int8)
+        self.outcome = np.zeros(capacity, dtype=np.float32)  # Value of terminal nodes, for their side to move
+
+    def add_children(self, node, moves, priors):
+        """Expand a node with the given moves and prior probabilities."""
+        count = len(moves)
+        start = self.size
+        if start + count > len(self.parent):
+            self._grow(start + count)
+        end = start + count
+        self.parent[start:end] = node
+        self.move[start:end] = moves
+        self.prior[start:end] = priors
+        self.first_child[node] = start
+        self.child_count[node] = count
+        self.state[node] = _EXPANDED
+        self.size = end
+
+    def select_child(self, node, c_puct):
+        """Pick the child of an expanded node with the highest PUCT score."""
+        start = self.first_child[node]
+        end = start + self.child_count[node]
+        visits = self.visits[start:end]
+        parent_visits = self.visits[node]
+        parent_value = -self.value_sum[node] / parent_visits if parent_visits else 0.0
+        q = np.where(visits > 0, self.value_sum[start:end] / np.maximum(visits, 1),
+                     parent_value - FPU_REDUCTION)
+        u = (c_puct * math.sqrt(max(parent_visits, 1))) * self.prior[start:end] / (1 + visits)
+        return start + int(np.argmax(q + u))
+
+    def add_virtual_loss(self, path, amount):
+        """Count a pending playout through the path as a loss for every node on it."""
+        self.visits[path] += amount
+        self.value_sum[path] -= amount
+
+    def backup(self, path, value, virtual_loss):
+        """
+        Back a leaf value up the path, replacing the virtual loss added for it.
+
+        Args:
+            path: int array of nodes from the root to the leaf.
+            value: Leaf value for the side to move at the leaf.
+            virtual_loss: Virtual loss added to the path when it was selected.
+        """
+        # The leaf's value_sum is from the opponent's view; signs alternate upwards
+        signs = np.where((len(path) - 1 - np.arange(len(path))) % 2 == 0, -1.0, 1.0)
+        self.visits[path] += 1 - virtual_loss
+        self.value_sum[path] += signs * value + virtual_loss
+
+    def best_child(self, node):
+        """The most visited child of an expanded node."""
+        start = self.first_child[node]
+        return start + int(np.argmax(self.visits[start:start + self.child_count[node]]))
+
+    def principal_variation(self):
+        """Nodes along the most visited path from the root."""
+        line = []
+        node = 0
+        while self.state[node] == _EXPANDED:
+            node = self.best_child(node)
+            if not self.visits[node]:
+                break
+            line.append(node)
+        return line
+
+    def _grow(self, needed):
+        """Enlarge all arrays to at least needed slots."""
+        capacity = max(needed, 2 * len(self.parent))
+        for name, fill in (('parent', -1), ('move', 0), ('prior', 0), ('visits', 0), ('value_sum', 0),
+                           ('first_child', -1), ('child_count', 0), ('state', _UNEXPANDED), ('outcome', 0)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+
+def _value_to_score(value):
+    """Convert an expected outcome in [-1, 1] to centipawns (logistic, 400 per factor of 10 in odds)."""
+    value = min(max(value, -0.9999), 0.9999)
+    return int(400 * math.log10((1 + value) / (1 - value)))
+
+
+class MCTSEngine(BaseEngine):
+    """
+    Monte Carlo tree search with batched network evaluation.
+
+    Attributes:
+        network: The PolicyValueNetwork guiding the search.
+        batch_size: Leaves collected per forward pass.
+        c_puct: Exploration constant of the PUCT formula.
+        virtual_loss: Losses counted per pending playout through a node.
+        stop_event: Optional threading or multiprocessing Event; the search
+                    stops when it is set, checked once per batch.
+    """
+
+    def __init__(self, network=None, batch_size=DEFAULT_BATCH_SIZE, c_puct=C_PUCT,
+                 virtual_loss=VIRTUAL_LOSS, stop_event=None):
+        """
+        Initialize the engine.
+
+        Args:
+            network: PolicyValueNetwork. Defaults to one with random weights.
+            batch_size: Leaves collected per forward pass.
+            c_puct: Exploration constant of the PUCT formula.
+            virtual_loss: Losses counted per pending playout through a node.
+            stop_event: See ``stop_event``.
+        """
+        self.network = network or PolicyValueNetwork.random()
+        self.batch_size = batch_size
+        self.c_puct = c_puct
+        self.virtual_loss = virtual_loss
+        self.stop_event = stop_event
+        self._stopped = False
+
+    def search(self, board, depth=None, time_limit=None, info_callback=None, playouts=None):
+        """
+        Search a position for the best move.
+
+        Args:
+            board: A BaseBoard instance. It is restored to its original position.
+            depth: Ignored; tree search grows the tree where it is promising
+                   instead of to a fixed depth.
+            time_limit: Maximum search time in seconds, or None for no limit.
+            info_callback: Optional function called with an info dictionary
+                           every INFO_INTERVAL seconds.
+            playouts: Maximum number of playouts. Defaults to DEFAULT_PLAYOUTS
+                      when neither a time limit nor a stop event can end the search.
+
+        Returns:
+            The info dictionary of the final result; 'nodes' counts playouts.
+        """
+        start = time.perf_counter()
+        self._stopped = False
+        if playouts is None and not time_limit and self.stop_event is None:
+            playouts = DEFAULT_PLAYOUTS
+        deadline = start + time_limit if time_limit else None
+
+        if not board.generate_moves():
+            score = -MATE_SCORE if board.is_check(board.get_current_player()) else 0
+            return self._build_info(board, [], score, 0, 0, time.perf_counter() - start)
+
+        tree = _Tree()
+        last_info = start
+        while True:
+            leaves = self._collect_leaves(board, tree)
+            if leaves:
+                self._evaluate_leaves(tree, leaves)
+
+            now = time.perf_counter()
+            if self.stop_event is not None and self.stop_event.is_set():
+                self._stopped = True
+            if (self._stopped or (playouts and tree.visits[0] >= playouts) or
+                    (deadline is not None and now >= deadline)):
+                break
+            if info_callback and now - last_info >= INFO_INTERVAL:
+                info_callback(self._tree_info(board, tree, now - start))
+                last_info = now
+
+        info = self._tree_info(board, tree, time.perf_counter() - start)
+        if info_callback:
+            info_callback(info)
+        return info
+
+    def stop(self):
+        """Ask a running search to return as soon as possible."""
+        self._stopped = True
+
+    def new_game(self):
+        """Nothing to forget: every search builds a new tree."""
+        pass
+
+    def _collect_leaves(self, board, tree):
+        """
+        Descend the tree up to batch_size times and collect the leaves to evaluate.
+
+        Each descent adds virtual loss along its path so that the next one
+        tends to pick a different leaf. Terminal leaves are backed up right
+        away. Running into a leaf already in the batch ends the collection.
+
+        Returns:
+            List of (leaf node, path array, FEN) tuples.
+        """
+        leaves = []
+        for _ in range(self.batch_size):
+            node = 0
+            path = [0]
+            while tree.state[node] == _EXPANDED:
+                node = tree.select_child(node, self.c_puct)
+                board.make_move(int(tree.move[node]))
+                path.append(node)
+
+            state = tree.state[node]
+            if state == _UNEXPANDED and node and (board.halfmove_clock >= 100 or board.is_repetition()):
+                tree.state[node] = state = _TERMINAL
+                tree.outcome[node] = 0.0
+            path = np.array(path)
+            if state == _TERMINAL:
+                tree.backup(path, tree.outcome[node], 0)
+            elif state == _UNEXPANDED:
+                tree.state[node] = _PENDING
+                tree.add_virtual_loss(path, self.virtual_loss)
+                leaves.append((node, path, board.get_fen()))
+            for _ in range(len(path) - 1):
+                board.unmake_move()
+            if state == _PENDING:
+                break  # Collision: virtual loss no longer spreads the descents
+        return leaves
+
+    def _evaluate_leaves(self, tree, leaves):
+        """Evaluate collected leaves in one forward pass, expand them and back the values up."""
+        batch = PositionBatch.from_fens(fen for _, _, fen in leaves)
+        policy, values = self.network(encode_planes(batch))
+        moves, counts = batch.legal_moves()
+
+        # Priors: softmax of the policy logits over each position's legal moves
+        logits = np.take_along_axis(policy, policy_indices(moves, batch.side), axis=1)
+        legal = np.arange(moves.shape[1])[None, :] < counts[:, None]
+        logits = np.where(legal, logits, -np.inf)
+        priors = np.exp(logits - logits.max(axis=1, keepdims=True, initial=-1e30))
+        priors /= np.maximum(priors.sum(axis=1, keepdims=True), 1e-12)
+
+        # Positions without legal moves are mate or stalemate
+        kings = batch.bitboards[np.arange(len(batch)), batch.side.astype(np.int64) * 6 + KING]
+        attacked = batch.attack_sets()[np.arange(len(batch)), batch.side.astype(np.int64) ^ 1]
+        in_check = (kings & attacked) != 0
+
+        for index, (node, path, _) in enumerate(leaves):
+            count = counts[index]
+            if count:
+                tree.add_children(node, moves[index, :count], priors[index, :count])
+                value = float(values[index])
+            else:
+                tree.state[node] = _TERMINAL
+                tree.outcome[node] = value = -1.0 if in_check[index] else 0.0
+            tree.backup(path, value, self.virtual_loss)
+
+    def _tree_info(self, board, tree, seconds):
+        """Build an info dictionary from the tree's most visited line."""
+        line = tree.principal_variation()
+        if line and tree.state[line[0]] == _TERMINAL and tree.outcome[line[0]] < 0:
+            score = MATE_SCORE - 1  # The best move mates
+        elif line:
+            score = _value_to_score(tree.value_sum[line[0]] / tree.visits[line[0]])
+        else:
+            score = 0
+        playouts = int(tree.visits[0])
+        info = self._build_info(board, [int(tree.move[node]) for node in line], score, len(line),
+                                playouts, seconds)
+        info['tree_nodes'] = tree.size
+        return info
@@ -0,0 +1,296 @@
+"""
+Background engine runner for the user interface.
+
+A search run from the pygame loop would freeze the window until it returns,
+and a thread would not help much because the search holds the GIL. The
+runner therefore searches in a separate process, on a snapshot of the board
+taken when the search is started, and sends the engine's info dictionary
+after every completed iteration back through a queue. The UI polls the
+queue once per frame, which never blocks, so it keeps drawing at its full
+frame rate while the engine uses the remaining CPU.
+
+While the opponent thinks, the runner can ponder: search the position after
+the reply the engine expects. If the opponent plays it, ponderhit() turns
+that search into the real one; otherwise the next start() aborts it. The
+engine lives on in the worker between searches, so either way its
+transposition table stays warm.
+
+Usage::
+
+    runner = EngineRunner()
+    runner.start(board, time_limit=5.0)
+    ...
+    info = runner.poll()  # once per frame; latest info dictionary or None
+    ...
+    runner.close()
+"""
+import multiprocessing
+import os
+import queue
+
+from src.engine.alpha_beta import AlphaBetaEngine
+
+# Seconds to wait for the worker process to exit on close
+_CLOSE_TIMEOUT = 2.0
+
+# Niceness increment of the worker, so the UI process wins any contention
+_WORKER_NICENESS = 5
+
+
+class _SearchControl:
+    """
+    Stop signal of one search, in the interface of threading.Event.is_set.
+
+    The UI process publishes the id of the search it wants running in a
+    shared value; a search is stopped as soon as that id changes. Unlike a
+    shared Event this cannot be cleared by the next search before the
+    previous one has noticed it. The engine polls the signal regularly, so
+    it also delivers a ponder hit, published the same way, to a pondering
+    engine.
+    """
+
+    def __init__(self, shared, search_id, engine=None):
+        """
+        Args:
+            shared: The runner's _SharedState.
+            search_id: Id of the search this signal belongs to.
+            engine: The engine, if the search is a ponder search.
+        """
+        self.shared = shared
+        self.search_id = search_id
+        self.engine = engine
+
+    def is_set(self):
+        """Whether the search should stop."""
+        shared = self.shared
+        if self.engine is not None and shared.ponderhit.value == self.search_id:
+            self.engine.ponderhit(shared.ponder_time.value or None)
+            self.engine = None
+        return shared.active.value != self.search_id
+
+
+class _SharedState:
+    """Values the UI process writes and the worker reads during a search."""
+
+    def __init__(self):
+        self.active = multiprocessing.Value('q', 0, lock=False)  # Id of the search allowed to run
+        self.ponderhit = multiprocessing.Value('q', 0, lock=False)  # Id of the ponder search that hit
+        self.ponder_time = multiprocessing.Value('d', 0.0, lock=False)  # Time limit after the hit
+
+
+def _worker_main(engine_class, engine_kwargs, tasks, results, shared):
+    """
+    Run the worker process: search the positions received on the task queue.
+
+    Args:
+        engine_class: BaseEngine subclass whose searches poll a ``stop_event``
+                      attribute; ponder searches also need its ``ponder``
+                      argument and ponderhit method, like AlphaBetaEngine.
+        engine_kwargs: Keyword arguments for engine_class.
+        tasks: Queue of (search id, board class, FEN, move, depth, time limit)
+               tuples, or None to exit. If move is not None, the search is a
+               ponder search of the position after it.
+        results: Queue receiving (search id, final, info) tuples, where final
+                 is False for per-iteration updates and True for the result.
+        shared: The runner's _SharedState.
+    """
+    if hasattr(os, 'nice'):
+        try:
+            os.nice(_WORKER_NICENESS)
+        except OSError:
+            pass
+    engine = engine_class(**engine_kwargs)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        search_id, board_class, fen, move, depth, time_limit = task
+        if shared.active.value != search_id:
+            continue  # Stopped before it started
+        board = board_class(fen)
+        if move is None:
+            engine.stop_event = _SearchControl(shared, search_id)
+            options = {}
+        else:
+            board.make_move(move)
+            engine.stop_event = _SearchControl(shared, search_id, engine)
+            options = {'ponder': True}
+        side = board.get_current_player()
+
+        def report(info):
+            results.put((search_id, False, _picklable(info, side)))
+
+        info = engine.search(board, depth, time_limit, report, **options)
+        results.put((search_id, True, _picklable(info, side)))
+
+
+def _picklable(info, side):
+    """Copy the fields of an info dictionary the UI needs, tagged with the side to move."""
+    return {
+        'score': info['score'],
+        'depth': info['depth'],
+        'best_line': info['best_line'],
+        'best_move': info['best_move'],
+        'lines': info.get('lines', []),
+        'nodes': info['nodes'],
+        'nps': info['nps'],
+        'time': info['time'],
+        'side': side
+    }
+
+
+class EngineRunner:
+    """
+    Runs searches in a background process and collects their progress.
+
+    Only one search runs at a time; starting a new one aborts the previous
+    search, whose remaining updates are then ignored. Like LazySMPEngine,
+    the worker sets positions up from their FEN, so repetitions before the
+    snapshot are not known to it.
+
+    Attributes:
+        info: Latest info dictionary of the current search, or None. Besides
+              the engine's fields it has 'side', the side to move ('w' or 'b')
+              in the searched position, as scores are relative to it.
+        searching: Whether a search is running.
+        pondering: The packed move the last ponder search expects, until
+                   ponderhit is called or another search starts; None
+                   otherwise. While it is set, ``info`` describes the
+                   position after that move.
+    """
+
+    def __init__(self, engine_class=AlphaBetaEngine, **engine_kwargs):
+        """
+        Initialize the runner. The worker process starts with the first search.
+
+        Args:
+            engine_class: Picklable BaseEngine subclass whose searches stop
+                          when their ``stop_event`` attribute is set, like
+                          AlphaBetaEngine.
+            **engine_kwargs: Keyword arguments for engine_class.
+        """
+        self.engine_class = engine_class
+        self.engine_kwargs = engine_kwargs
+        self.info = None
+        self.searching = False
+        self.pondering = None
+        self._worker = None
+        self._tasks = None
+        self._results = None
+        self._shared = None
+        self._search_id = 0
+
+    def start(self, board, depth=None, time_limit=None):
+        """
+        Start searching a snapshot of the board, aborting any running search.
+
+        Args:
+            board: A BaseBoard instance; later changes to it do not affect the search.
+            depth: Maximum depth in plies, or None for the engine's default.
+            time_limit: Time budget in seconds, or None to search until
+                        stopped or the maximum depth is reached.
+        """
+        self._submit(board, None, depth, time_limit)
+
+    def ponder(self, board, move, depth=None, time_limit=None):
+        """
+        Start searching the position after an expected opponent move, aborting any running search.
+
+        Until ponderhit is called the search runs without a time budget, and
+        its updates describe the position after the move.
+
+        Args:
+            board: A BaseBoard instance, before the move.
+            move: The expected move, packed or as a Move object.
+            depth: Maximum depth in plies, or None for the engine's default.
+            time_limit: Time budget in seconds counted from the ponder hit,
+                        or None for no limit.
+        """
+        if not isinstance(move, int):
+            move = move.to_int()
+        self._submit(board, move, depth, time_limit)
+        self.pondering = move
+
+    def ponderhit(self, time_limit=None):
+        """
+        Tell a ponder search that the expected move was played.
+
+        The search goes on as a normal one and starts counting its time
+        budget. If it already finished, its result simply stands.
+
+        Args:
+            time_limit: Time budget in seconds from now. Defaults to the one
+                        given to ponder.
+        """
+        if self.pondering is None:
+            return
+        self._shared.ponder_time.value = time_limit or 0.0
+        self._shared.ponderhit.value = self._search_id
+        self.pondering = None
+
+    def stop(self):
+        """Stop the current search; its best result so far still arrives through poll."""
+        if self._shared is not None:
+            self._shared.active.value = 0
+
+    def abort(self):
+        """Stop the current search and discard everything it still reports."""
+        self.stop()
+        self._search_id += 1  # Updates of the old search no longer match
+        self.searching = False
+        self.pondering = None
+
+    def poll(self):
+        """
+        Collect the updates that arrived since the last call, without blocking.
+
+        Returns:
+            The latest info dictionary of the current search (see ``info``),
+            or None if nothing has arrived yet.
+        """
+        while self._results is not None:
+            try:
+                search_id, final, info = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if search_id != self._search_id:
+                continue
+            self.info = info
+            if final:
+                self.searching = False
+        return self.info
+
+    def close(self):
+        """Abort any search and shut the worker process down."""
+        if self._worker is None:
+            return
+        self.abort()
+        self._tasks.put(None)
+        self._worker.join(timeout=_CLOSE_TIMEOUT)
+        if self._worker.is_alive():
+            self._worker.terminate()
+        self._worker = None
+        self._tasks = self._results = self._shared = None
+
+    def _submit(self, board, move, depth, time_limit):
+        """Send a search task to the worker, superseding the current search."""
+        self._start_worker()
+        self._search_id += 1
+        self._shared.active.value = self._search_id
+        self.info = None
+        self.searching = True
+        self.pondering = None
+        self._tasks.put((self._search_id, type(board), board.get_fen(), move, depth, time_limit))
+
+    def _start_worker(self):
+        """Start the worker process, once."""
+        if self._worker is not None:
+            return
+        self._tasks = multiprocessing.Queue()
+        self._results = multiprocessing.Queue()
+        self._shared = _SharedState()
+        self._worker = multiprocessing.Process(
+            target=_worker_main, daemon=True,
+            args=(self.engine_class, self.engine_kwargs, self._tasks, self._results, self._shared))
+        self._worker.start()
@@ -0,0 +1,442 @@
+"""
+Client for external UCI engines such as Stockfish.
+
+Starting an engine binary and going through the UCI handshake costs far
+more than a short analysis, so StockfishEngine keeps a pool of long-lived
+engine processes and hands each query to an idle one. The processes are
+driven with asyncio pipes from an event loop in a background thread. A
+single thread can then run as many analyses at once as the pool has
+processes, e.g. when annotating a batch of positions with search_many.
+
+The engine's ``info`` lines are parsed as they arrive into the info
+dictionaries described in base_engine.py. The info callback therefore sees
+every completed depth, just as with AlphaBetaEngine.
+
+Usage::
+
+    engine = StockfishEngine('/usr/local/bin/stockfish', pool_size=4)
+    info = engine.search(board, depth=18)
+    infos = engine.search_many(boards, time_limit=0.5)
+    engine.close()
+
+Any program that speaks UCI works, so the tests point ``path`` at a small
+fake engine script, ``[sys.executable, 'tests/fake_uci.py']``.
+"""
+import asyncio
+import threading
+import time
+
+from src.board.move import move_to_uci
+from src.engine.base_engine import BaseEngine, MATE_SCORE
+
+# Engine binary started when no path is given, looked up on PATH
+DEFAULT_PATH = 'stockfish'
+
+# Seconds to wait for 'uciok' and 'readyok'
+_HANDSHAKE_TIMEOUT = 10.0
+
+# Seconds between checks of the stop event while waiting for engine output
+_POLL_INTERVAL = 0.05
+
+# Seconds to wait for a process to exit after 'quit'
+_QUIT_TIMEOUT = 2.0
+
+# Info fields followed by a single integer
+_INTEGER_FIELDS = ('depth', 'seldepth', 'multipv', 'nodes', 'nps', 'time', 'hashfull', 'tbhits',
+                   'currmovenumber')
+
+
+def parse_info(line):
+    """
+    Parse a UCI ``info`` line.
+
+    Args:
+        line: A line sent by the engine, e.g.
+              'info depth 12 multipv 1 score cp 31 nodes 81920 pv e2e4 e7e5'.
+
+    Returns:
+        Dictionary of the fields present: the integer fields by name, 'score'
+        in centipawns from the side to move's point of view (mates converted
+        to MATE_SCORE minus the distance in plies), 'bound' ('lower' or
+        'upper') if the score is only a bound, and 'pv' as a list of UCI move
+        strings. Empty for lines that are not info lines.
+    """
+    tokens = line.split()
+    fields = {}
+    if not tokens or tokens[0] != 'info':
+        return fields
+    index = 1
+    while index < len(tokens):
+        token = tokens[index]
+        if token in _INTEGER_FIELDS and index + 1 < len(tokens):
+            try:
+                fields[token] = int(tokens[index + 1])
+            except ValueError:
+                pass
+            index += 2
+        elif token == 'score':
+            index += 1
+            if index < len(tokens) and tokens[index] in ('lowerbound', 'upperbound'):
+                fields['bound'] = tokens[index][:5]  # Some engines put the bound first
+                index += 1
+            if index + 1 < len(tokens) and tokens[index] in ('cp', 'mate'):
+                try:
+                    value = int(tokens[index + 1])
+                    if tokens[index] == 'mate':
+                        # Mate in n moves is 2n - 1 plies away; mated in n is 2n plies away
+                        value = MATE_SCORE - (2 * value - 1) if value > 0 else -MATE_SCORE - 2 * value
+                    fields['score'] = value
+                except ValueError:
+                    pass  # Malformed score: skip it, keep the other fields
+                index += 2
+        elif token in ('lowerbound', 'upperbound'):
+            fields['bound'] = token[:5]
+            index += 1
+        elif token == 'pv':
+            fields['pv'] = tokens[index + 1:]
+            break
+        elif token == 'string':
+            break  # Free text up to the end of the line
+        else:
+            index += 1
+    return fields
+
+
+def _parse_line(board, uci_moves):
+    """
+    Convert UCI move strings to packed moves, up to the first one that is not legal.
+
+    Args:
+        board: The board in the position the moves start from; it is restored.
+        uci_moves: List of UCI move strings.
+
+    Returns:
+        List of packed moves.
+    """
+    line = []
+    for text in uci_moves:
+        move = next((move for move in board.generate_moves() if move_to_uci(move) == text), None)
+        if move is None:
+            break
+        line.append(move)
+        board.make_move(move)
+    for _ in line:
+        board.unmake_move()
+    return line
+
+
+class _UciProcess:
+    """One engine process of the pool, started on first use and restarted after a failure."""
+
+    def __init__(self, command, options):
+        """
+        Args:
+            command: Program and arguments to run.
+            options: UCI options to set after the handshake.
+        """
+        self.command = command
+        self.options = options
+        self.process = None
+        self.stopping = False  # Whether 'stop' was sent for the current search
+
+    @property
+    def alive(self):
+        """Whether the process is running."""
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        """Start the process if it is not running and complete the UCI handshake."""
+        if self.alive:
+            return
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL)
+        self.send('uci')
+        await asyncio.wait_for(self.read_until('uciok'), _HANDSHAKE_TIMEOUT)
+        for name, value in self.options.items():
+            self.send(f'setoption name {name} value {value}')
+        await self.ready()
+
+    async def ready(self):
+        """Wait until the engine has processed everything sent so far."""
+        self.send('isready')
+        await asyncio.wait_for(self.read_until('readyok'), _HANDSHAKE_TIMEOUT)
+
+    def send(self, command):
+        """Send one command line."""
+        self.process.stdin.write(command.encode() + b'\n')
+
+    async def read_line(self):
+        """
+        Read one line of output.
+
+        Raises:
+            RuntimeError: If the process exited.
+        """
+        line = await self.process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"UCI engine {self.command[0]!r} exited")
+        return line.decode().strip()
+
+    async def read_until(self, keyword):
+        """Read and discard lines up to one that starts with keyword."""
+        while True:
+            line = await self.read_line()
+            if line.split()[:1] == [keyword]:
+                return line
+
+    async def quit(self):
+        """Ask the process to exit, and kill it if it does not."""
+        if not self.alive:
+            return
+        try:
+            self.send('quit')
+            await asyncio.wait_for(self.process.wait(), _QUIT_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError):
+            self.kill()
+
+    def kill(self):
+        """Kill the process, e.g. after it misbehaved; the next start() replaces it."""
+        if self.alive:
+            self.process.kill()
+        self.process = None
+
+
+class StockfishEngine(BaseEngine):
+    """
+    Engine backed by a pool of external UCI engine processes.
+
+    Searches block the calling thread, but they run in an event loop thread
+    shared by all searches of the engine. Several threads, or search_many,
+    can therefore use the whole pool at once. Like LazySMPEngine, the
+    engine is given positions by FEN, so repetitions before the searched
+    position are not known to it.
+
+    Attributes:
+        stop_event: Optional threading or multiprocessing Event; running
+                    searches stop when it is set, like AlphaBetaEngine's.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, pool_size=1, options=None, multi_pv=1, stop_event=None):
+        """
+        Initialize the engine. Processes start when they are first needed.
+
+        Args:
+            path: Engine binary, or a list of the program and its arguments.
+            pool_size: Number of engine processes, i.e. of searches that can
+                       run at the same time.
+            options: Dictionary of UCI options to set, e.g. {'Hash': 64}.
+            multi_pv: Number of best lines to report in 'lines'.
+            stop_event: See ``stop_event``.
+        """
+        self.command = [path] if isinstance(path, str) else list(path)
+        self.multi_pv = multi_pv
+        self.stop_event = stop_event
+        options = dict(options or {})
+        if multi_pv > 1:
+            options['MultiPV'] = multi_pv
+        self._pool = [_UciProcess(self.command, options) for _ in range(pool_size)]
+        self._loop = None
+        self._thread = None
+        self._idle = None  # asyncio.Queue of idle processes, created in the loop
+        self._busy = set()
+
+    def search(self, board, depth=None, time_limit=None, info_callback=None):
+        """
+        Search a position for the best move.
+
+        Args:
+            board: A BaseBoard instance. It is restored to its original position.
+            depth: Maximum depth in plies, or None for no limit.
+            time_limit: Maximum search time in seconds, or None for no limit.
+                        Without depth and time limit the search runs until
+                        stopped.
+            info_callback: Optional function called with an info dictionary
+                           for every completed depth, from the event loop thread.
+
+        Returns:
+            The info dictionary of the final result.
+        """
+        return self._run(self._search(board, depth, time_limit, info_callback))
+
+    async def analyse(self, board, depth=None, time_limit=None, info_callback=None):
+        """
+        Search a position from a coroutine, without blocking its event loop.
+
+        Arguments and result are those of search. The board must not be
+        changed until the result is available.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._search(board, depth, time_limit, info_callback),
+                                                  self._event_loop())
+        return await asyncio.wrap_future(future)
+
+    def search_many(self, boards, depth=None, time_limit=None):
+        """
+        Search several positions concurrently, as many at a time as the pool has processes.
+
+        Args:
+            boards: BaseBoard instances; each must be a separate object.
+            depth: Maximum depth in plies of each search.
+            time_limit: Maximum search time in seconds of each search.
+
+        Returns:
+            List of the final info dictionaries, in the order of boards.
+        """
+        async def search_all():
+            return await asyncio.gather(*(self._search(board, depth, time_limit, None)
+                                          for board in boards))
+
+        return self._run(search_all())
+
+    def stop(self):
+        """Ask all running searches to return as soon as possible."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop_all)
+
+    def new_game(self):
+        """Tell the idle engine processes that the next positions are from a new game."""
+        if self._loop is not None:
+            self._run(self._new_game())
+
+    def close(self):
+        """Quit the engine processes and the event loop thread."""
+        if self._loop is None:
+            return
+        self._run(self._quit())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = self._idle = None
+
+    def _event_loop(self):
+        """The event loop the processes belong to, started on first use."""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._thread.start()
+        return self._loop
+
+    def _run(self, coroutine):
+        """Run a coroutine in the event loop thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._event_loop()).result()
+
+    async def _acquire(self):
+        """Take an idle process from the pool, waiting for one if all are busy."""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for process in self._pool:
+                self._idle.put_nowait(process)
+        process = await self._idle.get()
+        try:
+            await process.start()
+        except BaseException:
+            process.kill()
+            self._idle.put_nowait(process)
+            raise
+        self._busy.add(process)
+        return process
+
+    def _release(self, process):
+        """Return a process to the pool."""
+        self._busy.discard(process)
+        self._idle.put_nowait(process)
+
+    def _stop_all(self):
+        """Send 'stop' to every process that is searching."""
+        for process in self._busy:
+            if not process.stopping:
+                process.stopping = True
+                process.send('stop')
+
+    async def _new_game(self):
+        """Send 'ucinewgame' to the started processes that are idle."""
+        for process in self._pool:
+            if process.alive and process not in self._busy:
+                process.send('ucinewgame')
+                await process.ready()
+
+    async def _quit(self):
+        """Quit all processes."""
+        await asyncio.gather(*(process.quit() for process in self._pool))
+
+    async def _search(self, board, depth, time_limit, info_callback):
+        """
+        Run one search on a pooled process, parsing its output as it arrives.
+
+        Lines of a MultiPV search are collected per depth, and an info
+        dictionary is built once the last of them has arrived.
+        """
+        start = time.perf_counter()
+        count = max(1, min(self.multi_pv, len(board.generate_moves())))
+        process = await self._acquire()
+        try:
+            process.stopping = False
+            process.send(f'position fen {board.get_fen()}')
+            limits = []
+            if depth:
+                limits.append(f'depth {depth}')
+            if time_limit:
+                limits.append(f'movetime {max(int(time_limit * 1000), 1)}')
+            process.send('go ' + (' '.join(limits) or 'infinite'))
+
+            info = None
+            score = 0
+            lines = {}  # Lines of the current depth by MultiPV index
+            while True:
+                if (not process.stopping and self.stop_event is not None and
+                        self.stop_event.is_set()):
+                    process.stopping = True
+                    process.send('stop')
+                try:
+                    text = await asyncio.wait_for(process.read_line(), _POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    continue
+                if text.startswith('bestmove'):
+                    break
+                fields = parse_info(text)
+                if 'score' in fields and 'bound' not in fields:
+                    score = fields['score']
+                if 'pv' not in fields or 'score' not in fields or 'bound' in fields:
+                    continue
+                index = fields.get('multipv', 1)
+                lines[index] = (fields['score'], fields.get('depth', 0), _parse_line(board, fields['pv']))
+                if index < count:
+                    continue
+                info = self._make_info(board, [lines[key] for key in sorted(lines)], fields, start)
+                lines = {}
+                if info_callback:
+                    info_callback(info)
+        except BaseException:
+            process.kill()  # Its output is out of step with the protocol now
+            raise
+        finally:
+            self._release(process)
+
+        if info is None:
+            # Stopped before the first depth completed, or no legal moves
+            best = _parse_line(board, text.split()[1:2])
+            info = self._make_info(board, [(score, 0, best)], {}, start)
+        return info
+
+    def _make_info(self, board, lines, fields, start):
+        """
+        Build an info dictionary from parsed lines.
+
+        Args:
+            board: The board in the searched position.
+            lines: (score, depth, packed line) tuples, best first.
+            fields: Parsed fields of the info line that completed them.
+            start: perf_counter value at the start of the search.
+
+        Returns:
+            The info dictionary.
+        """
+        seconds = fields['time'] / 1000 if 'time' in fields else time.perf_counter() - start
+        score, depth, line = lines[0]
+        info = self._build_info(board, line, score, depth, fields.get('nodes', 0), seconds)
+        if 'nps' in fields:
+            info['nps'] = fields['nps']
+        info['lines'] = [{'score': line_score, 'depth': line_depth,
+                          'pv': self._line_moves(board, line_moves)}
+                         for line_score, line_depth, line_moves in lines]
+        return info
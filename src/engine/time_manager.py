@@ -0,0 +1,196 @@
+"""
+Time management for searches under a chess clock.
+
+The clock gives the engine its remaining time, an increment per move and
+optionally the number of moves until the next time control. From these the
+TimeManager derives two budgets for the current move:
+
+    soft    the time the search should aim to use; it is scaled up when the
+            best move keeps changing or the score drops, and down when the
+            best move has been stable for several iterations
+    hard    the time the search must never exceed; the engine stops in the
+            middle of an iteration when it runs out
+
+An iteration that is stopped halfway is wasted, so after each completed
+iteration the manager predicts how long the next one would take, from the
+node count of the last iteration, the effective branching factor and the
+measured nodes per second, and only lets it start if it is expected to
+finish within the soft budget.
+
+The clock itself is read by the engine once every TIME_CHECK_INTERVAL
+nodes (see alpha_beta.py), not at every node.
+"""
+import time
+
+# Moves assumed to remain in the game when the clock does not say
+DEFAULT_MOVES_TO_GO = 30
+
+# Fraction of the increment added to the soft budget
+INCREMENT_SHARE = 0.75
+
+# The hard budget is at most this multiple of the soft one ...
+HARD_RATIO = 4.0
+
+# ... and at most this fraction of the remaining time
+MAX_TIME_FRACTION = 0.75
+
+# Budget scale after the best move stayed the same for STABLE_ITERATIONS
+# iterations, and after it changed in the last iteration
+STABLE_ITERATIONS = 3
+STABLE_SCALE = 0.7
+UNSTABLE_SCALE = 1.4
+
+# A score drop of this many centipawns from the previous iteration doubles
+# the budget; smaller drops extend it proportionally
+SCORE_DROP_LIMIT = 100
+
+# Bounds of the effective branching factor used for predictions
+MIN_BRANCHING = 1.5
+MAX_BRANCHING = 8.0
+
+
+class TimeManager:
+    """
+    Per-move time budgets and the decision whether to start another iteration.
+
+    Call allocate when the engine starts thinking about a move and pass the
+    manager to the engine's search, which reads ``hard_deadline`` and calls
+    next_iteration after every completed iteration.
+
+    Attributes:
+        soft: Target thinking time of the current move in seconds.
+        hard: Maximum thinking time of the current move in seconds.
+        hard_deadline: time.perf_counter() value at which the search must stop.
+        predicted: Predicted duration of the next iteration in seconds, as
+                   computed by the last next_iteration call (None before).
+        start_nodes: Node count of the search when the clock started;
+                     next_iteration counts nodes from it, so the nodes of a
+                     ponder search do not enter the predictions.
+    """
+
+    def __init__(self, move_overhead=0.05, default_moves_to_go=DEFAULT_MOVES_TO_GO):
+        """
+        Initialize the manager.
+
+        Args:
+            move_overhead: Seconds reserved per move for communication and lag.
+            default_moves_to_go: Moves assumed to remain when allocate is not told.
+        """
+        self.move_overhead = move_overhead
+        self.default_moves_to_go = default_moves_to_go
+        self.soft = self.hard = 0.0
+        self.hard_deadline = None
+        self.predicted = None
+        self.start_nodes = 0
+        self._start = None
+        self._clock = None  # Arguments of the last allocate call
+        self._iterations = []  # (elapsed seconds, cumulative nodes) per completed iteration
+        self._best_move = None
+        self._stable = 0
+        self._score = None
+
+    def allocate(self, remaining, increment=0.0, moves_to_go=None, nodes=0):
+        """
+        Compute the budgets for a move and start its clock.
+
+        Args:
+            remaining: Time left on the engine's clock in seconds.
+            increment: Time added to the clock after each move in seconds.
+            moves_to_go: Moves until the next time control, or None if the
+                         rest of the game must be played in the remaining time.
+            nodes: Nodes the search has already counted, e.g. while pondering.
+
+        Returns:
+            The (soft, hard) budgets in seconds.
+        """
+        self._start = time.perf_counter()
+        self._clock = (remaining, increment, moves_to_go)
+        available = max(remaining - self.move_overhead, 0.01)
+        moves = max(moves_to_go or self.default_moves_to_go, 1)
+
+        self.hard = min(available * MAX_TIME_FRACTION if moves > 1 else available,
+                        (available / moves + increment * INCREMENT_SHARE) * HARD_RATIO)
+        self.soft = min(available / moves + increment * INCREMENT_SHARE, self.hard)
+        self.hard_deadline = self._start + self.hard
+
+        self.predicted = None
+        self.start_nodes = nodes
+        self._iterations = []
+        self._best_move = None
+        self._stable = 0
+        self._score = None
+        return self.soft, self.hard
+
+    def reallocate(self, nodes=0):
+        """
+        Start the clock again with the clock state of the last allocate call.
+
+        Meant for a ponder hit: the engine's own clock did not run while it
+        pondered, so the move gets the same budgets, counted from now.
+
+        Args:
+            nodes: Nodes the search has counted so far, all spent pondering.
+
+        Returns:
+            The (soft, hard) budgets in seconds.
+
+        Raises:
+            RuntimeError: If allocate was never called.
+        """
+        if self._clock is None:
+            raise RuntimeError("reallocate called before allocate")
+        return self.allocate(*self._clock, nodes=nodes)
+
+    def elapsed(self):
+        """Seconds since allocate was called."""
+        return time.perf_counter() - self._start
+
+    def next_iteration(self, best_move, score, nodes):
+        """
+        Record a completed iteration and decide whether to start the next one.
+
+        Args:
+            best_move: Best move (packed) of the completed iteration.
+            score: Its score in centipawns.
+            nodes: Nodes searched since the start of the search.
+
+        Returns:
+            True if the next iteration is expected to finish within the
+            (scaled) soft budget.
+        """
+        elapsed = self.elapsed()
+        self._iterations.append((elapsed, nodes - self.start_nodes))
+
+        scale = 1.0
+        if best_move == self._best_move:
+            self._stable += 1
+            if self._stable >= STABLE_ITERATIONS:
+                scale *= STABLE_SCALE
+        else:
+            if self._best_move is not None:
+                scale *= UNSTABLE_SCALE
+            self._stable = 0
+        if self._score is not None and score < self._score:
+            scale *= 1 + min(self._score - score, SCORE_DROP_LIMIT) / SCORE_DROP_LIMIT
+        self._best_move = best_move
+        self._score = score
+
+        budget = min(self.soft * scale, self.hard)
+        self.predicted = self._predict()
+        return elapsed + self.predicted <= budget
+
+    def _predict(self):
+        """Predict the duration of the next iteration from the ones completed so far."""
+        elapsed, nodes = self._iterations[-1]
+        if elapsed <= 0 or nodes <= 0:
+            return 0.0
+        cumulative = [iteration_nodes for _, iteration_nodes in self._iterations]
+        sizes = [after - before for before, after in zip([0] + cumulative, cumulative)]
+
+        # Effective branching factor: growth of the iteration size, averaged
+        # over the last two iterations to smooth out odd/even effects
+        ratios = [after / before for before, after in list(zip(sizes, sizes[1:]))[-2:] if before > 0]
+        branching = sum(ratios) / len(ratios) if ratios else MAX_BRANCHING
+        branching = min(max(branching, MIN_BRANCHING), MAX_BRANCHING)
+
+        return sizes[-1] * branching * elapsed / nodes
@@ -0,0 +1,194 @@
+"""
+Transposition table for the search engines.
+
+Entries are keyed by the board's 64-bit Zobrist key and hold the depth of
+the search that produced them, its score, the bound type of that score and
+the best move found, so a later visit of the same position (through a
+transposition or the next iteration of iterative deepening) can cut off
+immediately or at least try the best move first.
+
+The table is a fixed-size flat buffer of 64-bit words allocated once at
+construction, so its memory use is known up front and never grows. Every
+entry is two words:
+
+    word 0    key ^ data
+    word 1    data: bits 0-15 move, 16-31 score + 32768, 32-39 depth,
+              40-41 bound, 42-47 age
+
+Storing the key XORed with the data lets a probe verify the full key and
+the integrity of the entry with one comparison. Entries are grouped in
+buckets of four (64 bytes, one cache line); a position may live in any slot
+of its bucket, and a new position replaces the least valuable one, judged
+by depth and by how many searches ago it was written.
+"""
+from array import array
+
+from src.board.move import NULL_MOVE
+
+# Bound types
+EXACT = 0  # The score is exact (a PV node)
+LOWER_BOUND = 1  # The search failed high; the true score is at least this
+UPPER_BOUND = 2  # The search failed low; the true score is at most this
+
+BUCKET_SIZE = 4  # Entries per bucket
+ENTRY_WORDS = 2  # 64-bit words per entry
+ENTRY_BYTES = ENTRY_WORDS * 8
+
+_BUCKET_WORDS = BUCKET_SIZE * ENTRY_WORDS
+_SCORE_OFFSET = 32768  # Scores are stored as unsigned 16-bit values
+_AGE_MASK = 63
+
+# An entry of the current search survives a shallower one unless the new
+# result is exact or at most this many plies shallower
+_DEPTH_MARGIN = 3
+
+
+def table_bytes(size_mb):
+    """
+    Get the number of bytes a table uses for a memory budget.
+
+    Args:
+        size_mb: Memory budget in megabytes.
+
+    Returns:
+        Bytes of the largest power-of-two bucket count within the budget.
+    """
+    return _fit_bytes(size_mb * 1024 * 1024)
+
+
+def _fit_bytes(size_bytes):
+    """Bytes of the largest power-of-two number of buckets that fits in size_bytes."""
+    buckets = 1
+    while buckets * 2 * _BUCKET_WORDS * 8 <= size_bytes:
+        buckets *= 2
+    return buckets * _BUCKET_WORDS * 8
+
+
+class TranspositionTable:
+    """
+    Fixed-size, bucketed store of search results.
+
+    Attributes:
+        age: Search generation, advanced by new_search.
+        probes, hits: Number of lookups and of lookups that found the position.
+        stores, collisions: Number of writes and of writes that evicted a
+                            different position.
+    """
+
+    def __init__(self, size_mb=16, buffer=None):
+        """
+        Allocate the table.
+
+        Args:
+            size_mb: Memory budget in megabytes. The bucket count is rounded
+                     down to a power of two.
+            buffer: Optional writable buffer to use instead of allocating, e.g.
+                    the ``buf`` of a multiprocessing.shared_memory block of
+                    table_bytes(size_mb) bytes. Several processes can share one
+                    table this way without locks: a torn entry written by two
+                    processes at once fails the key check and reads as a miss.
+        """
+        size_bytes = table_bytes(size_mb) if buffer is None else _fit_bytes(len(buffer))
+        buckets = size_bytes // (_BUCKET_WORDS * 8)
+        self._mask = buckets - 1
+        if buffer is None:
+            self._table = array('Q', bytes(size_bytes))
+        else:
+            self._table = memoryview(buffer).cast('B')[:size_bytes].cast('Q')
+        self.age = 0
+        self.probes = self.hits = self.stores = self.collisions = 0
+
+    @property
+    def size_bytes(self):
+        """Memory used by the entries, in bytes."""
+        return len(self._table) * 8
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key: Zobrist key of the position.
+
+        Returns:
+            The (depth, score, bound, move) tuple, or None if the position is not stored.
+        """
+        self.probes += 1
+        table = self._table
+        index = (key & self._mask) * _BUCKET_WORDS
+        for slot in range(index, index + _BUCKET_WORDS, ENTRY_WORDS):
+            data = table[slot + 1]
+            if data and table[slot] ^ data == key:
+                self.hits += 1
+                return ((data >> 32) & 0xFF, ((data >> 16) & 0xFFFF) - _SCORE_OFFSET,
+                        (data >> 40) & 3, data & 0xFFFF)
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        """
+        Store a search result.
+
+        An existing entry for the position is overwritten unless it comes from
+        a clearly deeper search in the current generation. Otherwise the first
+        empty slot of the bucket is used, or the slot with the lowest value of
+        depth - 8 * generations old.
+
+        Args:
+            key: Zobrist key of the position.
+            depth: Remaining depth of the search in plies (0-255).
+            score: Score found, adjusted for storage (see the engines' mate handling).
+            bound: EXACT, LOWER_BOUND or UPPER_BOUND.
+            move: Best packed move found, or NULL_MOVE to keep the stored one.
+        """
+        table = self._table
+        age = self.age
+        index = (key & self._mask) * _BUCKET_WORDS
+        victim = index
+        victim_worth = 1 << 16
+        for slot in range(index, index + _BUCKET_WORDS, ENTRY_WORDS):
+            data = table[slot + 1]
+            if not data:
+                victim = slot
+                break
+            if table[slot] ^ data == key:
+                if (bound != EXACT and depth + _DEPTH_MARGIN < (data >> 32) & 0xFF and
+                        data >> 42 == age):
+                    return
+                if move == NULL_MOVE:
+                    move = data & 0xFFFF
+                victim = slot
+                break
+            worth = ((data >> 32) & 0xFF) - 8 * ((age - (data >> 42)) & _AGE_MASK)
+            if worth < victim_worth:
+                victim = slot
+                victim_worth = worth
+        else:
+            self.collisions += 1
+
+        data = move | ((score + _SCORE_OFFSET) << 16) | (depth << 32) | (bound << 40) | (age << 42)
+        table[victim] = key ^ data
+        table[victim + 1] = data
+        self.stores += 1
+
+    def new_search(self):
+        """Start a new generation; entries from older searches are replaced first."""
+        self.age = (self.age + 1) & _AGE_MASK
+
+    def hashfull(self):
+        """
+        Estimate how full the table is with entries of the current search.
+
+        Returns:
+            Permille of sampled entries written in the current generation.
+        """
+        table = self._table
+        sample = min(1000, len(table) // ENTRY_WORDS)
+        used = sum(1 for slot in range(0, sample * ENTRY_WORDS, ENTRY_WORDS)
+                   if table[slot + 1] and table[slot + 1] >> 42 == self.age)
+        return used * 1000 // sample
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        memoryview(self._table).cast('B')[:] = bytes(self.size_bytes)
+        self.age = 0
+        self.probes = self.hits = self.stores = self.collisions = 0
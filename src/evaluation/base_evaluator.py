@@ -0,0 +1,23 @@
+from abc import ABC, abstractmethod
+
+
+class BaseEvaluator(ABC):
+    """
+    Abstract base class for static position evaluators.
+
+    Scores are in centipawns from the point of view of the side to move, so a
+    negamax search can use them directly.
+    """
+
+    @abstractmethod
+    def evaluate(self, board):
+        """
+        Evaluate a position.
+
+        Args:
+            board: A BaseBoard instance.
+
+        Returns:
+            Score in centipawns, positive if the side to move is better.
+        """
+        pass
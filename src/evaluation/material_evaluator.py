@@ -0,0 +1,143 @@
+"""
+Material evaluation through a table of material signatures.
+
+The board backends keep a material key alongside the Zobrist key: the
+number of pieces of every kind except the kings, packed into one integer
+(see src.board.material), always up to date.
+
+Everything the evaluation knows about material depends on the counts only,
+so it is worked out once per signature and stored in MATERIAL_TABLE under
+the key:
+
+    score   material balance from White's point of view, with the bishop
+            pair bonus, scaled by the scale factor
+    scale   how much of a material advantage is likely to convert, from 0
+            (hopeless, e.g. a lone minor piece or two knights) to
+            SCALE_NORMAL; a single extra pawn in a pure rook ending is
+            worth much less than elsewhere
+    dead    neither side has enough material to ever checkmate
+    bishops the only pieces besides the kings are bishops; the position is
+            then also dead if they all stand on squares of one colour,
+            which the counts alone cannot tell
+
+Entries are computed on first use and then kept, so evaluating a position
+costs a single dictionary lookup. Enumerating all signatures up front would
+take seconds at import for entries that mostly never occur. The search uses
+is_dead_draw, a lookup in the same table, to score positions like KBvK as
+draws without searching them.
+"""
+from src.board.constants import WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN
+from src.board.material import material_counts
+from src.evaluation.base_evaluator import BaseEvaluator
+
+# Centipawn value per piece type (the king is never captured)
+PIECE_VALUES = (100, 320, 330, 500, 900, 0)
+
+# Bonus for a side with two or more bishops
+BISHOP_PAIR = 50
+
+# Scale factors are in 1/SCALE_NORMAL units
+SCALE_NORMAL = 64
+SCALE_DRAWISH = 14  # Pawnless, up at most a minor piece against real material
+SCALE_HOPELESS = 4  # Pawnless, up at most a minor piece against at most a minor piece
+SCALE_ROOK_PAWN = 40  # One rook each, one pawn up
+
+# Entries computed so far, keyed by material key; see the module docstring
+MATERIAL_TABLE = {}
+
+
+def material_entry(key):
+    """
+    Look up the table entry of a material signature, computing it on first use.
+
+    Args:
+        key: A material key.
+
+    Returns:
+        Tuple (score, scale, dead, bishops); see the module docstring.
+    """
+    entry = MATERIAL_TABLE.get(key)
+    if entry is None:
+        entry = MATERIAL_TABLE[key] = _compute_entry(material_counts(key))
+    return entry
+
+
+def is_dead_draw(board):
+    """
+    Check whether neither side has enough material to ever checkmate.
+
+    Args:
+        board: A BaseBoard instance.
+
+    Returns:
+        True for bare kings, a king with a single minor piece against a bare
+        king, and kings with bishops that all stand on squares of one colour.
+    """
+    entry = MATERIAL_TABLE.get(board.material_key)
+    if entry is None:
+        entry = material_entry(board.material_key)
+    if entry[3]:
+        colors = {((square >> 3) + square) & 1 for square in range(64) if board.piece_at(square) % 6 == BISHOP}
+        return len(colors) == 1
+    return entry[2]
+
+
+def _compute_entry(counts):
+    """Work out the table entry of a set of piece counts."""
+    pieces = (PAWN, KNIGHT, BISHOP, ROOK, QUEEN)
+    material = [sum(PIECE_VALUES[piece_type] * counts[color * 6 + piece_type] for piece_type in pieces)
+                for color in (WHITE, BLACK)]
+    non_pawn = [material[color] - PIECE_VALUES[PAWN] * counts[color * 6 + PAWN] for color in (WHITE, BLACK)]
+    minors = sum(counts[color * 6 + piece_type] for color in (WHITE, BLACK) for piece_type in (KNIGHT, BISHOP))
+    if minors <= 1 and non_pawn[WHITE] + non_pawn[BLACK] <= PIECE_VALUES[BISHOP] and \
+            not counts[WHITE * 6 + PAWN] and not counts[BLACK * 6 + PAWN]:
+        return 0, 0, True, False
+
+    score = material[WHITE] - material[BLACK]
+    for color, sign in ((WHITE, 1), (BLACK, -1)):
+        if counts[color * 6 + BISHOP] >= 2:
+            score += sign * BISHOP_PAIR
+
+    strong = WHITE if score >= 0 else BLACK
+    weak = strong ^ 1
+    scale = SCALE_NORMAL
+    if not counts[strong * 6 + PAWN] and non_pawn[strong] == 2 * PIECE_VALUES[KNIGHT] == \
+            PIECE_VALUES[KNIGHT] * counts[strong * 6 + KNIGHT] and not material[weak]:
+        scale = 0  # Two knights cannot force mate
+    elif not counts[strong * 6 + PAWN] and non_pawn[strong] - non_pawn[weak] <= PIECE_VALUES[BISHOP]:
+        # Without pawns, a minor piece more does not win
+        if non_pawn[strong] < PIECE_VALUES[ROOK]:
+            scale = 0
+        elif non_pawn[weak] <= PIECE_VALUES[BISHOP]:
+            scale = SCALE_HOPELESS
+        else:
+            scale = SCALE_DRAWISH
+    elif (non_pawn[WHITE] == non_pawn[BLACK] == PIECE_VALUES[ROOK] and
+          counts[WHITE * 6 + ROOK] == counts[BLACK * 6 + ROOK] == 1 and
+          counts[strong * 6 + PAWN] - counts[weak * 6 + PAWN] == 1):
+        scale = SCALE_ROOK_PAWN
+    bishops = non_pawn[WHITE] + non_pawn[BLACK] == PIECE_VALUES[BISHOP] * (
+        counts[WHITE * 6 + BISHOP] + counts[BLACK * 6 + BISHOP]) and \
+        not counts[WHITE * 6 + PAWN] and not counts[BLACK * 6 + PAWN]
+    return score * scale // SCALE_NORMAL, scale, False, bishops
+
+
+class MaterialEvaluator(BaseEvaluator):
+    """
+    Evaluates a position by material only, through the material signature table.
+    """
+
+    def evaluate(self, board):
+        """
+        Evaluate a position by material balance.
+
+        Args:
+            board: A BaseBoard instance.
+
+        Returns:
+            Score in centipawns, positive if the side to move is ahead.
+        """
+        entry = MATERIAL_TABLE.get(board.material_key)
+        if entry is None:
+            entry = material_entry(board.material_key)
+        return entry[0] if board.get_current_player() == 'w' else -entry[0]
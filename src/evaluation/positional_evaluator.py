@@ -0,0 +1,43 @@
+"""
+Tapered piece-square evaluation with the PeSTO tables.
+
+Every piece type has a middlegame and an endgame table of values (material
+included) per square. A position's middlegame and endgame scores are the
+sums over its pieces, and the final score blends them by the game phase.
+
+Summing 64 squares at every leaf would cost more than the rest of the
+search, so the board backends keep the packed sums and the phase counter
+themselves, through the tables of src.board.psq; evaluate only has to unpack
+and blend.
+"""
+from src.board.psq import MAX_PHASE
+from src.evaluation.base_evaluator import BaseEvaluator
+
+
+class PositionalEvaluator(BaseEvaluator):
+    """
+    Evaluates a position by tapered middlegame/endgame piece-square tables.
+
+    Reads the packed score sum and the phase counter that the board keeps up
+    to date in its ``psq`` and ``phase`` attributes, so evaluate takes
+    constant time.
+    """
+
+    def evaluate(self, board):
+        """
+        Evaluate a position by its piece-square tables.
+
+        Args:
+            board: A BaseBoard instance.
+
+        Returns:
+            Score in centipawns, positive if the side to move is better.
+        """
+        score = board.psq
+        eg = ((score + 0x8000) & 0xFFFF) - 0x8000  # src.board.psq.unpack_score, inlined
+        mg = (score - eg) >> 16
+        phase = board.phase
+        if phase > MAX_PHASE:
+            phase = MAX_PHASE  # Early promotions
+        score = (mg * phase + eg * (MAX_PHASE - phase)) // MAX_PHASE
+        return score if board.get_current_player() == 'w' else -score
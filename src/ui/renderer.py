@@ -153,6 +153,10 @@ class Renderer:
                     if hasattr(game_controller, 'undo_move'):
                         game_controller.undo_move()
                         self.animation.clear_animations()
+                elif event.key == pygame.K_SPACE:
+                    # Start or stop the engine analysis
+                    if hasattr(game_controller, 'toggle_analysis'):
+                        game_controller.toggle_analysis()
 
         return True
 
@@ -472,14 +476,35 @@ class Renderer:
         depth_text = self.fonts['small'].render(f"Depth: {depth}", True, config.TEXT_COLOR)
         self.screen.blit(depth_text, (self.annotation_x + 150, eval_y))
 
-        # Display best line if available
-        best_line = eval_info.get('best_line', [])
-        if best_line:
+        # Display the best lines (MultiPV) with their scores, best at the top
+        lines = eval_info.get('lines', [])
+        line_y = eval_y
+        if len(lines) > 1:
+            for index, line in reversed(list(enumerate(lines))):
+                line_y -= 20
+                line_score = line['score']
+                line_score_text = f"{line_score / 100:+.2f}" if abs(line_score) < 10000 else "Mate"
+                moves_text = " ".join([str(move) for move in line['pv'][:3]])
+                line_render = self.fonts['small'].render(f"{index + 1}. {line_score_text} {moves_text}",
+                                                         True, config.TEXT_COLOR)
+                self.screen.blit(line_render, (self.annotation_x + 10, line_y))
+
+        # Otherwise display the best line if available
+        else:
+            best_line = eval_info.get('best_line', [])
             line_text = " ".join([str(move) for move in best_line[:3]])
             if line_text:
+                line_y -= 20
                 line_render = self.fonts['small'].render(f"Best: {line_text}...",
                                                          True, config.TEXT_COLOR)
-                self.screen.blit(line_render, (self.annotation_x + 10, eval_y - 20))
+                self.screen.blit(line_render, (self.annotation_x + 10, line_y))
+
+        # Display search speed if available
+        nps = eval_info.get('nps')
+        if nps:
+            nps_text = self.fonts['small'].render(f"Speed: {nps / 1000:.1f}k nodes/s",
+                                                  True, config.TEXT_COLOR)
+            self.screen.blit(nps_text, (self.annotation_x + 10, line_y - 20))
 
     def _draw_game_over_message(self, board):
         """Draw a message indicating the game result when the game is over."""
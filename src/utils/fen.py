@@ -0,0 +1,120 @@
+"""
+FEN (Forsyth-Edwards Notation) parsing and formatting.
+
+Board placements are returned as 8x8 lists indexed ``[row][col]`` with row 0
+being rank 1, the same layout ``BaseBoard.get_board_state`` uses.
+"""
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+_PIECES = set('PNBRQKpnbrqk')
+
+
+def parse_fen(fen):
+    """
+    Parse a FEN string.
+
+    Args:
+        fen: The FEN string. The halfmove and fullmove fields are optional.
+
+    Returns:
+        Dictionary with keys 'placement' (8x8 list of piece characters, ' ' for
+        empty), 'turn' ('w' or 'b'), 'castling' (string such as 'KQkq' or ''),
+        'en_passant' ((row, col) tuple or None), 'halfmove' and 'fullmove'.
+
+    Raises:
+        ValueError: If the FEN string is malformed.
+    """
+    fields = fen.split()
+    if len(fields) < 4:
+        raise ValueError(f"FEN needs at least 4 fields: {fen!r}")
+
+    ranks = fields[0].split('/')
+    if len(ranks) != 8:
+        raise ValueError(f"FEN placement needs 8 ranks: {fen!r}")
+
+    placement = [[' ' for _ in range(8)] for _ in range(8)]
+    for i, rank in enumerate(ranks):
+        row = 7 - i
+        col = 0
+        for char in rank:
+            if char.isdigit():
+                col += int(char)
+            elif char in _PIECES:
+                if col > 7:
+                    raise ValueError(f"FEN rank {8 - i} is too long: {fen!r}")
+                placement[row][col] = char
+                col += 1
+            else:
+                raise ValueError(f"Invalid FEN piece {char!r}: {fen!r}")
+        if col != 8:
+            raise ValueError(f"FEN rank {8 - i} does not have 8 squares: {fen!r}")
+
+    turn = fields[1]
+    if turn not in ('w', 'b'):
+        raise ValueError(f"Invalid FEN side to move {turn!r}: {fen!r}")
+
+    castling = '' if fields[2] == '-' else fields[2]
+    if any(char not in 'KQkq' for char in castling):
+        raise ValueError(f"Invalid FEN castling rights {fields[2]!r}: {fen!r}")
+
+    en_passant = None
+    if fields[3] != '-':
+        square = fields[3]
+        if len(square) != 2 or square[0] not in 'abcdefgh' or square[1] not in '36':
+            raise ValueError(f"Invalid FEN en passant square {square!r}: {fen!r}")
+        en_passant = (int(square[1]) - 1, ord(square[0]) - ord('a'))
+
+    try:
+        halfmove = int(fields[4]) if len(fields) > 4 else 0
+        fullmove = int(fields[5]) if len(fields) > 5 else 1
+    except ValueError:
+        raise ValueError(f"Invalid FEN move counters: {fen!r}") from None
+
+    return {
+        'placement': placement,
+        'turn': turn,
+        'castling': castling,
+        'en_passant': en_passant,
+        'halfmove': halfmove,
+        'fullmove': fullmove
+    }
+
+
+def build_fen(placement, turn, castling, en_passant, halfmove=0, fullmove=1):
+    """
+    Build a FEN string from its components.
+
+    Args:
+        placement: 8x8 list of piece characters indexed [row][col], row 0 = rank 1.
+        turn: 'w' or 'b'.
+        castling: Castling rights string such as 'KQkq', or '' for none.
+        en_passant: (row, col) of the en passant target square, or None.
+        halfmove: Halfmove clock.
+        fullmove: Fullmove number.
+
+    Returns:
+        The FEN string.
+    """
+    ranks = []
+    for row in range(7, -1, -1):
+        rank = ''
+        empty = 0
+        for col in range(8):
+            piece = placement[row][col]
+            if piece == ' ' or piece == '':
+                empty += 1
+                continue
+            if empty:
+                rank += str(empty)
+                empty = 0
+            rank += piece
+        if empty:
+            rank += str(empty)
+        ranks.append(rank)
+
+    ep = '-'
+    if en_passant is not None:
+        ep = 'abcdefgh'[en_passant[1]] + str(en_passant[0] + 1)
+
+    return f"{'/'.join(ranks)} {turn} {castling or '-'} {ep} {halfmove} {fullmove}"
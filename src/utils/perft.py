@@ -0,0 +1,206 @@
+"""
+Perft (performance test) move-generation checks and benchmarks.
+
+Perft counts the leaf nodes of the legal move tree to a fixed depth. The
+counts for the standard test positions are well known, so they are a
+correctness oracle for every board backend, and timing them gives a
+nodes/second figure to track move-generation throughput across releases.
+
+Command line usage::
+
+    python -m src.utils.perft                      # benchmark all backends
+    python -m src.utils.perft --depth 3 --output results.json
+    python -m src.utils.perft --divide "<fen>" --depth 2 --board array
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from src.board.array_board import ArrayBoard
+from src.board.bit_board import BitBoard
+from src.board.move import move_to_uci
+
+# Board backends under test, by command line name
+BOARD_CLASSES = {
+    'bitboard': BitBoard,
+    'array': ArrayBoard
+}
+
+# Standard perft positions with known node counts for depths 1, 2, 3, ...
+PERFT_POSITIONS = [
+    {
+        'name': 'startpos',
+        'fen': "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        'nodes': [20, 400, 8902, 197281, 4865609]
+    },
+    {
+        'name': 'kiwipete',
+        'fen': "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        'nodes': [48, 2039, 97862, 4085603]
+    },
+    {
+        'name': 'position3',
+        'fen': "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        'nodes': [14, 191, 2812, 43238, 674624]
+    },
+    {
+        'name': 'position4',
+        'fen': "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        'nodes': [6, 264, 9467, 422333]
+    },
+    {
+        'name': 'position5',
+        'fen': "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        'nodes': [44, 1486, 62379, 2103487]
+    },
+    {
+        'name': 'position6',
+        'fen': "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        'nodes': [46, 2079, 89890, 3894594]
+    }
+]
+
+
+def perft(board, depth):
+    """
+    Count the leaf nodes of the legal move tree.
+
+    Args:
+        board: A BaseBoard instance. It is restored to its original position.
+        depth: Depth in plies.
+
+    Returns:
+        The number of leaf nodes.
+    """
+    if depth == 0:
+        return 1
+
+    moves = board.generate_moves()
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, depth):
+    """
+    Split the perft count by root move, for locating move-generation bugs.
+
+    Args:
+        board: A BaseBoard instance. It is restored to its original position.
+        depth: Depth in plies (at least 1).
+
+    Returns:
+        Dictionary mapping each root move in UCI notation to its subtree node count.
+    """
+    counts = {}
+    for move in board.generate_moves():
+        board.make_move(move)
+        counts[move_to_uci(move)] = perft(board, depth - 1)
+        board.unmake_move()
+    return counts
+
+
+def run_benchmark(board_names=None, depth=None, positions=None):
+    """
+    Run perft on the standard positions for each board backend.
+
+    Args:
+        board_names: Names from BOARD_CLASSES to run. Defaults to all.
+        depth: Maximum depth. Defaults to the deepest known count per position.
+        positions: Position dictionaries as in PERFT_POSITIONS. Defaults to all.
+
+    Returns:
+        List of result dictionaries with 'board', 'position', 'depth', 'nodes',
+        'expected', 'ok', 'seconds' and 'nps'.
+    """
+    board_names = board_names or list(BOARD_CLASSES)
+    positions = positions or PERFT_POSITIONS
+
+    results = []
+    for name in board_names:
+        board_class = BOARD_CLASSES[name]
+        for position in positions:
+            max_depth = len(position['nodes'])
+            position_depth = min(depth, max_depth) if depth else max_depth
+            board = board_class(position['fen'])
+
+            start = time.perf_counter()
+            nodes = perft(board, position_depth)
+            seconds = time.perf_counter() - start
+
+            expected = position['nodes'][position_depth - 1]
+            results.append({
+                'board': name,
+                'position': position['name'],
+                'depth': position_depth,
+                'nodes': nodes,
+                'expected': expected,
+                'ok': nodes == expected,
+                'seconds': round(seconds, 4),
+                'nps': int(nodes / seconds) if seconds > 0 else 0
+            })
+    return results
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+
+    Returns:
+        Process exit code: 0 if all counts matched, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Perft correctness checks and move generation benchmark.")
+    parser.add_argument('--board', action='append', choices=sorted(BOARD_CLASSES),
+                        help="Board backend to run (repeatable, default: all)")
+    parser.add_argument('--depth', type=int, help="Maximum depth (default: deepest known count)")
+    parser.add_argument('--position', action='append',
+                        choices=[position['name'] for position in PERFT_POSITIONS],
+                        help="Position to run (repeatable, default: all)")
+    parser.add_argument('--divide', metavar='FEN', help="Print per-move counts for a FEN instead")
+    parser.add_argument('--output', metavar='FILE', help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if args.divide:
+        board = BOARD_CLASSES[(args.board or ['bitboard'])[0]](args.divide)
+        counts = divide(board, args.depth or 1)
+        for move, nodes in sorted(counts.items()):
+            print(f"{move}: {nodes}")
+        print(f"\nMoves: {len(counts)}\nNodes: {sum(counts.values())}")
+        return 0
+
+    positions = None
+    if args.position:
+        positions = [position for position in PERFT_POSITIONS if position['name'] in args.position]
+
+    results = run_benchmark(args.board, args.depth, positions)
+    for result in results:
+        status = "ok" if result['ok'] else f"FAIL (expected {result['expected']})"
+        print(f"{result['board']:<10} {result['position']:<10} depth {result['depth']}  "
+              f"{result['nodes']:>9} nodes  {result['seconds']:8.3f}s  {result['nps']:>8} nps  {status}")
+
+    if args.output:
+        report = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 0 if all(result['ok'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
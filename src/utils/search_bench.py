@@ -0,0 +1,139 @@
+"""
+Search benchmark: node counts of fixed-depth searches.
+
+A fixed-depth alpha-beta search visits fewer nodes the better its moves
+are ordered and the more selective it is, so its node count measures the
+move-ordering heuristics and pruning techniques independently of machine
+speed. The benchmark searches the perft positions once with everything
+enabled and once with each feature switched off, and reports how many more
+nodes each configuration needs.
+
+Command line usage::
+
+    python -m src.utils.search_bench                 # depth 4, bitboard
+    python -m src.utils.search_bench --depth 5 --output search.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from src.engine.alpha_beta import AlphaBetaEngine, SELECTIVITY
+from src.engine.move_ordering import MoveOrdering, HEURISTICS
+from src.utils.perft import BOARD_CLASSES, PERFT_POSITIONS
+
+# Default search depth; deep enough for the quiet move heuristics to matter
+DEFAULT_DEPTH = 4
+
+
+def search_nodes(board_class, depth, positions, ordering, **selectivity):
+    """
+    Search every position to a fixed depth with a fresh engine.
+
+    Args:
+        board_class: BaseBoard subclass to set the positions up with.
+        depth: Search depth in plies.
+        positions: Position dictionaries as in PERFT_POSITIONS.
+        ordering: MoveOrdering for the engine.
+        **selectivity: Switches from SELECTIVITY passed to the engine.
+
+    Returns:
+        A (nodes, seconds, stats) tuple summed over the positions.
+    """
+    engine = AlphaBetaEngine(tt_size_mb=16, ordering=ordering, **selectivity)
+    nodes = 0
+    stats = {}
+    start = time.perf_counter()
+    for position in positions:
+        engine.new_game()
+        info = engine.search(board_class(position['fen']), depth)
+        nodes += info['nodes']
+        for name, count in info['stats'].items():
+            stats[name] = stats.get(name, 0) + count
+    return nodes, time.perf_counter() - start, stats
+
+
+def run_benchmark(board_name='bitboard', depth=DEFAULT_DEPTH, positions=None):
+    """
+    Measure the node count of each move-ordering heuristic and selective search technique.
+
+    Args:
+        board_name: Name from BOARD_CLASSES to search with.
+        depth: Search depth in plies.
+        positions: Position dictionaries as in PERFT_POSITIONS. Defaults to all.
+
+    Returns:
+        List of result dictionaries with 'disabled' (a name from HEURISTICS or
+        SELECTIVITY, or None for the baseline), 'nodes', 'increase' (relative
+        to the baseline), 'seconds', 'nps' and 'stats' (the engine's counters).
+    """
+    board_class = BOARD_CLASSES[board_name]
+    positions = positions or PERFT_POSITIONS
+
+    results = []
+    baseline = None
+    for disabled in (None,) + HEURISTICS + SELECTIVITY:
+        ordering = MoveOrdering(**{name: name != disabled for name in HEURISTICS})
+        selectivity = {name: name != disabled for name in SELECTIVITY}
+        nodes, seconds, stats = search_nodes(board_class, depth, positions, ordering, **selectivity)
+        if baseline is None:
+            baseline = nodes
+        results.append({
+            'disabled': disabled,
+            'nodes': nodes,
+            'increase': round(nodes / baseline - 1, 4),
+            'seconds': round(seconds, 4),
+            'nps': int(nodes / seconds) if seconds > 0 else 0,
+            'stats': stats
+        })
+    return results
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv: Argument list, defaults to sys.argv[1:].
+
+    Returns:
+        Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Node counts of the move-ordering and pruning features.")
+    parser.add_argument('--board', default='bitboard', choices=sorted(BOARD_CLASSES),
+                        help="Board backend to search with (default: bitboard)")
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH,
+                        help=f"Search depth (default: {DEFAULT_DEPTH})")
+    parser.add_argument('--position', action='append',
+                        choices=[position['name'] for position in PERFT_POSITIONS],
+                        help="Position to run (repeatable, default: all)")
+    parser.add_argument('--output', metavar='FILE', help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    positions = None
+    if args.position:
+        positions = [position for position in PERFT_POSITIONS if position['name'] in args.position]
+
+    results = run_benchmark(args.board, args.depth, positions)
+    for result in results:
+        label = f"no {result['disabled']}" if result['disabled'] else "all enabled"
+        print(f"{label:<24} {result['nodes']:>9} nodes  {result['increase']:+8.1%}  "
+              f"{result['seconds']:8.3f}s  {result['nps']:>7} nps")
+
+    if args.output:
+        report = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'board': args.board,
+            'depth': args.depth,
+            'results': results
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Minimal fake UCI engine for testing the UCI client without a real engine.
+
+It knows no chess: for White to move it reports the lines 1. e4, 1. d4 and
+1. Nf3, for Black 1... e5, 1... d5 and 1... Nf6, which are legal in the
+positions the tests use. Every depth takes DEPTH_SECONDS, so searches run
+long enough to overlap. Options:
+
+    MultiPV     number of lines to report per depth
+    ScoreMate   if non-zero, report 'score mate <value>' instead of centipawns
+"""
+import sys
+import threading
+import time
+
+# Seconds spent per depth
+DEPTH_SECONDS = 0.05
+
+# Depth reported when 'go' sets no depth limit ('movetime' or 'infinite' searches)
+MAX_DEPTH = 100
+
+# Reported lines per side to move, best first
+LINES = {'w': ('e2e4 e7e5', 'd2d4 d7d5', 'g1f3 g8f6'),
+         'b': ('e7e5 g1f3', 'd7d5 e4d5', 'g8f6 e4e5')}
+
+
+def send(text):
+    sys.stdout.write(text + '\n')
+    sys.stdout.flush()
+
+
+def search(side, tokens, options, stop):
+    """Report one info line per line and depth until the limit or a stop, then the best move."""
+    depth_limit = int(tokens[tokens.index('depth') + 1]) if 'depth' in tokens else MAX_DEPTH
+    deadline = (time.monotonic() + int(tokens[tokens.index('movetime') + 1]) / 1000
+                if 'movetime' in tokens else None)
+    mate = options.get('ScoreMate', 0)
+    for depth in range(1, depth_limit + 1):
+        time.sleep(DEPTH_SECONDS)
+        if stop.is_set() or (deadline is not None and time.monotonic() > deadline):
+            break
+        for index, line in enumerate(LINES[side][:options.get('MultiPV', 1)]):
+            score = f'mate {mate}' if mate else f'cp {30 - 10 * index}'
+            send(f'info depth {depth} seldepth {depth + 2} multipv {index + 1} score {score} '
+                 f'nodes {1000 * depth} nps 20000 time {50 * depth} pv {line}')
+    send(f'bestmove {LINES[side][0].split()[0]}')
+
+
+def main():
+    options = {}
+    side = 'w'
+    stop = threading.Event()
+    worker = None
+    for text in sys.stdin:
+        tokens = text.split()
+        if not tokens:
+            continue
+        command = tokens[0]
+        if command == 'uci':
+            send('id name FakeUCI')
+            send('option name MultiPV type spin default 1 min 1 max 3')
+            send('option name ScoreMate type spin default 0 min -10 max 10')
+            send('uciok')
+        elif command == 'isready':
+            send('readyok')
+        elif command == 'setoption':
+            options[tokens[2]] = int(tokens[4])
+        elif command == 'position':
+            side = tokens[3] if tokens[1] == 'fen' else 'w'
+        elif command == 'go':
+            stop.clear()
+            worker = threading.Thread(target=search, args=(side, tokens, options, stop))
+            worker.start()
+        elif command == 'stop':
+            stop.set()
+        elif command == 'quit':
+            break
+    stop.set()
+    if worker is not None:
+        worker.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Tests of batched move generation against the per-position board backends."""
+import numpy as np
+import pytest
+
+from src.board.array_board import ArrayBoard
+from src.board.batch import PositionBatch
+from src.board.bit_board import BitBoard
+from src.board.move import NULL_MOVE
+from src.utils.perft import PERFT_POSITIONS
+
+# Checks, pins, en passant corner cases, promotions and mates besides the perft positions
+EXTRA_FENS = [
+    '8/8/8/KPp4r/8/8/8/7k w - c6 0 1',  # En passant would expose the king along the rank
+    '8/8/3k4/2pP4/8/8/8/4K3 w - c6 0 1',
+    '4k3/8/8/8/1b6/8/3P4/4K3 w - - 0 1',  # Pinned pawn
+    'r3k2r/8/8/8/8/8/8/R3K1R1 b Qkq - 0 1',
+    '4k3/1P6/8/8/8/8/6p1/4K2R w K - 0 1',
+    'rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3',  # Checkmated
+    '7k/5Q2/6K1/8/8/8/8/8 b - - 0 1',  # Stalemate
+    '4k3/8/8/8/8/8/4r3/R3K2R w KQ - 0 1',  # Castling out of check
+]
+
+
+def fixed_fens():
+    """The test positions and every position one move away from them."""
+    fens = [position['fen'] for position in PERFT_POSITIONS] + EXTRA_FENS
+    children = []
+    for fen in fens:
+        board = BitBoard(fen)
+        for move in board.generate_moves():
+            board.make_move(move)
+            children.append(board.get_fen())
+            board.unmake_move()
+    return fens + children
+
+
+FENS = fixed_fens()
+
+
+@pytest.mark.parametrize('board_class', [BitBoard, ArrayBoard])
+def test_legal_moves_match_backends(board_class):
+    """Batched legal moves, counts and move masks equal each backend's generate_moves."""
+    boards = [board_class(fen) for fen in FENS]
+    batch = PositionBatch.from_boards(boards)
+    moves, counts = batch.legal_moves()
+    assert np.array_equal(batch.legal_move_counts(), counts)
+    masks = batch.move_masks()
+    for index, board in enumerate(boards):
+        expected = sorted(board.generate_moves())
+        assert sorted(int(move) for move in moves[index, :counts[index]]) == expected, FENS[index]
+        assert all(move == NULL_MOVE for move in moves[index, counts[index]:])
+        expected_mask = np.zeros((64, 64), dtype=bool)
+        for move in expected:
+            expected_mask[move & 63, (move >> 6) & 63] = True
+        assert np.array_equal(masks[index], expected_mask), FENS[index]
+
+
+@pytest.mark.parametrize('board_class', [BitBoard, ArrayBoard])
+def test_attack_sets_match_backends(board_class):
+    """Batched attack sets equal each backend's attack maps."""
+    boards = [board_class(fen) for fen in FENS]
+    attacks = PositionBatch.from_boards(boards).attack_sets()
+    for index, board in enumerate(boards):
+        assert [int(attacks[index, color]) for color in range(2)] == \
+               [board.attack_map('w'), board.attack_map('b')], FENS[index]
+
+
+def test_from_fens_matches_from_boards():
+    """Batches built from FENs and from BitBoards hold the same positions."""
+    by_fen = PositionBatch.from_fens(FENS)
+    by_board = PositionBatch.from_boards(BitBoard(fen) for fen in FENS)
+    for name in ('bitboards', 'side', 'castling', 'ep_square'):
+        assert np.array_equal(getattr(by_fen, name), getattr(by_board, name)), name
@@ -0,0 +1,42 @@
+"""Tests of the Lazy SMP engine."""
+import time
+
+import pytest
+
+from src.board.bit_board import BitBoard
+from src.engine.lazy_smp import LazySMPEngine
+
+
+@pytest.fixture
+def engine():
+    """A LazySMPEngine with one helper, closed after the test."""
+    engine = LazySMPEngine(processes=2, tt_size_mb=1)
+    yield engine
+    engine.close()
+
+
+def test_helper_result_has_lines_and_stats(engine):
+    """When a helper got deeper than the main process, its result has the same keys as the main one's."""
+    main_depths = []
+
+    def hold_main(info):
+        # Keep the main process at depth 1 while the helper searches on
+        main_depths.append(info['depth'])
+        time.sleep(1.0)
+        engine._engine.stop()
+
+    info = engine.search(BitBoard(), depth=6, info_callback=hold_main)
+    assert main_depths == [1]
+    assert info['depth'] > 1
+    line = info['lines'][0]
+    assert [move.to_int() for move in line['pv']] == [move.to_int() for move in info['best_line']]
+    assert (line['score'], line['depth']) == (info['score'], info['depth'])
+    assert info['stats']['qsearch_nodes'] > 0
+
+
+def test_consecutive_searches(engine):
+    """Searches one after the other all finish, with the main process's result when no helper is deeper."""
+    for _ in range(3):
+        info = engine.search(BitBoard(), depth=3)
+        assert info['depth'] == 3
+        assert set(info) >= {'lines', 'stats', 'best_move'}
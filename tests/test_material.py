@@ -0,0 +1,74 @@
+"""Tests of the material signature table and dead draw detection."""
+import pytest
+
+from src.board.array_board import ArrayBoard
+from src.board.bit_board import BitBoard
+from src.board.material import material_counts, material_key
+from src.board.move import move_to_uci
+from src.evaluation.material_evaluator import (MATERIAL_TABLE, MaterialEvaluator, _compute_entry,
+                                               is_dead_draw, material_entry)
+
+BOARD_CLASSES = [BitBoard, ArrayBoard]
+
+
+def counted_key(board):
+    """The material key of a board, counted piece by piece instead of read from the board."""
+    counts = [0] * 12
+    for square in range(64):
+        piece = board.piece_at(square)
+        if piece >= 0:
+            counts[piece] += 1
+    return material_key(counts)
+
+
+def play(board, uci):
+    """Make the legal move given in UCI notation."""
+    board.make_move(next(move for move in board.generate_moves() if move_to_uci(move) == uci))
+
+
+@pytest.mark.parametrize('board_class', BOARD_CLASSES)
+@pytest.mark.parametrize('fen', [
+    '8/8/4k3/8/8/3K4/8/8 w - - 0 1',  # KvK
+    '8/8/4k3/8/8/3K4/5B2/8 w - - 0 1',  # KBvK
+    '8/8/4k3/8/8/3K4/8/6n1 b - - 0 1',  # KvKN
+    '8/8/4k3/8/2b5/3K4/4B3/8 w - - 0 1',  # KBvKB, both bishops on light squares
+    '8/2b5/4k3/8/8/3K4/8/B1B5 w - - 0 1',  # KBBvKB, all on dark squares
+])
+def test_dead_draws(board_class, fen):
+    """Positions nobody can win are dead draws."""
+    assert is_dead_draw(board_class(fen))
+
+
+@pytest.mark.parametrize('board_class', BOARD_CLASSES)
+@pytest.mark.parametrize('fen', [
+    '8/8/4k3/8/8/3K4/4P3/8 w - - 0 1',  # KPvK
+    '8/8/4k3/8/1b6/3K4/4B3/8 w - - 0 1',  # KBvKB, opposite colours
+    '8/8/4k3/8/8/3K4/5BB1/8 w - - 0 1',  # KBBvK, opposite colours
+    '8/8/4k3/8/8/3K4/4NN2/8 w - - 0 1',  # KNNvK: no forced mate, but one is possible
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+])
+def test_not_dead_draws(board_class, fen):
+    """Positions in which a mate is still possible are not dead draws."""
+    assert not is_dead_draw(board_class(fen))
+
+
+@pytest.mark.parametrize('board_class', BOARD_CLASSES)
+def test_key_follows_captures_and_promotions(board_class):
+    """The board's material key and its table entry stay right through captures, promotions and take-backs."""
+    board = board_class('r7/1P5k/8/8/8/8/6p1/4K2R w K - 0 1')
+    evaluator = MaterialEvaluator()
+    keys = [board.material_key]
+    for uci in ('b7a8q', 'g2h1n', 'a8h1'):
+        play(board, uci)
+        key = board.material_key
+        assert key == counted_key(board), uci
+        evaluator.evaluate(board)
+        assert MATERIAL_TABLE[key] == _compute_entry(material_counts(key)), uci
+        keys.append(key)
+    assert len(set(keys)) == len(keys)  # Every move above changed the material
+    assert material_counts(keys[-1]) == [0, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 1]
+
+    for key in reversed(keys[:-1]):
+        board.unmake_move()
+        assert board.material_key == key
+    assert material_entry(board.material_key)[0] == 0  # Rook and pawn against rook and pawn
@@ -0,0 +1,75 @@
+"""Tests of the NNUE evaluator's incremental accumulators against evaluation from scratch."""
+import random
+
+import pytest
+
+from src.board.array_board import ArrayBoard
+from src.board.bit_board import BitBoard
+from src.board.constants import KING
+from src.board.move import KING_CASTLE, QUEEN_CASTLE
+from src.engine.neural_engine import NNUEEvaluator
+
+# Positions with castling, en passant, promotions and exposed kings
+FENS = [
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+    'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+]
+
+
+def scratch_score(evaluator, board):
+    """Evaluate the board's position with a fresh evaluator on a fresh board: no stack, no Finny table."""
+    fresh = NNUEEvaluator(evaluator.weights, evaluator.scale)
+    return fresh.evaluate(type(board)(board.get_fen()))
+
+
+@pytest.mark.parametrize('board_class', [BitBoard, ArrayBoard])
+def test_incremental_matches_scratch(board_class):
+    """Random playouts with take-backs, null moves and skipped evaluations agree with scratch evaluation."""
+    evaluator = NNUEEvaluator.random(hidden=32, seed=1)
+    rng = random.Random(7)
+    king_moves = castles = 0
+    for fen in FENS:
+        board = board_class(fen)
+        made = []
+        for _ in range(60):
+            moves = board.generate_moves()
+            castled = False
+            if made and (not moves or rng.random() < 0.3):
+                board.unmake_move()
+                made.pop()
+            elif rng.random() < 0.05 and not board.is_check(board.get_current_player()):
+                board.make_null_move()
+                made.append(None)
+            elif moves:
+                castling = [move for move in moves if move >> 12 in (KING_CASTLE, QUEEN_CASTLE)]
+                move = rng.choice(castling if castling and rng.random() < 0.5 else moves)
+                if board.piece_at(move & 63) % 6 == KING:
+                    king_moves += 1
+                    castled = move >> 12 in (KING_CASTLE, QUEEN_CASTLE)
+                    castles += castled
+                board.make_move(move)
+                made.append(move)
+            if castled or rng.random() < 0.6:  # Leave some plies for the next evaluation to catch up on
+                assert abs(evaluator.evaluate(board) - scratch_score(evaluator, board)) <= 1, board.get_fen()
+        while made:
+            board.unmake_move()
+            made.pop()
+        assert board.get_fen() == fen
+        assert abs(evaluator.evaluate(board) - scratch_score(evaluator, board)) <= 1
+    assert king_moves >= 10 and castles >= 1  # The Finny table path was exercised
+
+
+def test_reattach():
+    """Evaluating another board attaches to it and stops following the first."""
+    evaluator = NNUEEvaluator.random(hidden=32, seed=1)
+    first, second = BitBoard(FENS[1]), ArrayBoard(FENS[3])
+    evaluator.evaluate(first)
+    evaluator.evaluate(second)
+    first.make_move(first.generate_moves()[0])
+    move = second.generate_moves()[-1]
+    second.make_move(move)
+    assert abs(evaluator.evaluate(second) - scratch_score(evaluator, second)) <= 1
+    assert abs(evaluator.evaluate(first) - scratch_score(evaluator, first)) <= 1
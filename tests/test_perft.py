@@ -0,0 +1,12 @@
+"""Perft regression test: the move generators of every backend against the known node counts."""
+from src.utils.perft import run_benchmark
+
+# Depth of the check; small enough to run in a few seconds
+TEST_DEPTH = 3
+
+
+def test_perft():
+    """Every backend matches the known counts of every standard position at TEST_DEPTH."""
+    for result in run_benchmark(depth=TEST_DEPTH):
+        assert result['ok'], (f"{result['board']} {result['position']} depth {result['depth']}: "
+                              f"{result['nodes']} nodes, expected {result['expected']}")
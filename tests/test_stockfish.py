@@ -0,0 +1,110 @@
+"""Tests of the UCI client, run against the fake engine in fake_uci.py."""
+import os
+import sys
+import threading
+
+import pytest
+
+from src.board.bit_board import BitBoard
+from src.board.move import move_to_uci
+from src.engine.base_engine import MATE_SCORE
+from src.engine.stockfish import StockfishEngine, parse_info
+
+FAKE_ENGINE = [sys.executable, os.path.join(os.path.dirname(__file__), 'fake_uci.py')]
+
+AFTER_E4 = 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1'
+
+
+@pytest.fixture
+def engine_factory():
+    """Create StockfishEngines on the fake engine and close them after the test."""
+    engines = []
+
+    def create(**kwargs):
+        engine = StockfishEngine(FAKE_ENGINE, **kwargs)
+        engines.append(engine)
+        return engine
+
+    yield create
+    for engine in engines:
+        engine.close()
+
+
+def test_parse_info():
+    """Integer fields, scores, bounds and the PV are parsed; mates become mate scores in plies."""
+    fields = parse_info('info depth 12 seldepth 18 multipv 2 score cp -31 nodes 81920 nps 400000 '
+                        'time 204 pv e2e4 e7e5 g1f3')
+    assert fields == {'depth': 12, 'seldepth': 18, 'multipv': 2, 'score': -31, 'nodes': 81920,
+                      'nps': 400000, 'time': 204, 'pv': ['e2e4', 'e7e5', 'g1f3']}
+    assert parse_info('info depth 9 score mate 3 pv d1h5')['score'] == MATE_SCORE - 5
+    assert parse_info('info depth 9 score mate -2 pv e1f1')['score'] == -MATE_SCORE + 4
+    assert parse_info('info depth 5 score cp 40 lowerbound')['bound'] == 'lower'
+    assert 'pv' not in parse_info('info string pv is not a field here')
+    assert parse_info('bestmove e2e4') == {}
+
+
+def test_parse_info_malformed_score():
+    """Truncated, malformed or reordered score fields are skipped or read without raising."""
+    assert parse_info('info depth 7 score cp') == {'depth': 7}
+    assert parse_info('info depth 7 score') == {'depth': 7}
+    assert parse_info('info depth 7 score mate') == {'depth': 7}
+    assert parse_info('info depth 7 score cp x12 nodes 500 pv e2e4') == {'depth': 7, 'nodes': 500, 'pv': ['e2e4']}
+    assert parse_info('info depth 7 score lowerbound cp 20 nodes 500') == \
+        {'depth': 7, 'bound': 'lower', 'score': 20, 'nodes': 500}
+    assert parse_info('info score upperbound mate -2') == {'bound': 'upper', 'score': -MATE_SCORE + 4}
+
+
+def test_search(engine_factory):
+    """A search returns the engine's last completed depth and reports every depth."""
+    engine = engine_factory()
+    board = BitBoard()
+    fen = board.get_fen()
+    depths = []
+    info = engine.search(board, depth=4, info_callback=lambda info: depths.append(info['depth']))
+    assert depths == [1, 2, 3, 4]
+    assert info['depth'] == 4
+    assert info['score'] == 30
+    assert move_to_uci(info['best_move'].to_int()) == 'e2e4'
+    assert [move_to_uci(move.to_int()) for move in info['best_line']] == ['e2e4', 'e7e5']
+    assert info['nodes'] == 4000
+    assert board.get_fen() == fen
+
+
+def test_mate_score_and_multi_pv(engine_factory):
+    """UCI options reach the engine; MultiPV lines come back best first with mate scores in plies."""
+    engine = engine_factory(multi_pv=3, options={'ScoreMate': 2})
+    info = engine.search(BitBoard(AFTER_E4), depth=2)
+    assert info['score'] == MATE_SCORE - 3
+    assert [move_to_uci(line['pv'][0].to_int()) for line in info['lines']] == ['e7e5', 'd7d5', 'g8f6']
+
+
+def test_processes_are_reused(engine_factory):
+    """Consecutive searches run on the same engine process, not a new one each."""
+    engine = engine_factory()
+    engine.search(BitBoard(), depth=1)
+    pid = engine._pool[0].process.pid
+    engine.new_game()
+    engine.search(BitBoard(AFTER_E4), depth=1)
+    assert engine._pool[0].process.pid == pid
+
+
+def test_search_many(engine_factory):
+    """search_many spreads the positions over the pool and keeps their order."""
+    engine = engine_factory(pool_size=2)
+    boards = [BitBoard(), BitBoard(AFTER_E4), BitBoard(), BitBoard(AFTER_E4)]
+    infos = engine.search_many(boards, depth=3)
+    assert [move_to_uci(info['best_move'].to_int()) for info in infos] == ['e2e4', 'e7e5'] * 2
+    assert all(process.alive for process in engine._pool)
+    assert len({process.process.pid for process in engine._pool}) == 2
+
+
+def test_stop_event(engine_factory):
+    """An infinite search returns its best result so far once the stop event is set."""
+    stop_event = threading.Event()
+    engine = engine_factory(stop_event=stop_event)
+    timer = threading.Timer(0.3, stop_event.set)
+    timer.start()
+    info = engine.search(BitBoard())
+    timer.join()
+    assert 1 <= info['depth'] < 100
+    assert move_to_uci(info['best_move'].to_int()) == 'e2e4'
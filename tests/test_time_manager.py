@@ -0,0 +1,63 @@
+"""Tests of the time manager's iteration predictions."""
+import pytest
+
+from src.engine import time_manager as time_manager_module
+from src.engine.time_manager import TimeManager
+
+
+class FakeClock:
+    """Stands in for time.perf_counter, advanced by hand."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the time manager's clock with a FakeClock."""
+    fake = FakeClock()
+    monkeypatch.setattr(time_manager_module.time, 'perf_counter', fake)
+    return fake
+
+
+def test_prediction(clock):
+    """The next iteration is predicted from the last one's size, the branching factor and the node rate."""
+    manager = TimeManager(move_overhead=0.0)
+    soft, _ = manager.allocate(60.0, moves_to_go=30)
+    assert soft == pytest.approx(2.0)
+    clock.now += 0.1
+    assert manager.next_iteration(1, 20, 1000)
+    clock.now += 0.3
+    assert manager.next_iteration(1, 20, 4000)
+    # Sizes 1000 and 3000: branching 3, at 10000 nodes per second
+    assert manager.predicted == pytest.approx(0.9)
+
+
+def test_reallocate_leaves_out_ponder_nodes(clock):
+    """After a ponder hit the predictions only count the nodes searched since the hit."""
+    manager = TimeManager(move_overhead=0.0)
+    manager.allocate(60.0, moves_to_go=30)
+    clock.now += 5.0
+    for nodes in (1000, 10000, 100000):
+        manager.next_iteration(1, 20, nodes)  # Pondering: predictions are not acted on
+
+    ponder_nodes = 500000
+    soft, hard = manager.reallocate(ponder_nodes)
+    assert manager.hard_deadline == pytest.approx(clock.now + hard)
+    clock.now += 0.1
+    assert manager.next_iteration(1, 20, ponder_nodes + 1000)
+    clock.now += 0.3
+    assert manager.next_iteration(1, 20, ponder_nodes + 4000)
+    assert manager.predicted == pytest.approx(0.9)
+
+    clock.now += 1.5
+    assert not manager.next_iteration(1, 20, ponder_nodes + 10000)  # 1.9s in, with more to come
+
+
+def test_reallocate_before_allocate():
+    """reallocate needs the clock state of an earlier allocate call."""
+    with pytest.raises(RuntimeError):
+        TimeManager().reallocate()
@@ -0,0 +1,90 @@
+"""Tests of the bucketed transposition table."""
+from src.board.move import NULL_MOVE
+from src.engine.alpha_beta import score_from_tt, score_to_tt
+from src.engine.base_engine import MATE_SCORE
+from src.engine.transposition import (BUCKET_SIZE, ENTRY_BYTES, EXACT, LOWER_BOUND, UPPER_BOUND,
+                                      TranspositionTable)
+
+KEY = 0x9D39247E33776D41
+
+
+def one_bucket():
+    """A table of a single bucket, so every key competes for the same slots."""
+    buffer = bytearray(BUCKET_SIZE * ENTRY_BYTES)
+    return TranspositionTable(buffer=buffer), buffer
+
+
+def test_store_probe_round_trip():
+    """Every field comes back as stored, including negative scores and the top depth."""
+    tt = TranspositionTable(size_mb=1)
+    assert tt.probe(KEY) is None
+    tt.store(KEY, 7, -123, UPPER_BOUND, 0x1234)
+    assert tt.probe(KEY) == (7, -123, UPPER_BOUND, 0x1234)
+    tt.store(KEY + 1, 255, 32000, LOWER_BOUND, 0xFFFF)
+    assert tt.probe(KEY + 1) == (255, 32000, LOWER_BOUND, 0xFFFF)
+    assert (tt.probes, tt.hits, tt.stores) == (3, 2, 2)
+
+
+def test_same_position_update():
+    """A null move keeps the stored one; a clearly deeper entry of this search survives non-exact results."""
+    tt = TranspositionTable(size_mb=1)
+    tt.store(KEY, 10, 50, EXACT, 0x0ABC)
+    tt.store(KEY, 6, 40, LOWER_BOUND, NULL_MOVE)
+    assert tt.probe(KEY) == (10, 50, EXACT, 0x0ABC)
+    tt.store(KEY, 7, 40, LOWER_BOUND, NULL_MOVE)
+    assert tt.probe(KEY) == (7, 40, LOWER_BOUND, 0x0ABC)
+    tt.store(KEY, 2, 30, EXACT, 0x0DEF)
+    assert tt.probe(KEY) == (2, 30, EXACT, 0x0DEF)
+
+    tt.store(KEY, 20, 0, LOWER_BOUND, 0x0ABC)
+    tt.new_search()
+    tt.store(KEY, 1, 5, UPPER_BOUND, NULL_MOVE)  # Entries of older searches are always overwritten
+    assert tt.probe(KEY) == (1, 5, UPPER_BOUND, 0x0ABC)
+
+
+def test_depth_preferred_replacement():
+    """A new position fills the empty slots first, then evicts the shallowest entry."""
+    tt, _ = one_bucket()
+    for key, depth in ((1, 5), (2, 2), (3, 7), (4, 9)):
+        tt.store(key, depth, 0, EXACT, key)
+    assert tt.collisions == 0
+    tt.store(5, 3, 0, EXACT, 5)
+    assert tt.collisions == 1
+    assert tt.probe(2) is None
+    assert [tt.probe(key)[0] for key in (1, 3, 4, 5)] == [5, 7, 9, 3]
+
+
+def test_age_preferred_replacement():
+    """An entry from an earlier search is evicted before shallower entries of the current one."""
+    tt, _ = one_bucket()
+    tt.store(1, 12, 0, EXACT, 1)
+    tt.new_search()
+    for key in (2, 3, 4):
+        tt.store(key, 5, 0, EXACT, key)
+    tt.store(5, 1, 0, EXACT, 5)
+    assert tt.probe(1) is None
+    assert all(tt.probe(key) is not None for key in (2, 3, 4, 5))
+    assert tt.hashfull() == 1000
+
+
+def test_colliding_key_is_rejected():
+    """A different key of the same bucket, or an entry with a torn data word, reads as a miss."""
+    tt, buffer = one_bucket()
+    tt.store(KEY, 8, 77, EXACT, 0x0123)
+    assert tt.probe(KEY ^ (1 << 40)) is None
+    assert tt.probe(KEY) is not None
+    buffer[8] ^= 1  # Data word of the first slot
+    assert tt.probe(KEY) is None
+
+
+def test_mate_score_ply_adjustment():
+    """Mate scores are stored relative to the node and come back relative to the root of the probe."""
+    mate_in_7 = MATE_SCORE - 7  # Found at ply 3: mate 4 plies below the node
+    tt = TranspositionTable(size_mb=1)
+    tt.store(KEY, 4, score_to_tt(mate_in_7, 3), EXACT, NULL_MOVE)
+    assert tt.probe(KEY)[1] == MATE_SCORE - 4
+    assert score_from_tt(tt.probe(KEY)[1], 5) == MATE_SCORE - 9  # Reached at ply 5 through a transposition
+
+    tt.store(KEY, 4, score_to_tt(-mate_in_7, 3), EXACT, NULL_MOVE)
+    assert score_from_tt(tt.probe(KEY)[1], 1) == -MATE_SCORE + 5
+    assert score_to_tt(250, 9) == score_from_tt(250, 9) == 250